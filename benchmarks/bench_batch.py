@@ -0,0 +1,232 @@
+"""
+LinkDrop Batch Benchmark
+
+End-to-end benchmark for create_batch_shortcuts() against the local
+stand-in favicon server, so changes to fetch_favicon() or the batch
+engine can be measured without the real internet.
+
+Each case runs in its own child process (so peak RSS is per case) with a
+fresh icon cache and output folder:
+
+    cold    nothing cached, every site is fetched
+    warm    every icon already cached, no network at all
+    mixed   half of the sites are cached
+
+Sites are spread over the server's scenarios (see favicon_server.py)
+according to --mix. Reported per case: shortcuts/sec, p50/p95 latency of a
+single shortcut, and the child's peak RSS. The --json output also holds the
+mean time per phase, taken from the core timing hooks.
+
+Usage:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --sizes 10 100 1000 10000 --modes cold warm
+    python benchmarks/bench_batch.py --mix icon=80,slow=10,404=10 --json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import tempfile
+from typing import Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from favicon_server import ALL_LOOPBACK, SCENARIOS, start_server, site_host
+
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_MODES = ['cold', 'warm', 'mixed']
+DEFAULT_MIX = "icon=70,redirect=8,html=5,slow=5,404=5,oversized=3,timeout=2,missing=2"
+DEFAULT_TIMEOUT = 1.0
+
+
+def parse_mix(text: str) -> list[tuple[str, int]]:
+    """Parse 'scenario=weight,...' into a list of (scenario, weight)."""
+    mix = []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def assign_scenarios(count: int, mix: list[tuple[str, int]], seed: int) -> list[str]:
+    """Deterministically pick a scenario for each of count sites."""
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    return rng.choices(names, weights=weights, k=count)
+
+
+def build_batch(count: int, port: int) -> list[str]:
+    """Build batch lines, one site (and icon cache entry) per line."""
+    return [
+        f"Site {i} | http://{site_host(i)}:{port}/page/{i} | Benchmark row {i}"
+        for i in range(count)
+    ]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if the platform reports it."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def run_case(size: int, mode: str, port: int, timeout: float, workdir: str) -> dict:
+    """
+    Run one benchmark case in this process (called in the child).
+
+    The environment must already point LOCALAPPDATA at an empty cache and
+    LINKDROP_FAVICON_FALLBACK_URL at the stand-in server.
+    """
+    from src import core
+
+    core.FAVICON_TIMEOUT = timeout
+
+    lines = build_batch(size, port)
+
+    if mode in ('warm', 'mixed'):
+        warm_lines = lines if mode == 'warm' else lines[::2]
+        warm_dir = os.path.join(workdir, 'warmup')
+        os.makedirs(warm_dir, exist_ok=True)
+        core.create_batch_shortcuts('\n'.join(warm_lines), warm_dir, fetch_icons=True)
+
+    out_dir = os.path.join(workdir, 'out')
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Collect per-shortcut phase timings as the batch engine creates them
+    timed = []
+    core.add_timing_hook(timed.append)
+    try:
+        start = time.perf_counter()
+        results = core.create_batch_shortcuts('\n'.join(lines), out_dir, fetch_icons=True)
+        elapsed = time.perf_counter() - start
+    finally:
+        core.remove_timing_hook(timed.append)
+
+    latencies = [r.timings.total for r in timed]
+    phases = {
+        phase: sum(getattr(r.timings, phase) for r in timed) / len(timed) * 1000 if timed else 0.0
+        for phase in ('validate', 'cache_lookup', 'fetch', 'convert', 'write')
+    }
+
+    latencies.sort()
+    return {
+        'size': size,
+        'mode': mode,
+        'seconds': elapsed,
+        'created': sum(1 for r in results if r.success),
+        'with_icon': sum(1 for r in results if r.icon_path),
+        'shortcuts_per_sec': len(results) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'peak_rss_mb': peak_rss_mb(),
+        'mean_phase_ms': phases,
+    }
+
+
+def spawn_case(size: int, mode: str, server, mix, seed: int, timeout: float) -> dict:
+    """Register the case's scenarios on the server and run it in a child process."""
+    scenarios = assign_scenarios(size, mix, seed)
+    server.scenarios = {site_host(i): name for i, name in enumerate(scenarios)}
+
+    with tempfile.TemporaryDirectory(prefix='linkdrop-bench-') as workdir:
+        env = dict(os.environ)
+        env['LOCALAPPDATA'] = os.path.join(workdir, 'appdata')
+        env['LINKDROP_FAVICON_FALLBACK_URL'] = server.fallback_url()
+        env.setdefault('NO_PROXY', '*')
+
+        cmd = [
+            sys.executable, os.path.abspath(__file__), '--run-case',
+            '--sizes', str(size), '--modes', mode,
+            '--port', str(server.port), '--timeout', str(timeout),
+            '--workdir', workdir,
+        ]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Case {mode}/{size} failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def format_row(r: dict) -> str:
+    rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else "n/a"
+    return (
+        f"{r['mode']:<6} {r['size']:>6} {r['seconds']:>9.2f} {r['shortcuts_per_sec']:>10.1f} "
+        f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {rss:>9} {r['with_icon']:>6}"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark LinkDrop batch creation.")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument("--modes", nargs='+', choices=DEFAULT_MODES, default=DEFAULT_MODES)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Favicon request timeout used during the run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--run-case", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        result = run_case(args.sizes[0], args.modes[0], args.port, args.timeout, args.workdir)
+        print(json.dumps(result))
+        return 0
+
+    # Every site has its own 127.x.y.z address
+    server = start_server(bind=ALL_LOOPBACK, stall=args.timeout + 1.0)
+    print(f"Stand-in server on port {server.port}, favicon timeout {args.timeout}s")
+    print()
+    print(f"{'mode':<6} {'lines':>6} {'seconds':>9} {'per sec':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'peak MB':>9} {'icons':>6}")
+
+    results = []
+    try:
+        for size in args.sizes:
+            for mode in args.modes:
+                result = spawn_case(size, mode, server, args.mix, args.seed, args.timeout)
+                results.append(result)
+                print(format_row(result), flush=True)
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+LinkDrop Core Microbenchmarks
+
+Measures the text-processing functions that run on every batch line and
+every clipboard check, over generated corpora:
+
+    valid_urls     full http(s) URLs with paths and queries
+    bare_domains   domains without a scheme
+    junk_text      clipboard-style text that is not a URL
+    long_lines     very long URLs and names
+    unicode_names  names with accents, CJK, emoji and reserved characters
+    batch_lines    "Name | URL | Notes" lines built from the above
+
+For each function/corpus pair it records ops/sec (best of several
+repeats) and the mean peak bytes allocated per call (via tracemalloc).
+Results are compared against the baselines stored in
+benchmarks/baselines/core.json so regressions show up between commits.
+
+Usage:
+    python benchmarks/bench_core.py                  # compare to baseline
+    python benchmarks/bench_core.py --save-baseline  # record new baseline
+    python benchmarks/bench_core.py --filter sanitize --threshold 15
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from typing import Callable, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core import is_likely_url, validate_url, sanitize_filename, parse_batch_line
+from src.bulk import process_batch_lines
+
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baselines', 'core.json')
+CORPUS_SIZE = 2000
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 20.0  # percent slowdown reported as a regression
+MIN_TIME = 0.1  # seconds per timed repeat
+
+TLDS = ['com', 'org', 'net', 'io', 'dev', 'co.uk', 'de', 'ch', 'se', 'app', 'community']
+WORDS = ['notion', 'github', 'docs', 'project', 'wiki', 'monday', 'share', 'point',
+         'team', 'alpha', 'beta', 'build', 'status', 'portal', 'files', 'report']
+UNICODE_BITS = ['Café', 'Ünïcödé', 'Projekt Übersicht', '東京', 'データ', 'Заметки',
+                'Δοκιμή', '🚀 Launch', 'naïve résumé', 'ÆØÅ', 'عربى']
+RESERVED = '<>:"/\\|?*'
+
+
+def _domain(rng: random.Random) -> str:
+    labels = rng.sample(WORDS, rng.randint(1, 3))
+    return '.'.join(labels) + '.' + rng.choice(TLDS)
+
+
+def _path(rng: random.Random, segments: int) -> str:
+    return '/' + '/'.join(rng.choice(WORDS) + str(rng.randint(0, 999)) for _ in range(segments))
+
+
+def generate_corpora(size: int = CORPUS_SIZE, seed: int = 42) -> dict[str, list[str]]:
+    """
+    Build the deterministic benchmark corpora.
+
+    Args:
+        size: Number of entries per corpus
+        seed: Random seed (fixed so runs are comparable)
+
+    Returns:
+        Dict of corpus name -> list of strings
+    """
+    rng = random.Random(seed)
+    corpora: dict[str, list[str]] = {}
+
+    corpora['valid_urls'] = [
+        f"{rng.choice(['https', 'http'])}://{'www.' if rng.random() < 0.3 else ''}{_domain(rng)}"
+        f"{_path(rng, rng.randint(0, 4))}"
+        f"{'?id=' + str(rng.randint(1, 99999)) if rng.random() < 0.3 else ''}"
+        for _ in range(size)
+    ]
+
+    corpora['bare_domains'] = [
+        _domain(rng) + (_path(rng, 1) if rng.random() < 0.3 else '')
+        for _ in range(size)
+    ]
+
+    junk_alphabet = string.ascii_letters + string.digits + ' .,;:-_!?'
+    corpora['junk_text'] = [
+        ''.join(rng.choice(junk_alphabet) for _ in range(rng.randint(5, 80)))
+        for _ in range(size)
+    ]
+
+    corpora['long_lines'] = [
+        f"https://{_domain(rng)}{_path(rng, rng.randint(40, 120))}?q=" + 'x' * rng.randint(100, 1000)
+        for _ in range(size)
+    ]
+
+    corpora['unicode_names'] = [
+        ' '.join(rng.choice(UNICODE_BITS) for _ in range(rng.randint(1, 4)))
+        + rng.choice(['', ' ', '.', ' .. ', rng.choice(RESERVED), '\x07'])
+        for _ in range(size)
+    ]
+
+    corpora['batch_lines'] = [
+        f"  {rng.choice(corpora['unicode_names'])} | "
+        f"{rng.choice(corpora['valid_urls'] + corpora['bare_domains'])}"
+        f"{' | ' + rng.choice(WORDS) + ' notes' if rng.random() < 0.5 else ''}  "
+        for _ in range(size)
+    ]
+
+    return corpora
+
+
+def per_line_pipeline(line: str) -> None:
+    """The per-line path process_batch_lines() replaces, for comparison."""
+    name, url, notes = parse_batch_line(line)
+    if name and url:
+        is_valid, result = validate_url(url)
+        if is_valid:
+            sanitize_filename(name)
+
+
+# (function name, callable, corpora it runs on)
+BENCHMARKS: list[tuple[str, Callable, tuple[str, ...]]] = [
+    ('is_likely_url', is_likely_url,
+     ('valid_urls', 'bare_domains', 'junk_text', 'long_lines')),
+    ('validate_url', validate_url,
+     ('valid_urls', 'bare_domains', 'junk_text', 'long_lines')),
+    ('sanitize_filename', sanitize_filename,
+     ('unicode_names', 'junk_text', 'long_lines')),
+    ('parse_batch_line', parse_batch_line,
+     ('batch_lines', 'junk_text', 'long_lines')),
+    ('per_line_pipeline', per_line_pipeline,
+     ('batch_lines', 'long_lines')),
+]
+
+# Functions that take the whole corpus in one call; ops are corpus lines
+BULK_BENCHMARKS: list[tuple[str, Callable, tuple[str, ...]]] = [
+    ('process_batch_lines', process_batch_lines,
+     ('batch_lines', 'long_lines')),
+]
+
+
+def _time_loops(func: Callable, corpus: list[str], loops: int, bulk: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        if bulk:
+            func(corpus)
+        else:
+            for item in corpus:
+                func(item)
+    return time.perf_counter() - start
+
+
+def measure_ops(
+    func: Callable,
+    corpus: list[str],
+    repeats: int,
+    min_time: float = MIN_TIME,
+    bulk: bool = False
+) -> float:
+    """
+    Best-of-repeats items per second over the whole corpus.
+
+    The corpus is looped enough times that each repeat takes at least
+    min_time seconds, which keeps timer noise out of fast functions.
+    Bulk functions are called once per loop with the whole corpus.
+    """
+    loops = 1
+    while True:
+        elapsed = _time_loops(func, corpus, loops, bulk)
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        best = min(best, _time_loops(func, corpus, loops, bulk))
+    return loops * len(corpus) / best
+
+
+def measure_alloc(func: Callable, corpus: list[str], sample: int = 200, bulk: bool = False) -> float:
+    """Mean peak bytes allocated per item, over a sample of the corpus."""
+    items = corpus[:sample]
+    if bulk:
+        tracemalloc.start()
+        try:
+            func(items)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak / len(items) if items else 0.0
+
+    total = 0
+    tracemalloc.start()
+    try:
+        for item in items:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func(item)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / len(items) if items else 0.0
+
+
+def run_benchmarks(
+    corpora: dict[str, list[str]],
+    repeats: int = DEFAULT_REPEATS,
+    name_filter: Optional[str] = None
+) -> dict[str, dict]:
+    """
+    Run every registered benchmark.
+
+    Returns:
+        Dict of "function/corpus" -> {'ops_per_sec': ..., 'alloc_bytes': ...}
+    """
+    results = {}
+    suites = [(entry, False) for entry in BENCHMARKS] + [(entry, True) for entry in BULK_BENCHMARKS]
+    for (name, func, corpus_names), bulk in suites:
+        for corpus_name in corpus_names:
+            key = f"{name}/{corpus_name}"
+            if name_filter and name_filter not in key:
+                continue
+            corpus = corpora[corpus_name]
+            results[key] = {
+                'ops_per_sec': round(measure_ops(func, corpus, repeats, bulk=bulk), 1),
+                'alloc_bytes': round(measure_alloc(func, corpus, bulk=bulk), 1),
+            }
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    """Load stored baselines, or an empty dict if there are none."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_baseline(results: dict[str, dict], path: str = BASELINE_PATH) -> None:
+    """Store results as the new baseline, merging with existing entries."""
+    data = load_baseline(path)
+    data.setdefault('results', {}).update(results)
+    data['meta'] = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(terse=True),
+        'corpus_size': CORPUS_SIZE,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def report(results: dict[str, dict], baseline: dict, threshold: float) -> int:
+    """
+    Print results next to the baseline.
+
+    Returns:
+        Number of regressions slower than the threshold
+    """
+    base_results = baseline.get('results', {})
+    regressions = 0
+
+    print(f"{'benchmark':<36} {'ops/sec':>12} {'bytes/op':>10} {'baseline':>12} {'change':>8}")
+    for key, r in results.items():
+        base = base_results.get(key)
+        if base:
+            change = (r['ops_per_sec'] / base['ops_per_sec'] - 1) * 100
+            flag = ''
+            if change < -threshold:
+                regressions += 1
+                flag = '  REGRESSION'
+            base_text = f"{base['ops_per_sec']:>12,.0f}"
+            change_text = f"{change:>+7.1f}%{flag}"
+        else:
+            base_text = f"{'-':>12}"
+            change_text = f"{'new':>8}"
+        print(f"{key:<36} {r['ops_per_sec']:>12,.0f} {r['alloc_bytes']:>10,.0f} {base_text} {change_text}")
+
+    meta = baseline.get('meta')
+    if meta:
+        print(f"\nBaseline: commit {meta.get('commit')}, Python {meta.get('python')}, {meta.get('platform')}")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for LinkDrop core functions.")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Slowdown (%%) counted as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the new baseline")
+    parser.add_argument("--json", help="Write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    corpora = generate_corpora()
+    results = run_benchmarks(corpora, repeats=args.repeats, name_filter=args.filter)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        report(results, {}, args.threshold)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    regressions = report(results, load_baseline(args.baseline), args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
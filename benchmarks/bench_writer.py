@@ -0,0 +1,118 @@
+"""
+LinkDrop Writer Benchmark
+
+Measures shortcut writes to a simulated network share. LatencyFileOps
+(src/writer.py) delays every file create by --latency milliseconds and
+fails a --failure-rate fraction of them with a transient error, so the
+behavior of a slow SMB share can be reproduced on any machine.
+
+Cases, each writing --count files into a fresh temporary folder:
+
+    sequential   one write after another (the old behavior)
+    submit       ShortcutWriter.submit() from a single thread
+    batch        execute_stream() with --workers threads and the writer
+
+Reported per case: files/sec, retries and failures.
+
+Usage:
+    python benchmarks/bench_writer.py
+    python benchmarks/bench_writer.py --count 2000 --latency 40 --per-share 16
+    python benchmarks/bench_writer.py --failure-rate 0.05
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from typing import Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.core import LinkURL, build_shortcut_content
+from src.batch import plan_rows, execute_stream
+from src.writer import DEFAULT_DESTINATION_CONCURRENCY, LatencyFileOps, ShortcutWriter
+
+
+DEFAULT_COUNT = 500
+DEFAULT_LATENCY_MS = 40
+DEFAULT_WORKERS = 16
+
+
+def make_writer(args) -> ShortcutWriter:
+    file_ops = LatencyFileOps(args.latency / 1000, failure_rate=args.failure_rate, seed=args.seed)
+    return ShortcutWriter(concurrency=args.per_share, retry_delay=0.01, file_ops=file_ops)
+
+
+def case_sequential(args, folder: str) -> ShortcutWriter:
+    writer = make_writer(args)
+    content = build_shortcut_content(LinkURL.parse("https://example.com"))
+    for i in range(args.count):
+        try:
+            writer.file_ops.write(os.path.join(folder, f"Site {i}.url"), content)
+        except OSError:
+            pass
+    return writer
+
+
+def case_submit(args, folder: str) -> ShortcutWriter:
+    content = build_shortcut_content(LinkURL.parse("https://example.com"))
+    with make_writer(args) as writer:
+        for i in range(args.count):
+            writer.submit(os.path.join(folder, f"Site {i}.url"), content)
+    return writer
+
+
+def case_batch(args, folder: str) -> ShortcutWriter:
+    writer = make_writer(args)
+    plan = plan_rows([(f"Site {i}", f"https://example{i % 50}.com/{i}") for i in range(args.count)])
+    for _ in execute_stream(plan.entries, folder, fetch_icons=False, workers=args.workers, writer=writer):
+        pass
+    return writer
+
+
+CASES = {
+    'sequential': case_sequential,
+    'submit': case_submit,
+    'batch': case_batch,
+}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark shortcut writes to a simulated network share.")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Files per case")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_MS, help="Milliseconds per file create")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of creates failing transiently")
+    parser.add_argument("--per-share", type=int, default=DEFAULT_DESTINATION_CONCURRENCY)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Batch workers (batch case)")
+    parser.add_argument("--cases", nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print(f"{args.count} files, {args.latency:.0f} ms per create, {args.per_share} per share, "
+          f"failure rate {args.failure_rate:.0%}")
+    print(f"{'case':<12} {'files/s':>9} {'seconds':>8} {'retries':>8} {'failed':>7}")
+
+    for name in args.cases:
+        folder = tempfile.mkdtemp(prefix="linkdrop-writer-")
+        try:
+            start = time.perf_counter()
+            writer = CASES[name](args, folder)
+            elapsed = time.perf_counter() - start
+            files = len(os.listdir(folder))
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+        stats = writer.stats()
+        retries = sum(s.retries for s in stats)
+        failed = sum(s.failures for s in stats) if name != 'sequential' else args.count - files
+        print(f"{name:<12} {files / elapsed:>9.1f} {elapsed:>8.2f} {retries:>8} {failed:>7}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
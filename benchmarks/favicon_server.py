@@ -0,0 +1,273 @@
+"""
+LinkDrop Stand-in Favicon Server
+
+A local HTTP server that imitates the websites and favicon service that
+fetch_favicon() talks to, so batch throughput can be measured without
+touching the real internet.
+
+Every site is identified by its Host header. The benchmark gives each
+site its own loopback address (127.x.y.z), which also gives each one its
+own icon cache entry, and registers a scenario for it:
+
+    icon       /favicon.ico returns an icon
+    redirect   /favicon.ico redirects to /static/favicon.ico
+    html       /favicon.ico is missing, / returns an HTML head with <link rel="icon">
+    slow       /favicon.ico answers after a delay
+    timeout    /favicon.ico stalls past the client timeout
+    404        every site path returns 404 (the fallback service answers)
+    oversized  /favicon.ico returns a large non-image body
+    missing    404 from the site and from the fallback service
+
+For the link checker, pages (any path but the icon paths) can also be:
+
+    moved      pages answer 301 to the same path under /new/
+    gone       pages answer 404
+    nohead     HEAD requests answer 405; GET works
+
+The fallback service lives at /s2/favicons?domain=<host> on the same
+server; set LINKDROP_FAVICON_FALLBACK_URL to fallback_url() to use it.
+
+The server binds 127.0.0.1 unless told otherwise. Answering on every
+loopback address takes the wildcard address (bind=ALL_LOOPBACK); even
+then, only clients on this machine are served.
+
+Usage:
+    python benchmarks/favicon_server.py --port 8765
+    python benchmarks/favicon_server.py --bind 0.0.0.0   # sites on 127.x.y.z too
+"""
+
+import sys
+import time
+import argparse
+import ipaddress
+import threading
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+from PIL import Image
+
+
+SCENARIOS = (
+    'icon', 'redirect', 'html', 'slow', 'timeout', '404', 'oversized', 'missing',
+    'moved', 'gone', 'nohead'
+)
+
+DEFAULT_SLOW_DELAY = 0.2
+DEFAULT_STALL = 3.0
+DEFAULT_OVERSIZED_BYTES = 8 * 1024 * 1024
+
+DEFAULT_BIND = '127.0.0.1'
+ALL_LOOPBACK = '0.0.0.0'  # Wildcard bind; verify_request() still refuses other machines
+
+
+def make_icon(size: int = 32, fmt: str = 'ICO') -> bytes:
+    """
+    Render a solid-color test icon.
+
+    Args:
+        size: Width and height in pixels
+        fmt: Pillow format name ('ICO' or 'PNG')
+
+    Returns:
+        Encoded image bytes
+    """
+    img = Image.new('RGBA', (size, size), (78, 205, 196, 255))
+    buf = BytesIO()
+    if fmt == 'ICO':
+        img.save(buf, format='ICO', sizes=[(size, size)])
+    else:
+        img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class FaviconServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the scenario table and canned bodies."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        icon_size: int = 32,
+        fallback_size: int = 256,
+        slow_delay: float = DEFAULT_SLOW_DELAY,
+        stall: float = DEFAULT_STALL,
+        oversized_bytes: int = DEFAULT_OVERSIZED_BYTES,
+        default_scenario: str = 'icon'
+    ):
+        super().__init__(address, FaviconHandler)
+        self.scenarios: dict[str, str] = {}
+        self.default_scenario = default_scenario
+        self.slow_delay = slow_delay
+        self.stall = stall
+        self.oversized_body = b'\x7f' * oversized_bytes
+        self.site_icon = make_icon(icon_size, 'ICO')
+        self.fallback_icon = make_icon(fallback_size, 'PNG')
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def verify_request(self, request, client_address) -> bool:
+        # Bound to the wildcard address for the 127.x.y.z sites; still local only
+        return ipaddress.ip_address(client_address[0]).is_loopback
+
+    def scenario_for(self, host: str) -> str:
+        """Look up the scenario registered for a host (with or without port)."""
+        name = host.split(':')[0]
+        return self.scenarios.get(name, self.default_scenario)
+
+    def fallback_url(self) -> str:
+        """Template suitable for LINKDROP_FAVICON_FALLBACK_URL."""
+        return f"http://127.0.0.1:{self.port}/s2/favicons?domain={{domain}}&sz=256"
+
+    def count_request(self) -> None:
+        with self._count_lock:
+            self.request_count += 1
+
+
+class FaviconHandler(BaseHTTPRequestHandler):
+    """Serves site pages, favicons and the fallback service per scenario."""
+
+    protocol_version = 'HTTP/1.1'
+    server: FaviconServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = 'text/plain',
+              headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        self.server.count_request()
+        parsed = urlparse(self.path)
+
+        if parsed.path == '/s2/favicons':
+            domain = parse_qs(parsed.query).get('domain', [''])[0]
+            self._serve_fallback(domain)
+            return
+
+        host = self.headers.get('Host', '')
+        self._serve_site(self.server.scenario_for(host), parsed.path)
+
+    def _serve_fallback(self, domain: str) -> None:
+        if self.server.scenario_for(domain) == 'missing':
+            self._send(404, b'not found')
+        else:
+            self._send(200, self.server.fallback_icon, 'image/png')
+
+    def _serve_site(self, scenario: str, path: str) -> None:
+        server = self.server
+
+        if path == '/static/favicon.ico':
+            self._send(200, server.site_icon, 'image/x-icon')
+            return
+
+        if path != '/favicon.ico':
+            if scenario == 'moved' and not path.startswith('/new/'):
+                self._send(301, headers={'Location': '/new' + path})
+                return
+            if scenario == 'gone':
+                self._send(404, b'not found')
+                return
+            if scenario == 'nohead' and self.command == 'HEAD':
+                self._send(405, b'method not allowed')
+                return
+            # Any other path is a page; html sites advertise their icon in <head>
+            head = '<link rel="icon" href="/static/favicon.ico">' if scenario == 'html' else ''
+            body = f'<html><head><title>Stand-in</title>{head}</head><body></body></html>'
+            self._send(200, body.encode(), 'text/html')
+            return
+
+        if scenario == 'icon':
+            self._send(200, server.site_icon, 'image/x-icon')
+        elif scenario == 'redirect':
+            self._send(302, headers={'Location': '/static/favicon.ico'})
+        elif scenario == 'slow':
+            time.sleep(server.slow_delay)
+            self._send(200, server.site_icon, 'image/x-icon')
+        elif scenario == 'timeout':
+            time.sleep(server.stall)
+            self._send(200, server.site_icon, 'image/x-icon')
+        elif scenario == 'oversized':
+            self._send(200, server.oversized_body, 'image/x-icon')
+        else:
+            # html, 404 and missing have no /favicon.ico
+            self._send(404, b'not found')
+
+
+def start_server(port: int = 0, bind: str = DEFAULT_BIND, **kwargs) -> FaviconServer:
+    """
+    Start the stand-in server on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        bind: Address to bind; ALL_LOOPBACK to answer on every loopback
+            address (127.0.0.0/8), which the benchmark uses as distinct
+            sites
+        **kwargs: Passed through to FaviconServer
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    server = FaviconServer((bind, port), **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def site_host(index: int) -> str:
+    """Loopback address used for the site with the given index (0-based)."""
+    # Sites live in 127.1.0.0 and up so they never collide with 127.0.0.1,
+    # which hosts the fallback service; .0 and .255 are skipped
+    block, offset = divmod(index, 254)
+    return f"127.{1 + (block >> 8)}.{block & 0xff}.{offset + 1}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the LinkDrop stand-in favicon server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bind", default=DEFAULT_BIND,
+                        help=f"Address to listen on; {ALL_LOOPBACK} also answers site_host() addresses")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="icon",
+                        help="Scenario for hosts without an explicit mapping")
+    parser.add_argument("--slow-delay", type=float, default=DEFAULT_SLOW_DELAY)
+    parser.add_argument("--stall", type=float, default=DEFAULT_STALL)
+    args = parser.parse_args()
+
+    server = FaviconServer(
+        (args.bind, args.port),
+        slow_delay=args.slow_delay,
+        stall=args.stall,
+        default_scenario=args.scenario
+    )
+    print(f"Serving on port {server.port}")
+    print(f"LINKDROP_FAVICON_FALLBACK_URL={server.fallback_url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,18 @@ def check_pyinstaller() -> bool:
         return False
 
 
+def get_cli_hidden_imports(project_root: Path) -> list[str]:
+    """
+    Modules that linkdrop.exe loads by name for its external commands.
+
+    cli.py imports them with importlib, which PyInstaller can't follow,
+    so they are read from EXTERNAL_COMMANDS and passed as hidden imports.
+    """
+    sys.path.insert(0, str(project_root))
+    from src.cli import EXTERNAL_COMMANDS
+    return sorted({module for module, _ in EXTERNAL_COMMANDS.values()})
+
+
 def convert_icon(project_root: Path) -> Path | None:
     """
     Convert PNG icon to ICO if needed.
@@ -104,7 +116,9 @@ def build_executable(
     onefile: bool = True,
     windowed: bool = True,
     console: bool = False,
-    uac_admin: bool = False
+    uac_admin: bool = False,
+    data_files: list[tuple[Path, str]] | None = None,
+    hidden_imports: list[str] | None = None
 ) -> bool:
     """
     Build a single executable using PyInstaller.
@@ -118,6 +132,8 @@ def build_executable(
         windowed: Hide console window (GUI app)
         console: Show console window
         uac_admin: Request admin privileges via UAC
+        data_files: (source file, destination folder) pairs to bundle
+        hidden_imports: Modules to bundle that aren't imported statically
 
     Returns:
         True if build succeeded
@@ -151,6 +167,12 @@ def build_executable(
         # Bundle the icon file so it can be used at runtime
         cmd.append(f"--add-data={icon_path};.")
 
+    for source, dest in data_files or []:
+        cmd.append(f"--add-data={source};{dest}")
+
+    for module in hidden_imports or []:
+        cmd.append(f"--hidden-import={module}")
+
     cmd.append(str(script_path))
 
     try:
@@ -191,6 +213,9 @@ def main():
         # Also copy as LinkDrop.ico for the title bar icon
         shutil.copy(icon_path, dist_dir / "LinkDrop.ico")
 
+    # Data files needed at runtime by src/ modules
+    app_data_files = [(src_dir / "data" / "public_suffix_list.dat", "src/data")]
+
     # Build main application
     main_script = src_dir / "gui_main.py"
     if not main_script.exists():
@@ -203,7 +228,8 @@ def main():
         icon_path=icon_path,
         dist_dir=dist_dir,
         onefile=True,
-        windowed=True
+        windowed=True,
+        data_files=app_data_files
     )
 
     # Build quick popup
@@ -218,7 +244,26 @@ def main():
         icon_path=icon_path,
         dist_dir=dist_dir,
         onefile=True,
-        windowed=True
+        windowed=True,
+        data_files=app_data_files
+    )
+
+    # Build command-line tool (console, no GUI dependencies)
+    cli_script = src_dir / "cli.py"
+    if not cli_script.exists():
+        print(f"Error: {cli_script} not found")
+        sys.exit(1)
+
+    success_cli = build_executable(
+        script_path=cli_script,
+        name="linkdrop",
+        icon_path=icon_path,
+        dist_dir=dist_dir,
+        onefile=True,
+        windowed=False,
+        console=True,
+        data_files=app_data_files,
+        hidden_imports=get_cli_hidden_imports(project_root)
     )
 
     # Build unified installer (with UAC auto-elevation)
@@ -272,6 +317,13 @@ def main():
             size_mb = quick_exe.stat().st_size / (1024 * 1024)
             print(f"  Size: {size_mb:.1f} MB")
 
+    if success_cli:
+        cli_exe = dist_dir / "linkdrop.exe"
+        print(f"linkdrop.exe: {cli_exe}")
+        if cli_exe.exists():
+            size_mb = cli_exe.stat().st_size / (1024 * 1024)
+            print(f"  Size: {size_mb:.1f} MB")
+
     if success3:
         install_exe = dist_dir / "Install_LinkDrop.exe"
         print(f"Install_LinkDrop.exe: {install_exe}")
@@ -286,7 +338,7 @@ def main():
             size_mb = uninstall_exe.stat().st_size / (1024 * 1024)
             print(f"  Size: {size_mb:.1f} MB")
 
-    all_success = success1 and success2 and success3 and success4
+    all_success = success1 and success2 and success_cli and success3 and success4
 
     if all_success:
         print()
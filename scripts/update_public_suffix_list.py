@@ -0,0 +1,101 @@
+"""
+Update the Bundled Public Suffix List
+
+Downloads the Public Suffix List (or reads a local copy) and writes the
+compact rule file used by src/psl.py: comments and blank lines removed,
+one rule per line, with punycode forms added for internationalized rules.
+
+Only the ICANN section is bundled by default. The PRIVATE section lists
+hosting platforms (github.io, blogspot.com, ...) whose bare names are
+still perfectly good URLs to paste; --include-private adds it anyway.
+
+Usage:
+    python scripts/update_public_suffix_list.py
+    python scripts/update_public_suffix_list.py --source /usr/share/publicsuffix/public_suffix_list.dat
+    python scripts/update_public_suffix_list.py --include-private
+"""
+
+import sys
+import argparse
+import urllib.request
+from pathlib import Path
+
+
+PSL_URL = "https://publicsuffix.org/list/public_suffix_list.dat"
+PRIVATE_SECTION_MARKER = "===BEGIN PRIVATE DOMAINS==="
+
+
+def get_project_root() -> Path:
+    """Get the project root directory."""
+    return Path(__file__).parent.parent
+
+
+def to_ascii(rule: str) -> str | None:
+    """Punycode form of a rule, or None if it is already ASCII or can't be encoded."""
+    if rule.isascii():
+        return None
+
+    prefix = ''
+    if rule.startswith('!'):
+        prefix, rule = '!', rule[1:]
+    elif rule.startswith('*.'):
+        prefix, rule = '*.', rule[2:]
+
+    try:
+        return prefix + rule.encode('idna').decode('ascii')
+    except UnicodeError:
+        return None
+
+
+def compact_rules(text: str, include_private: bool = False) -> list[str]:
+    """Extract rules from the PSL text, adding punycode variants."""
+    rules = []
+    seen = set()
+    for line in text.splitlines():
+        line = line.strip()
+        if PRIVATE_SECTION_MARKER in line and not include_private:
+            break
+        if not line or line.startswith('//'):
+            continue
+        rule = line.split()[0].lower()
+        for variant in (rule, to_ascii(rule)):
+            if variant and variant not in seen:
+                seen.add(variant)
+                rules.append(variant)
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the bundled Public Suffix List.")
+    parser.add_argument("--source", help="Read the list from this file instead of downloading it")
+    parser.add_argument(
+        "--include-private",
+        action="store_true",
+        help="Also bundle the PRIVATE section (makes bare github.io, blogspot.com, ... non-URLs)"
+    )
+    args = parser.parse_args()
+
+    if args.source:
+        text = Path(args.source).read_text(encoding='utf-8')
+        origin = args.source
+    else:
+        print(f"Downloading {PSL_URL}...")
+        with urllib.request.urlopen(PSL_URL, timeout=30) as response:
+            text = response.read().decode('utf-8')
+        origin = PSL_URL
+
+    rules = compact_rules(text, args.include_private)
+
+    output = get_project_root() / "src" / "data" / "public_suffix_list.dat"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8', newline='\n') as f:
+        f.write("// Compacted from the Public Suffix List (https://publicsuffix.org/), MPL 2.0.\n")
+        f.write("// Regenerate with scripts/update_public_suffix_list.py\n")
+        f.write('\n'.join(rules) + '\n')
+
+    print(f"Wrote {len(rules)} rules from {origin} to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
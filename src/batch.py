@@ -0,0 +1,902 @@
+"""
+LinkDrop Batch Planning
+
+Turns batch input into a plan before any network or disk work starts:
+
+- URLs are canonicalized so that trivially different spellings of the
+  same address (HTTPS://Example.com:443 and https://example.com/) are
+  recognized as one.
+- Rows that repeat an earlier row (same canonical URL, same filename)
+  are skipped instead of being written twice.
+- Rows whose names sanitize to the same filename as an earlier row, but
+  point somewhere else, are resolved with a collision policy:
+
+      suffix  "Name (2).url", "Name (3).url", ...   (default)
+      skip    keep the first row, skip the others
+      error   refuse to run the batch
+
+- Rows are grouped by icon cache key so every domain's favicon is
+  fetched at most once per batch.
+
+Callers can inspect the plan (to show a preview or a warning) and then
+hand it to execute_plan(). For inputs too large to hold in memory,
+stream_batch() plans and creates shortcuts chunk by chunk and yields
+each result as it finishes.
+
+Existing files are looked up in a DirectorySnapshot: one os.scandir()
+per folder instead of a stat per row, which matters on network shares
+where every metadata call is a round trip.
+"""
+
+import sys
+import os
+import re
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from queue import SimpleQueue
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import metrics
+from src.core import (
+    LinkURL, ShortcutResult, ShortcutTimings, MAX_FILENAME_LENGTH,
+    create_url_shortcut, fetch_favicon, sanitize_filename, timings_enabled
+)
+from src.bulk import process_batch_lines, OK, ERR_FORMAT
+from src.writer import ShortcutWriter
+
+
+# Collision policies
+COLLISION_SUFFIX = "suffix"
+COLLISION_SKIP = "skip"
+COLLISION_ERROR = "error"
+COLLISION_POLICIES = (COLLISION_SUFFIX, COLLISION_SKIP, COLLISION_ERROR)
+
+# Planned actions
+ACTION_CREATE = "create"
+ACTION_SKIP = "skip"      # Duplicate row, or a collision under the skip policy
+ACTION_ERROR = "error"    # Invalid URL, or a collision under the error policy
+
+# What to do when a planned file already exists on disk
+OVERWRITE_REPLACE = "replace"
+OVERWRITE_SKIP = "skip"
+OVERWRITE_ERROR = "error"
+OVERWRITE_POLICIES = (OVERWRITE_REPLACE, OVERWRITE_SKIP, OVERWRITE_ERROR)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+DEFAULT_WORKERS = 8
+DEFAULT_CHUNK_SIZE = 1000   # Lines validated per process_batch_lines() call
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class BatchPlanError(ValueError):
+    """Raised when a plan can't be executed (collisions under the error policy)."""
+
+
+@dataclass
+class PlannedShortcut:
+    """One row of a batch plan."""
+    line_number: int                       # 0-based index into the input
+    name: str                              # Name as entered
+    filename: str                          # Final filename without .url
+    url: str                               # Normalized URL (what gets written)
+    notes: Optional[str] = None
+    action: str = ACTION_CREATE
+    error: Optional[str] = None            # Why the row is skipped or failed
+    canonical_url: Optional[str] = None
+    cache_key: Optional[str] = None
+    link: Optional[LinkURL] = field(default=None, repr=False)
+    folder: str = ""                       # Subdirectory relative to the save folder
+
+    @property
+    def relative_path(self) -> str:
+        """Path of the .url file relative to the save folder."""
+        return os.path.join(self.folder, f"{self.filename}.url") if self.folder else f"{self.filename}.url"
+
+
+@dataclass
+class BatchPlan:
+    """The planned outcome of a batch, before anything is written."""
+    entries: list[PlannedShortcut] = field(default_factory=list)
+    policy: str = COLLISION_SUFFIX
+    duplicates: int = 0       # Rows that repeat an earlier row
+    collisions: int = 0       # Rows whose filename was taken by a different URL
+    renamed: int = 0          # Collisions resolved with a suffix
+    icon_groups: dict[str, list[int]] = field(default_factory=dict)  # cache key -> entry indexes
+
+    def count(self, action: str) -> int:
+        """Count entries with the given action."""
+        return sum(1 for e in self.entries if e.action == action)
+
+    @property
+    def to_create(self) -> list[PlannedShortcut]:
+        return [e for e in self.entries if e.action == ACTION_CREATE]
+
+    @property
+    def has_conflicts(self) -> bool:
+        """True if the error policy found collisions (the plan can't run)."""
+        return self.policy == COLLISION_ERROR and self.collisions > 0
+
+    def to_dict(self) -> dict:
+        """Return the plan as a JSON-serializable dict."""
+        return {
+            'summary': {
+                'rows': len(self.entries),
+                'create': self.count(ACTION_CREATE),
+                'skip': self.count(ACTION_SKIP),
+                'error': self.count(ACTION_ERROR),
+                'duplicates': self.duplicates,
+                'collisions': self.collisions,
+                'renamed': self.renamed,
+                'domains': len(self.icon_groups),
+                'policy': self.policy,
+            },
+            'entries': [
+                {
+                    'line': e.line_number + 1,
+                    'name': e.name,
+                    'folder': e.folder,
+                    'filename': e.filename,
+                    'url': e.url,
+                    'action': e.action,
+                    'error': e.error,
+                }
+                for e in self.entries
+            ],
+        }
+
+
+def canonical_url(link: LinkURL) -> str:
+    """
+    Canonical form of a URL, for duplicate detection only.
+
+    Lowercases the scheme and host, drops the default port and spells an
+    empty path as "/". Path, query and fragment are kept as they are.
+
+    Args:
+        link: A validated URL
+
+    Returns:
+        The canonical URL string
+    """
+    parts = urlsplit(link.url)
+
+    host = link.host
+    if ':' in host:
+        host = f'[{host}]'
+    userinfo = link.netloc.rpartition('@')[0]
+    netloc = f'{userinfo}@{host}' if userinfo else host
+    if link.port is not None and link.port != DEFAULT_PORTS.get(link.scheme):
+        netloc += f':{link.port}'
+
+    canonical = f'{link.scheme}://{netloc}{parts.path or "/"}'
+    if parts.query:
+        canonical += '?' + parts.query
+    if parts.fragment:
+        canonical += '#' + parts.fragment
+    return canonical
+
+
+def folder_path(parts: Iterable[str]) -> str:
+    """
+    Turn folder names into a relative directory path.
+
+    Each name is sanitized like a filename; empty names are dropped.
+
+    Args:
+        parts: Folder names, outermost first
+
+    Returns:
+        Relative path such as "Work\\Projects", or "" for the save folder itself
+    """
+    names = [sanitize_filename(p) for p in parts if p and p.strip()]
+    return os.path.join(*names) if names else ""
+
+
+def _suffixed(filename: str, number: int) -> str:
+    """filename plus " (n)", trimmed to stay within MAX_FILENAME_LENGTH."""
+    suffix = f' ({number})'
+    return filename[:MAX_FILENAME_LENGTH - len(suffix)].rstrip(' .') + suffix
+
+
+class _Planner:
+    """
+    Resolves duplicates and collisions as rows arrive.
+
+    Only names, canonical URLs and line numbers are remembered, so a
+    streaming run holds one small dict entry per distinct row rather
+    than the rows themselves. When record is True (plan_batch and
+    plan_rows) the entries are also collected into self.plan.
+    """
+
+    def __init__(self, policy: str, record: bool = True):
+        if policy not in COLLISION_POLICIES:
+            raise ValueError(f"Unknown collision policy: {policy}")
+        self.plan = BatchPlan(policy=policy)
+        self.record = record
+        self.claimed: dict[tuple, tuple] = {}  # lowercased (folder, filename) -> (line number, filename)
+        self.seen: dict[tuple, int] = {}       # lowercased (folder, filename as entered), canonical URL -> line number
+
+    def add_invalid(
+        self,
+        line_number: int,
+        name: str,
+        url: str,
+        notes: Optional[str],
+        error: str,
+        folder: str = "",
+        filename: Optional[str] = None
+    ) -> PlannedShortcut:
+        entry = PlannedShortcut(
+            line_number, name, filename or sanitize_filename(name), url, notes,
+            action=ACTION_ERROR, error=error, folder=folder
+        )
+        if self.record:
+            self.plan.entries.append(entry)
+        return entry
+
+    def add(
+        self,
+        line_number: int,
+        name: str,
+        filename: str,
+        link: LinkURL,
+        notes: Optional[str],
+        folder: str = ""
+    ) -> PlannedShortcut:
+        plan = self.plan
+        entry = PlannedShortcut(
+            line_number, name, filename, link.url, notes,
+            canonical_url=canonical_url(link), cache_key=link.cache_key, link=link, folder=folder
+        )
+
+        # Windows paths are case-insensitive
+        folder_key = folder.lower()
+        name_key = (folder_key, filename.lower())
+        first = self.seen.get((name_key, entry.canonical_url))
+        if first is not None:
+            plan.duplicates += 1
+            entry.action = ACTION_SKIP
+            entry.error = f"Duplicate of line {first + 1}"
+        else:
+            self.seen[(name_key, entry.canonical_url)] = line_number
+            owner = self.claimed.get(name_key)
+            if owner is not None:
+                plan.collisions += 1
+                self._resolve_collision(entry, owner)
+
+        if entry.action == ACTION_CREATE:
+            self.claimed[(folder_key, entry.filename.lower())] = (line_number, entry.filename)
+            if self.record:
+                plan.icon_groups.setdefault(entry.cache_key, []).append(len(plan.entries))
+
+        if self.record:
+            plan.entries.append(entry)
+        return entry
+
+    def _resolve_collision(self, entry: PlannedShortcut, owner: tuple) -> None:
+        policy = self.plan.policy
+        owner_line, owner_filename = owner
+        taken = f"'{owner_filename}.url' is already used by line {owner_line + 1}"
+
+        if policy == COLLISION_SKIP:
+            entry.action = ACTION_SKIP
+            entry.error = f"Name collision: {taken}"
+        elif policy == COLLISION_ERROR:
+            entry.action = ACTION_ERROR
+            entry.error = f"Name collision: {taken}"
+        else:
+            folder_key = entry.folder.lower()
+            number = 2
+            while (folder_key, _suffixed(entry.filename, number).lower()) in self.claimed:
+                number += 1
+            entry.filename = _suffixed(entry.filename, number)
+            self.plan.renamed += 1
+
+    def add_columns(self, columns, offset: int = 0) -> Iterator[PlannedShortcut]:
+        """Plan every well-formed row of a process_batch_lines() result."""
+        for row, code in enumerate(columns.errors):
+            if code == ERR_FORMAT:
+                continue
+
+            line_number = columns.line_numbers[row] + offset
+            name = columns.names[row]
+            notes = columns.notes[row]
+            folders = columns.folders[row]
+            folder = folder_path(folders) if folders else ""
+
+            if code != OK:
+                # In the batch format, separators in a name are folders
+                filename = sanitize_filename(re.split(r'[\\/]', name)[-1]) if folders else None
+                yield self.add_invalid(
+                    line_number, name, columns.urls[row], notes, columns.error_message(row), folder, filename
+                )
+            else:
+                yield self.add(line_number, name, columns.filenames[row], columns.links[row], notes, folder)
+
+
+def plan_batch(lines: Union[str, Iterable[str]], policy: str = COLLISION_SUFFIX) -> BatchPlan:
+    """
+    Plan a batch from "Name | URL | Notes" lines.
+
+    Blank lines, comments and lines that aren't in the batch format are
+    left out of the plan, as create_batch_shortcuts() always did.
+
+    Args:
+        lines: Batch text, or an iterable of lines
+        policy: Collision policy ('suffix', 'skip' or 'error')
+
+    Returns:
+        The BatchPlan
+    """
+    if isinstance(lines, str):
+        lines = lines.split('\n')
+
+    planner = _Planner(policy)
+    for _ in planner.add_columns(process_batch_lines(lines)):
+        pass
+    return planner.plan
+
+
+def _plan_rows(planner: _Planner, rows: Iterable[tuple]) -> Iterator[PlannedShortcut]:
+    for index, row in enumerate(rows):
+        name, url = row[0].strip(), row[1].strip()
+        notes = row[2] if len(row) > 2 else None
+        folder = folder_path(row[3]) if len(row) > 3 and row[3] else ""
+        try:
+            link = LinkURL.parse(url)
+        except ValueError as e:
+            yield planner.add_invalid(index, name, url, notes, str(e), folder)
+            continue
+        yield planner.add(index, name, sanitize_filename(name), link, notes, folder)
+
+
+def plan_rows(
+    rows: Iterable[tuple],
+    policy: str = COLLISION_SUFFIX
+) -> BatchPlan:
+    """
+    Plan a batch from (name, url[, notes[, folders]]) tuples.
+
+    Used by the GUI, whose rows are already split into fields (names may
+    legitimately contain '|'), and by the importers. folders is a
+    sequence of folder names, outermost first, that become
+    subdirectories of the save folder.
+
+    Args:
+        rows: Row tuples
+        policy: Collision policy ('suffix', 'skip' or 'error')
+
+    Returns:
+        The BatchPlan
+    """
+    planner = _Planner(policy)
+    for _ in _plan_rows(planner, rows):
+        pass
+    return planner.plan
+
+
+def iter_plan_rows(rows: Iterable[tuple], policy: str = COLLISION_SUFFIX) -> Iterator[PlannedShortcut]:
+    """
+    Plan row tuples lazily; the streaming counterpart of plan_rows().
+
+    Args:
+        rows: (name, url[, notes[, folders]]) tuples
+        policy: Collision policy ('suffix', 'skip' or 'error'); see iter_plan()
+
+    Yields:
+        PlannedShortcut for each row, in input order
+    """
+    yield from _plan_rows(_Planner(policy, record=False), rows)
+
+
+def iter_plan(
+    lines: Union[str, Iterable[str]],
+    policy: str = COLLISION_SUFFIX,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[PlannedShortcut]:
+    """
+    Plan a batch lazily, one chunk of lines at a time.
+
+    Same rules as plan_batch(), except that under the error policy a
+    collision fails only the colliding row: a stream can't be refused
+    as a whole before its end is known.
+
+    Args:
+        lines: Batch text, an iterable of lines, or an open file
+        policy: Collision policy ('suffix', 'skip' or 'error')
+        chunk_size: Lines validated per process_batch_lines() call
+
+    Yields:
+        PlannedShortcut for each well-formed row, in input order
+    """
+    if isinstance(lines, str):
+        lines = lines.split('\n')
+
+    planner = _Planner(policy, record=False)
+    lines = iter(lines)
+    offset = 0
+
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            break
+        yield from planner.add_columns(process_batch_lines(chunk), offset)
+        offset += len(chunk)
+
+
+class DirectorySnapshot:
+    """
+    The .url files already in a save folder, listed once with os.scandir().
+
+    Subfolders are listed the first time a row needs them. Names are
+    compared case-insensitively, like Windows does. The snapshot is
+    updated as shortcuts are created and is safe to share between
+    worker threads.
+
+    A folder that can't be listed (access denied, share unreachable) is
+    remembered with its error, which every row for that folder reports.
+    """
+
+    def __init__(self, save_dir: str):
+        self.save_dir = os.path.normpath(save_dir)
+        self._lock = threading.Lock()
+        self._folders: dict[str, Optional[set[str]]] = {}  # folder key -> lowercased names (None: missing)
+        self._spellings: dict[str, str] = {}               # folder key -> folder as first seen
+        self._errors: dict[str, str] = {}                  # folder key -> why it couldn't be listed
+        self._listing: dict[str, threading.Lock] = {}      # folder key -> held while it is listed
+        self.created: list[str] = []                       # Folders created by prepare_folder()
+        self._names('')
+
+    def _scan(self, path: str) -> Tuple[Optional[set[str]], Optional[str]]:
+        try:
+            with os.scandir(path) as it:
+                return {e.name.lower() for e in it if e.name[-4:].lower() == '.url'}, None
+        except (FileNotFoundError, NotADirectoryError):
+            return None, None
+        except OSError as e:
+            return None, f"Cannot read folder: {e}"
+
+    def _names(self, folder: str) -> Optional[set[str]]:
+        key = folder.lower()
+        with self._lock:
+            if key in self._folders:
+                return self._folders[key]
+            folder = self._spellings.setdefault(key, folder)
+            key_lock = self._listing.setdefault(key, threading.Lock())
+
+        # Rows for the same folder wait here while the first one lists it
+        with key_lock:
+            with self._lock:
+                if key in self._folders:
+                    return self._folders[key]
+            names, error = self._scan(os.path.join(self.save_dir, folder) if folder else self.save_dir)
+            with self._lock:
+                if error:
+                    self._errors[key] = error
+                self._folders[key] = names
+                self._listing.pop(key, None)
+        return names
+
+    def path(self, folder: str) -> str:
+        """
+        Directory of a row's folder.
+
+        Rows that spell a folder differently ("Work" and "work") share the
+        first spelling, so case-sensitive file systems get one folder too.
+        """
+        if not folder:
+            return self.save_dir
+        with self._lock:
+            folder = self._spellings.setdefault(folder.lower(), folder)
+        return os.path.join(self.save_dir, folder)
+
+    @property
+    def is_valid(self) -> bool:
+        """True if the save folder itself exists and could be listed."""
+        return self._names('') is not None
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why the save folder is not valid, or None."""
+        if self.is_valid:
+            return None
+        return self._errors.get('', f"Directory does not exist: {self.save_dir}")
+
+    def exists(self, folder: str, filename: str) -> bool:
+        """Whether folder/filename.url was there when the folder was listed."""
+        names = self._names(folder)
+        return names is not None and f"{filename}.url".lower() in names
+
+    def prepare_folder(self, folder: str) -> Optional[str]:
+        """
+        Make sure a row's folder exists, creating it on first use.
+
+        Returns:
+            An error message, or None if the folder is ready
+        """
+        if not self.is_valid:
+            return self.error
+        if not folder or self._names(folder) is not None:
+            return None
+        with self._lock:
+            error = self._errors.get(folder.lower())
+        if error:
+            return error
+        # Listing the parents too tells which folders this batch creates
+        parts = folder.split(os.sep)
+        missing = [
+            os.sep.join(parts[:depth]) for depth in range(1, len(parts) + 1)
+            if self._names(os.sep.join(parts[:depth])) is None
+        ]
+        paths = [(created.lower(), self.path(created)) for created in missing]
+        try:
+            os.makedirs(self.path(folder), exist_ok=True)
+        except OSError as e:
+            return f"Failed to create folder: {e}"
+        with self._lock:
+            for key, path in paths:
+                if self._folders.get(key) is None:
+                    self._folders[key] = set()
+                    self.created.append(path)
+        return None
+
+    def add(self, folder: str, filename: str) -> None:
+        """Record a shortcut created after the snapshot was taken."""
+        with self._lock:
+            names = self._folders.get(folder.lower())
+            if names is not None:
+                names.add(f"{filename}.url".lower())
+
+
+class _IconMemo:
+    """
+    Fetches each domain's favicon at most once, even across threads.
+
+    With timings, the row that fetches records the cache lookup, fetch
+    attempts and conversion as fetch_favicon() measures them; rows
+    served from the memo record the lookup (including any wait for
+    another row's fetch) as a cache hit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._icons: dict[str, Optional[str]] = {}
+        self._pending: dict[str, threading.Lock] = {}
+
+    def _memoized(self, key: str, start: float, timings: Optional[ShortcutTimings]) -> Optional[str]:
+        if timings is not None:
+            timings.cache_lookup += time.perf_counter() - start
+            timings.cache_hit = True
+        return self._icons[key]
+
+    def get(self, link: LinkURL, timings: Optional[ShortcutTimings] = None) -> Optional[str]:
+        start = time.perf_counter()
+        key = link.cache_key
+        with self._lock:
+            if key in self._icons:
+                return self._memoized(key, start, timings)
+            key_lock = self._pending.setdefault(key, threading.Lock())
+
+        # Workers for the same domain wait here while the first one fetches
+        with key_lock:
+            with self._lock:
+                if key in self._icons:
+                    return self._memoized(key, start, timings)
+            icon_path = fetch_favicon(link, timings)
+            with self._lock:
+                self._icons[key] = icon_path
+                self._pending.pop(key, None)
+        return icon_path
+
+
+def _run_entry(
+    entry: PlannedShortcut,
+    snapshot: DirectorySnapshot,
+    icons: Optional[_IconMemo],
+    overwrite: str = OVERWRITE_REPLACE,
+    writer: Optional[ShortcutWriter] = None
+) -> ShortcutResult:
+    """Carry out one planned row."""
+    if entry.action == ACTION_SKIP:
+        return ShortcutResult(success=False, error=entry.error, skipped=True)
+    if entry.action == ACTION_ERROR:
+        return ShortcutResult(success=False, error=entry.error)
+
+    error = snapshot.prepare_folder(entry.folder)
+    if error:
+        return ShortcutResult(success=False, error=error)
+
+    save_dir = snapshot.path(entry.folder)
+    keep_existing = overwrite != OVERWRITE_REPLACE
+
+    if keep_existing and snapshot.exists(entry.folder, entry.filename):
+        shortcut_path = os.path.join(save_dir, f"{entry.filename}.url")
+        return ShortcutResult(
+            success=False,
+            file_path=shortcut_path,
+            error=f"File already exists: {shortcut_path}",
+            skipped=overwrite == OVERWRITE_SKIP
+        )
+
+    # The icon is fetched here, so its phases go into this row's timings
+    timings = ShortcutTimings() if timings_enabled() else None
+    icon_path = icons.get(entry.link, timings) if icons else None
+
+    # Files that appeared after the snapshot are caught by the exclusive create
+    result = create_url_shortcut(
+        name=entry.filename,
+        url=entry.link,
+        save_dir=save_dir,
+        notes=entry.notes,
+        fetch_icon=False,
+        icon_path=icon_path,
+        check_dir=False,
+        exclusive=keep_existing,
+        writer=writer,
+        timings=timings
+    )
+    if result.success:
+        snapshot.add(entry.folder, entry.filename)
+    elif keep_existing and result.file_path:
+        result.skipped = overwrite == OVERWRITE_SKIP
+    return result
+
+
+def execute_plan(
+    plan: BatchPlan,
+    save_dir: str,
+    fetch_icons: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    overwrite: str = OVERWRITE_REPLACE,
+    writer: Optional[ShortcutWriter] = None,
+    staged: bool = False,
+    workers: int = 1
+) -> list[ShortcutResult]:
+    """
+    Create the shortcuts of a plan.
+
+    Each domain's favicon is fetched once, by the first row that needs
+    it, and reused by every later row of the same domain. The save
+    folder is listed once when the plan starts; rows are checked
+    against that listing.
+
+    With several workers the rows run as one parallel job, grouped by
+    folder so that each folder of a tree is listed and created once,
+    by the first of its rows; progress still counts every row.
+
+    Args:
+        plan: Plan from plan_batch() or plan_rows()
+        save_dir: Directory to save all shortcuts
+        fetch_icons: Whether to fetch favicons
+        progress: Called with (done, total) after every row
+        overwrite: Existing files: 'replace', 'skip' or 'error'
+        writer: Writer to create the files through (retries transient
+            network errors); a default one is used if None
+        staged: All or nothing: build the files in a staging directory
+            and publish them together with renames (see src/staging.py)
+        workers: Concurrent rows (1 runs everything on the calling thread)
+
+    Returns:
+        One ShortcutResult per plan entry, in plan order
+
+    Raises:
+        BatchPlanError: If the plan has collisions under the error policy
+    """
+    if plan.has_conflicts:
+        raise BatchPlanError(
+            f"{plan.collisions} name collision(s) in batch; "
+            "rename the rows or use the suffix or skip policy"
+        )
+
+    if staged:
+        from src.staging import execute_staged
+
+        staged_results = execute_staged(
+            plan.entries, save_dir, fetch_icons, workers, overwrite=overwrite, writer=writer, progress=progress
+        )
+        return [result for _, result in staged_results]
+
+    snapshot = DirectorySnapshot(save_dir)
+    total = len(plan.entries)
+    writer = writer or ShortcutWriter()
+
+    if workers > 1:
+        order = sorted(range(total), key=lambda i: plan.entries[i].folder.lower())
+        positions = {id(plan.entries[i]): i for i in order}
+        slots: list[Optional[ShortcutResult]] = [None] * total
+        for done, (entry, result) in enumerate(
+            execute_stream(
+                (plan.entries[i] for i in order), save_dir, fetch_icons, workers,
+                ordered=False, overwrite=overwrite, writer=writer, snapshot=snapshot
+            ),
+            start=1
+        ):
+            slots[positions[id(entry)]] = result
+            if progress:
+                progress(done, total)
+        return slots
+
+    results = []
+    icons = _IconMemo() if fetch_icons else None
+
+    for done, entry in enumerate(plan.entries, start=1):
+        results.append(_run_entry(entry, snapshot, icons, overwrite, writer))
+        if progress:
+            progress(done, total)
+
+    if metrics.registry.enabled:
+        metrics.batch_size.observe(total)
+
+    return results
+
+
+def execute_stream(
+    entries: Iterable[PlannedShortcut],
+    save_dir: str,
+    fetch_icons: bool = True,
+    workers: int = DEFAULT_WORKERS,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+    overwrite: str = OVERWRITE_REPLACE,
+    writer: Optional[ShortcutWriter] = None,
+    snapshot: Optional[DirectorySnapshot] = None
+) -> Iterator[Tuple[PlannedShortcut, ShortcutResult]]:
+    """
+    Carry out planned rows as they arrive, yielding results as they finish.
+
+    At most max_in_flight rows are queued or running at once, so memory
+    stays flat however long the input is. Stop iterating to cancel: rows
+    already running finish, nothing new is started.
+
+    Files are written through a ShortcutWriter, which caps the creates
+    running at once on each network share and retries transient
+    errors; pass one in to read its per-destination stats afterwards.
+
+    Args:
+        entries: Planned rows, e.g. from iter_plan() or iter_plan_rows()
+        save_dir: Directory to save all shortcuts (folders are created below it)
+        fetch_icons: Whether to fetch favicons (once per domain)
+        workers: Concurrent rows (1 runs everything on the calling thread)
+        ordered: Yield in input order; if False, yield in completion order
+        max_in_flight: Rows queued or running at once (default: 4 per worker)
+        overwrite: Existing files: 'replace', 'skip' or 'error'
+        writer: Writer to create the files through (default: a new one)
+        snapshot: Listing of save_dir to check rows against (default: a
+            new one, taken now)
+
+    Yields:
+        (PlannedShortcut, ShortcutResult) for every entry
+    """
+    rows = 0
+    try:
+        for entry, result in _stream_entries(
+            entries, save_dir, fetch_icons, workers, ordered, max_in_flight, overwrite, writer, snapshot
+        ):
+            rows += 1
+            yield entry, result
+    finally:
+        # The size of a stream is only known once it ends
+        if rows and metrics.registry.enabled:
+            metrics.batch_size.observe(rows)
+
+
+def _stream_entries(
+    entries: Iterable[PlannedShortcut],
+    save_dir: str,
+    fetch_icons: bool,
+    workers: int,
+    ordered: bool,
+    max_in_flight: Optional[int],
+    overwrite: str,
+    writer: Optional[ShortcutWriter],
+    snapshot: Optional[DirectorySnapshot]
+) -> Iterator[Tuple[PlannedShortcut, ShortcutResult]]:
+    """The body of execute_stream()."""
+    icons = _IconMemo() if fetch_icons else None
+    snapshot = snapshot or DirectorySnapshot(save_dir)
+    writer = writer or ShortcutWriter()
+
+    if workers <= 1:
+        for entry in entries:
+            yield entry, _run_entry(entry, snapshot, icons, overwrite, writer)
+        return
+
+    limit = max(1, max_in_flight or workers * 4)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="linkdrop-batch")
+    try:
+        if ordered:
+            queue: deque = deque()
+            for entry in entries:
+                queue.append((entry, executor.submit(_run_entry, entry, snapshot, icons, overwrite, writer)))
+                if len(queue) >= limit:
+                    done_entry, future = queue.popleft()
+                    yield done_entry, future.result()
+            while queue:
+                done_entry, future = queue.popleft()
+                yield done_entry, future.result()
+        else:
+            # Finished rows are pushed here by the worker threads
+            completed: SimpleQueue = SimpleQueue()
+            pending = 0
+            for entry in entries:
+                future = executor.submit(_run_entry, entry, snapshot, icons, overwrite, writer)
+                future.add_done_callback(lambda f, e=entry: completed.put((e, f)))
+                pending += 1
+                if pending >= limit:
+                    done_entry, future = completed.get()
+                    pending -= 1
+                    yield done_entry, future.result()
+            while pending:
+                done_entry, future = completed.get()
+                pending -= 1
+                yield done_entry, future.result()
+    finally:
+        # Reached early when the caller stops iterating: drop queued rows
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def stream_batch(
+    lines: Union[str, Iterable[str]],
+    save_dir: str,
+    fetch_icons: bool = True,
+    policy: str = COLLISION_SUFFIX,
+    workers: int = DEFAULT_WORKERS,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+    overwrite: str = OVERWRITE_REPLACE,
+    writer: Optional[ShortcutWriter] = None
+) -> Iterator[Tuple[PlannedShortcut, ShortcutResult]]:
+    """
+    Create shortcuts from a stream of batch lines, yielding as they finish.
+
+    Lines are read, validated and planned a chunk at a time and carried
+    out by execute_stream(), so memory stays flat however long the input
+    is (apart from one small entry per distinct name for duplicate
+    detection).
+
+    Args:
+        lines: An iterable of lines, an open file (sys.stdin works), or text
+        save_dir: Directory to save all shortcuts
+        fetch_icons: Whether to fetch favicons (once per domain)
+        policy: Collision policy ('suffix', 'skip' or 'error'); see iter_plan()
+        workers: Concurrent rows (1 runs everything on the calling thread)
+        ordered: Yield in input order; if False, yield in completion order
+        max_in_flight: Rows queued or running at once (default: 4 per worker)
+        overwrite: Existing files: 'replace', 'skip' or 'error'
+        writer: Writer to create the files through (default: a new one)
+
+    Yields:
+        (PlannedShortcut, ShortcutResult) for every well-formed input row
+    """
+    yield from execute_stream(
+        iter_plan(lines, policy), save_dir, fetch_icons, workers, ordered, max_in_flight, overwrite, writer
+    )
+
+
+if __name__ == "__main__":
+    demo = """
+    Google | https://google.com | Search engine
+    Google | HTTPS://Google.com:443/
+    Google | https://google.com/maps
+    Docs | docs.python.org
+    Docs | https://docs.python.org/3/
+    Bad | ftp://example.com
+    """
+    for demo_policy in COLLISION_POLICIES:
+        demo_plan = plan_batch(demo, demo_policy)
+        print(f"--- policy={demo_policy} ---")
+        for e in demo_plan.entries:
+            print(f"  line {e.line_number + 1}: {e.action:<6} {e.filename!r:<14} {e.url:<30} {e.error or ''}")
+        print(f"  domains: {list(demo_plan.icon_groups)}")
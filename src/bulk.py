@@ -0,0 +1,231 @@
+"""
+LinkDrop Bulk Line Processing
+
+Parses, validates and sanitizes very large batch inputs (100k+ lines)
+in one pass. The per-line path (parse_batch_line, validate_url,
+sanitize_filename) makes several function calls, list allocations and a
+full urlsplit() per line; this module does the same work with one split,
+one anchored regular expression for the URL's scheme and authority, a
+precompiled filename translate table and no intermediate objects, and
+returns column-oriented results, including the LinkURL of every valid
+row so the planner never parses a URL a second time.
+
+Rows can target subfolders of the save folder, either with a fourth
+column or with folders in the name (both may be combined; the column
+comes first):
+
+    Board | https://jira.example.com | Sprint board | Projects/Apollo
+    Projects/Apollo/Board | https://jira.example.com
+
+'/' and '\\' both separate folders. The folder names are returned
+as-is; the planner sanitizes them.
+
+Apart from the folders, the results match the per-line functions,
+error messages included. Lines with unusual authorities (credentials,
+ports, IPv6, non-ASCII hosts, whitespace) fall back to LinkURL.parse(),
+which also decides which error such a line reports first.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from src.core import (
+    LinkURL, FILENAME_TRANSLATION, MAX_FILENAME_LENGTH, _FILENAME_INVALID_RE
+)
+
+
+# Error codes
+OK = 0
+ERR_FORMAT = 1          # Not "Name | URL", or name/URL empty
+ERR_SCHEME = 2          # Scheme other than http/https
+ERR_NO_DOMAIN = 3       # Nothing between :// and the path
+ERR_DOMAIN = 4          # Domain starts or ends with a dot
+ERR_URL = 5             # Any other URL error (bad port, bad IPv6, ...)
+
+ERROR_MESSAGES = {
+    ERR_FORMAT: "Expected 'Name | URL | Notes'",
+    ERR_SCHEME: "Unsupported scheme",
+    ERR_NO_DOMAIN: "URL must have a domain",
+    ERR_DOMAIN: "Invalid domain format",
+    ERR_URL: "Invalid URL format",
+}
+
+_PATH_SEPARATOR_RE = re.compile(r'[\\/]')
+
+# One match per URL: an optional scheme, then the longest run of plain
+# ASCII authority characters and the character that stopped it. Anything
+# other than end of string, '/', '?' or '#' there means the authority has
+# credentials, a port, IPv6 brackets, whitespace or non-ASCII text.
+_URL_RE = re.compile(r'(?:([A-Za-z][A-Za-z0-9+.\-]*)://)?([^/?#@:\[\]\x00-\x20\x7f-\U0010ffff]*)(.?)', re.DOTALL)
+
+
+@dataclass
+class BatchColumns:
+    """
+    Column-oriented results of process_batch_lines().
+
+    Every list has one entry per non-blank, non-comment input line.
+    Entries with a non-zero error code have an empty filename and no
+    link; their url is the URL as entered (empty if the line is
+    malformed), so reports can show what was wrong.
+    """
+    line_numbers: list[int] = field(default_factory=list)  # 0-based index into the input
+    names: list[str] = field(default_factory=list)         # Name as entered
+    filenames: list[str] = field(default_factory=list)     # Sanitized name (no extension)
+    urls: list[str] = field(default_factory=list)          # Normalized URL (as entered if invalid)
+    folders: list[Optional[tuple]] = field(default_factory=list)  # Folder names, outermost first
+    links: list[Optional[LinkURL]] = field(default_factory=list)  # Parsed URL of valid rows
+    notes: list[Optional[str]] = field(default_factory=list)
+    errors: list[int] = field(default_factory=list)        # OK or an ERR_* code
+    details: dict[int, str] = field(default_factory=dict)  # Row index -> full error message
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+    @property
+    def valid_count(self) -> int:
+        return self.errors.count(OK)
+
+    def error_message(self, row: int) -> Optional[str]:
+        """Get the error message for a row, or None if it is valid."""
+        code = self.errors[row]
+        if code == OK:
+            return None
+        return self.details.get(row, ERROR_MESSAGES[code])
+
+
+def process_batch_lines(lines: Iterable[str]) -> BatchColumns:
+    """
+    Parse, validate and sanitize batch lines in bulk.
+
+    Equivalent to calling parse_batch_line(), validate_url() and
+    sanitize_filename() on every line, except that malformed lines are
+    reported with ERR_FORMAT instead of being skipped silently, and that
+    folders (a fourth column, or folders in the name) go to the folders
+    column with the filename made from the rest of the name.
+
+    Args:
+        lines: Lines in "Name | URL | Notes | Folder" format (a list, a file, or
+            batch_text.split('\\n'))
+
+    Returns:
+        BatchColumns with one entry per non-blank, non-comment line
+    """
+    out = BatchColumns()
+
+    # Bind everything used in the loop to locals
+    match_url = _URL_RE.match
+    needs_sanitize = _FILENAME_INVALID_RE.search
+    table = FILENAME_TRANSLATION
+    max_len = MAX_FILENAME_LENGTH
+    parse_link = LinkURL.parse
+    new_link = LinkURL
+    line_numbers = out.line_numbers.append
+    names = out.names.append
+    filenames = out.filenames.append
+    urls = out.urls.append
+    links = out.links.append
+    folders_col = out.folders.append
+    split_path = _PATH_SEPARATOR_RE.split
+    notes_col = out.notes.append
+    errors = out.errors.append
+    details = out.details
+
+    for index, line in enumerate(lines):
+        parts = line.split('|', 3)
+        name = parts[0].strip()
+
+        if len(parts) < 2:
+            if not name or name[0] == '#':
+                continue
+            line_numbers(index)
+            names(name)
+            filenames('')
+            urls('')
+            links(None)
+            folders_col(None)
+            notes_col(None)
+            errors(ERR_FORMAT)
+            continue
+
+        if name[:1] == '#':
+            continue
+
+        url = parts[1].strip()
+        note = parts[2].strip() if len(parts) > 2 else None
+        line_numbers(index)
+        names(name)
+        notes_col(note or None)
+
+        # Target folder: the path column, then any folders in the name
+        folders = None
+        leaf = name
+        if len(parts) > 3:
+            path = parts[3].strip()
+            if path:
+                folders = split_path(path)
+        if '/' in name or '\\' in name:
+            *name_folders, leaf = split_path(name)
+            folders = folders + name_folders if folders else name_folders
+            leaf = leaf.strip()
+        folders_col(tuple(folders) if folders else None)
+
+        if not name or not url:
+            filenames('')
+            urls('')
+            links(None)
+            errors(ERR_FORMAT)
+            continue
+
+        # URL validation (same rules, in the same order, as LinkURL.parse)
+        code = OK
+        link = None
+        entered = url
+        scheme, netloc, stop = match_url(url).groups()
+        if scheme is None:
+            url = 'https://' + url
+            scheme = 'https'
+
+        if stop and stop not in '/?#':
+            # Unusual authority: let the full parser decide
+            try:
+                link = parse_link(url)
+            except ValueError as e:
+                message = str(e)
+                code = ERR_SCHEME if message.startswith(ERROR_MESSAGES[ERR_SCHEME]) else \
+                    ERR_NO_DOMAIN if message == ERROR_MESSAGES[ERR_NO_DOMAIN] else \
+                    ERR_DOMAIN if message == ERROR_MESSAGES[ERR_DOMAIN] else ERR_URL
+                details[len(out.errors)] = message
+        else:
+            if scheme not in ('https', 'http'):
+                scheme = scheme.lower()
+            if scheme not in ('https', 'http'):
+                code = ERR_SCHEME
+                details[len(out.errors)] = f"Unsupported scheme: {scheme}"
+            elif not netloc:
+                code = ERR_NO_DOMAIN
+            elif netloc[0] == '.' or netloc[-1] == '.':
+                code = ERR_DOMAIN
+            else:
+                link = new_link(url, scheme, netloc.lower(), None, netloc)
+
+        if code != OK:
+            filenames('')
+            urls(entered)
+            links(None)
+            errors(code)
+            continue
+
+        # Filename sanitization (same rules as sanitize_filename)
+        filename = leaf.translate(table) if needs_sanitize(leaf) else leaf
+        filename = filename.strip(' .') or "shortcut"
+        if len(filename) > max_len:
+            filename = filename[:max_len]
+
+        filenames(filename)
+        urls(url)
+        links(link)
+        errors(OK)
+
+    return out
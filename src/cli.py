@@ -0,0 +1,448 @@
+"""
+LinkDrop Command Line
+
+Headless shortcut creation for scripts and provisioning jobs. Uses the
+same core as the GUIs but never imports customtkinter.
+
+Results are written to stdout as JSON lines, one object per row:
+
+    {"line": 3, "name": "GitHub", "url": "https://github.com",
+     "file": "C:\\Links\\GitHub.url", "status": "created", ...}
+
+status is one of created, skipped, failed, or planned (--dry-run).
+A summary goes to stderr unless --quiet is given.
+
+Multi-row commands keep a journal of their progress (src/journal.py).
+If a run is interrupted or some rows fail, the journal is kept and
+"linkdrop resume ID" retries only the rows that didn't finish.
+
+Exit codes:
+    0  every row was created or skipped
+    1  at least one row failed
+    2  bad arguments, unreadable input or missing destination
+
+Usage:
+    python src/cli.py create "GitHub" https://github.com -d C:\\Links
+    python src/cli.py batch links.txt -d \\\\server\\share\\Links --workers 16
+    python src/cli.py batch links.txt -d \\\\server\\share\\Links --staged
+    type links.txt | python src/cli.py batch - -d C:\\Links --dry-run
+    python src/cli.py import bookmarks.html -d C:\\Links
+    python src/cli.py sitemap https://wiki.example.com/sitemap.xml -d C:\\Links\\Wiki
+    python src/cli.py prefetch urls.txt
+    python src/cli.py resume                      (list unfinished batches)
+    python src/cli.py resume 20240105-093000-3f2a9c1e
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import importlib
+from typing import Iterable, Optional, TextIO
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import ShortcutResult
+from src.batch import (
+    PlannedShortcut, DirectorySnapshot, ACTION_CREATE, ACTION_SKIP,
+    COLLISION_POLICIES, COLLISION_SUFFIX, OVERWRITE_POLICIES, OVERWRITE_REPLACE, OVERWRITE_SKIP,
+    DEFAULT_WORKERS, execute_stream, iter_plan, plan_rows
+)
+from src.journal import BatchJournal, find_journals, resolve_journal, run_journaled
+from src.writer import DEFAULT_DESTINATION_CONCURRENCY, ShortcutWriter
+from src.config import load_config
+from src.metrics import configure_metrics
+
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+
+STATUS_CREATED = "created"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+STATUS_PLANNED = "planned"
+
+# Subcommands implemented in their own modules: name -> (module, help).
+# Each module has main(argv) -> int and is only imported when used.
+EXTERNAL_COMMANDS = {
+    'icons': ('src.icons', "Repair missing shortcut icons, or clean unused icons out of the cache"),
+    'import': ('src.importers', "Import browser bookmarks (HTML, Chrome JSON, places.sqlite)"),
+    'inventory': ('src.inventory', "List every shortcut under one or more folders"),
+    'check': ('src.linkcheck', "Find shortcuts whose links are broken or have moved"),
+    'prefetch': ('src.prefetch', "Warm the icon cache for a list of URLs"),
+    'rewrite': ('src.rewrite', "Rewrite the links of many shortcuts at once (with undo)"),
+    'search': ('src.search', "Search the shortcuts under your favorite folders"),
+    'sitemap': ('src.sitemap', "Import every page of a sitemap or link list"),
+    'sync': ('src.sync', "Make a folder of shortcuts match a manifest (CSV, JSON or batch lines)"),
+    'watch': ('src.watch', "Watch folders for dropped lists and turn them into shortcuts"),
+}
+
+
+def _result_status(result: ShortcutResult) -> str:
+    if result.success:
+        return STATUS_CREATED
+    return STATUS_SKIPPED if result.skipped else STATUS_FAILED
+
+
+def _record(entry: PlannedShortcut, status: str, result: Optional[ShortcutResult], save_dir: str) -> dict:
+    """One JSON-lines output record."""
+    record = {
+        'line': entry.line_number + 1,
+        'name': entry.name,
+        'url': entry.url,
+        'file': os.path.join(save_dir, entry.relative_path),
+        'status': status,
+        'error': entry.error,
+    }
+    if result is not None:
+        record['file'] = result.file_path or record['file']
+        record['icon'] = result.icon_path
+        record['error'] = result.error
+    return record
+
+
+class _Output:
+    """Writes JSON lines and keeps the counts for the summary and exit code."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.counts = {STATUS_CREATED: 0, STATUS_SKIPPED: 0, STATUS_FAILED: 0, STATUS_PLANNED: 0}
+
+    def write(self, record: dict) -> None:
+        self.counts[record['status']] += 1
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def summary(self, elapsed: float) -> str:
+        parts = [f"{count} {status}" for status, count in self.counts.items() if count]
+        return f"{', '.join(parts) or 'nothing to do'} in {elapsed:.1f}s"
+
+    @property
+    def exit_code(self) -> int:
+        return EXIT_FAILURES if self.counts[STATUS_FAILED] else EXIT_OK
+
+
+def _dry_run(entries, save_dir: str, args, out: _Output) -> None:
+    """Report what would be done without fetching or writing anything."""
+    snapshot = DirectorySnapshot(save_dir) if args.overwrite != OVERWRITE_REPLACE else None
+    for entry in entries:
+        if entry.action == ACTION_SKIP:
+            status = STATUS_SKIPPED
+        elif entry.action != ACTION_CREATE:
+            status = STATUS_FAILED
+        else:
+            status = STATUS_PLANNED
+            path = os.path.join(save_dir, entry.relative_path)
+            if snapshot is not None and snapshot.exists(entry.folder, entry.filename):
+                entry.error = f"File already exists: {path}"
+                status = STATUS_SKIPPED if args.overwrite == OVERWRITE_SKIP else STATUS_FAILED
+        out.write(_record(entry, status, None, save_dir))
+
+
+def _run_entries(
+    entries: Iterable[PlannedShortcut],
+    args,
+    out: _Output,
+    journal: Optional[BatchJournal],
+    whole_input: bool,
+    writer: ShortcutWriter
+) -> None:
+    save_dir = os.path.abspath(args.dir)  # Same form as the journal, so every record matches
+    if args.dry_run:
+        _dry_run(entries, save_dir, args, out)
+        return
+
+    if args.staged:
+        from src.staging import execute_staged
+
+        results = execute_staged(
+            entries,
+            save_dir,
+            fetch_icons=not args.no_icons,
+            workers=args.workers,
+            overwrite=args.overwrite,
+            writer=writer
+        )
+    elif journal is not None:
+        results = run_journaled(entries, journal, args.workers, not args.unordered, whole_input, writer)
+    else:
+        results = execute_stream(
+            entries,
+            save_dir,
+            fetch_icons=not args.no_icons,
+            workers=args.workers,
+            ordered=not args.unordered,
+            overwrite=args.overwrite,
+            writer=writer
+        )
+
+    for entry, result in results:
+        out.write(_record(entry, _result_status(result), result, save_dir))
+
+
+def _use_journal(args, journal: BatchJournal) -> None:
+    """A resumed batch keeps the destination and settings of the original run."""
+    args.dir = journal.save_dir
+    args.no_icons = not journal.fetch_icons
+    args.overwrite = journal.overwrite
+
+
+def run_command(
+    args,
+    entries: Iterable[PlannedShortcut],
+    errors: tuple = (OSError,),
+    journal: Optional[BatchJournal] = None,
+    whole_input: bool = True
+) -> int:
+    """
+    Run planned rows with the options from add_batch_options().
+
+    Shared by the batch command and the importers. Unless --no-journal or
+    --dry-run is given, progress is journaled; with --resume ID the rows
+    that journal has as done are left out.
+
+    Args:
+        args: Parsed arguments
+        entries: Planned rows, usually a generator that opens its input lazily
+        errors: Exceptions that mean the input couldn't be read (exit code 2)
+        journal: An already opened journal to continue (the resume command)
+        whole_input: entries is the entire input, not just a journal's
+            pending rows
+
+    Returns:
+        Exit code
+    """
+    if args.staged and (args.resume or journal is not None):
+        print("Error: --staged batches are all or nothing and can't be resumed", file=sys.stderr)
+        return EXIT_USAGE
+    if journal is None and args.resume:
+        try:
+            journal = BatchJournal.open(resolve_journal(args.resume))
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    if journal is not None:
+        _use_journal(args, journal)
+
+    if not os.path.isdir(args.dir):
+        print(f"Error: Directory does not exist: {args.dir}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if journal is None and not args.dry_run and not args.no_journal and not args.staged:
+        journal = BatchJournal.create(args.dir, not args.no_icons, args.overwrite)
+    if args.dry_run:
+        journal = None
+
+    out = _Output(sys.stdout)
+    writer = ShortcutWriter(concurrency=args.per_share)
+    start = time.perf_counter()
+
+    try:
+        _run_entries(entries, args, out, journal, whole_input, writer)
+    except errors as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if journal is not None and not journal.removed and not args.quiet:
+            print(f"Progress saved; continue with: linkdrop resume {journal.id}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if not args.quiet:
+        print(out.summary(time.perf_counter() - start), file=sys.stderr)
+        for stats in writer.remote_stats():
+            print(f"  {stats.summary()}", file=sys.stderr)
+        if journal is not None and journal.outstanding:
+            print(
+                f"{journal.outstanding} row(s) unfinished; retry with: linkdrop resume {journal.id}",
+                file=sys.stderr
+            )
+    return out.exit_code
+
+
+def cmd_batch(args) -> int:
+    if args.input == "-":
+        return run_command(args, iter_plan(sys.stdin, args.collisions))
+
+    # Opened before run_command() starts a journal, so a missing file leaves none behind
+    try:
+        f = open(args.input, 'r', encoding='utf-8-sig')
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    with f:
+        return run_command(args, iter_plan(f, args.collisions))
+
+
+def cmd_create(args) -> int:
+    if not args.name.strip() or not args.url.strip():
+        print("Error: Name and URL are required", file=sys.stderr)
+        return EXIT_USAGE
+
+    # A one-row plan, so overwrite and dry-run behave exactly as in batches
+    args.workers = 1
+    args.unordered = False
+    args.per_share = 1
+    args.no_journal = True
+    args.resume = None
+    args.staged = False
+    return run_command(args, plan_rows([(args.name, args.url, args.notes)]).entries)
+
+
+def _list_journals() -> int:
+    for path in find_journals():
+        try:
+            journal = BatchJournal.open(path)
+        except (OSError, ValueError):
+            continue
+        print(json.dumps({
+            'id': journal.id,
+            'dir': journal.save_dir,
+            'started': journal.header.get('started'),
+            'rows': len(journal.recorded),
+            'unfinished': journal.outstanding,
+            'input_complete': journal.planned,
+        }))
+    return EXIT_OK
+
+
+def cmd_resume(args) -> int:
+    if not args.journal:
+        return _list_journals()
+
+    try:
+        journal = BatchJournal.open(resolve_journal(args.journal))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    args.no_journal = False
+    code = run_command(args, journal.pending(), journal=journal, whole_input=journal.planned)
+
+    if not journal.planned and not args.dry_run:
+        # Rows after the interruption point were never planned
+        print(
+            "The batch input wasn't read to the end; run the original command again "
+            f"with --resume {journal.id} to create the remaining rows",
+            file=sys.stderr
+        )
+    return code
+
+
+def _add_common_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-d", "--dir",
+        default=".",
+        help="Destination folder, local or UNC (default: current directory)"
+    )
+    parser.add_argument("--no-icons", action="store_true", help="Don't fetch favicons")
+    parser.add_argument(
+        "--overwrite",
+        choices=OVERWRITE_POLICIES,
+        default=OVERWRITE_REPLACE,
+        help="What to do when a shortcut file already exists (default: replace)"
+    )
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Show what would be done, change nothing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+
+
+def add_batch_options(parser: argparse.ArgumentParser) -> None:
+    """Add the options every multi-row command shares (used by the importers too)."""
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Shortcuts created concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--collisions",
+        choices=COLLISION_POLICIES,
+        default=COLLISION_SUFFIX,
+        help="Rows whose names map to the same file: suffix (Name (2)), skip, or error (default: suffix)"
+    )
+    parser.add_argument("--unordered", action="store_true", help="Print results as they finish, not in input order")
+    parser.add_argument(
+        "--per-share",
+        type=int,
+        default=DEFAULT_DESTINATION_CONCURRENCY,
+        metavar="N",
+        help=f"Files created at once on each network share (default: {DEFAULT_DESTINATION_CONCURRENCY})"
+    )
+    parser.add_argument("--no-journal", action="store_true", help="Don't keep a journal for resuming the batch")
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="All or nothing: build every file first, then publish them together (no journal)"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="ID",
+        help="Continue an interrupted batch: rows its journal has as done are skipped"
+    )
+    _add_common_options(parser)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="linkdrop",
+        description="Create Windows .url shortcuts from the command line."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    create = commands.add_parser("create", help="Create one shortcut")
+    create.add_argument("name", help="Shortcut name (used as the filename)")
+    create.add_argument("url", help="Target URL (https:// is added if missing)")
+    create.add_argument("--notes", help="Comment stored in the shortcut")
+    _add_common_options(create)
+    create.set_defaults(func=cmd_create)
+
+    batch = commands.add_parser("batch", help="Create shortcuts from 'Name | URL | Notes | Folder' lines")
+    batch.add_argument("input", nargs="?", default="-", help="Input file, or - for stdin (default)")
+    add_batch_options(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    resume = commands.add_parser("resume", help="Retry the unfinished rows of an interrupted batch")
+    resume.add_argument("journal", nargs="?", help="Batch id or journal file (default: list unfinished batches)")
+    resume.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Shortcuts created concurrently (default: {DEFAULT_WORKERS})"
+    )
+    resume.add_argument("--unordered", action="store_true", help="Print results as they finish, not in input order")
+    resume.add_argument(
+        "--per-share",
+        type=int,
+        default=DEFAULT_DESTINATION_CONCURRENCY,
+        metavar="N",
+        help=f"Files created at once on each network share (default: {DEFAULT_DESTINATION_CONCURRENCY})"
+    )
+    resume.add_argument("-n", "--dry-run", action="store_true", help="Show the rows that would be retried")
+    resume.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    resume.set_defaults(func=cmd_resume, resume=None, staged=False)
+
+    # Listed in --help; dispatched by main() before argparse sees them
+    for name, (_, help_text) in EXTERNAL_COMMANDS.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Metrics are off unless enabled in config or via LINKDROP_METRICS
+    configure_metrics(load_config().metrics_format)
+
+    if argv and argv[0] in EXTERNAL_COMMANDS:
+        module = importlib.import_module(EXTERNAL_COMMANDS[argv[0]][0])
+        return module.main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,6 +32,7 @@ class Config:
     fetch_favicon_default: bool = True
     last_window_x: Optional[int] = None
     last_window_y: Optional[int] = None
+    metrics_format: str = ""  # "" (off), "prometheus" or "jsonl"
 
     def add_recent_folder(self, folder: str) -> None:
         """Add a folder to recent list, moving it to front if already present."""
@@ -91,7 +92,8 @@ def load_config() -> Config:
             favorite_folders=data.get('favorite_folders', []),
             fetch_favicon_default=data.get('fetch_favicon_default', True),
             last_window_x=data.get('last_window_x'),
-            last_window_y=data.get('last_window_y')
+            last_window_y=data.get('last_window_y'),
+            metrics_format=data.get('metrics_format', '')
         )
     except (json.JSONDecodeError, IOError):
         return Config()
@@ -4,20 +4,35 @@ LinkDrop Core Module
 Provides core functionality for creating .url shortcut files:
 - URL validation
 - .url file creation with optional icon
+- Reading existing .url files back
 - Favicon fetching from multiple sources
 """
 
+import sys
 import os
 import re
+import time
+import tempfile
+import threading
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urlparse
-from typing import Optional, Tuple
-from dataclasses import dataclass
-
-import requests
-from PIL import Image
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from io import BytesIO
 
+# requests and Pillow are imported on first use so that tools which never
+# fetch an icon (the CLI in dry-run mode, the scanners) start quickly
+if TYPE_CHECKING:
+    import requests
+    from src.writer import ShortcutWriter
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import metrics, psl
+
 
 def get_icon_cache_dir() -> str:
     """
@@ -32,6 +47,68 @@ def get_icon_cache_dir() -> str:
     return cache_dir
 
 
+def get_destination_kind(path: str) -> str:
+    """
+    Classify a save location as local disk or network storage.
+
+    Args:
+        path: A directory or file path
+
+    Returns:
+        'unc' for \\\\server\\share paths, 'mapped' for drive letters mapped
+        to a network share, otherwise 'local'
+    """
+    if path.startswith(('\\\\', '//')):
+        return 'unc'
+    drive, _ = os.path.splitdrive(path)
+    if drive and _is_remote_drive(drive.upper()):
+        return 'mapped'
+    return 'local'
+
+
+@lru_cache(maxsize=32)
+def _is_remote_drive(drive: str) -> bool:
+    """Check whether a drive letter is mapped to a network share (Windows only)."""
+    if sys.platform != 'win32':
+        return False
+    try:
+        import ctypes
+        DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(drive + '\\') == DRIVE_REMOTE
+    except Exception:
+        return False
+
+
+@dataclass
+class FetchAttempt:
+    """One network attempt made while fetching a favicon."""
+    source: str                       # 'direct' or 'fallback'
+    seconds: float
+    status_code: Optional[int] = None
+    outcome: str = "ok"               # 'ok', 'http_error', 'network_error', 'convert_failed'
+
+
+@dataclass
+class ShortcutTimings:
+    """Per-phase timings (in seconds) for one shortcut creation."""
+    validate: float = 0.0
+    cache_lookup: float = 0.0
+    fetch_attempts: list[FetchAttempt] = field(default_factory=list)
+    convert: float = 0.0
+    write: float = 0.0
+    cache_hit: Optional[bool] = None
+
+    @property
+    def fetch(self) -> float:
+        """Total time spent on network requests."""
+        return sum(a.seconds for a in self.fetch_attempts)
+
+    @property
+    def total(self) -> float:
+        """Total time across all phases."""
+        return self.validate + self.cache_lookup + self.fetch + self.convert + self.write
+
+
 @dataclass
 class ShortcutResult:
     """Result of a shortcut creation operation."""
@@ -39,97 +116,304 @@ class ShortcutResult:
     file_path: Optional[str] = None
     icon_path: Optional[str] = None
     error: Optional[str] = None
+    timings: Optional[ShortcutTimings] = None
+    skipped: bool = False  # Not attempted (e.g. a duplicate row in a batch); error says why
 
 
-def is_likely_url(text: str) -> bool:
+TimingHook = Callable[[ShortcutResult], None]
+
+_timing_hooks: list[TimingHook] = []
+
+
+def add_timing_hook(hook: TimingHook) -> None:
     """
-    Check if text looks like a URL (for clipboard auto-detection).
+    Register a callback that receives every ShortcutResult with timings.
 
-    More strict than validate_url() - requires explicit http(s):// prefix
-    or a recognizable domain pattern with common TLD.
+    While at least one hook is registered, create_url_shortcut() records
+    per-phase timings for every call and passes the result to each hook.
+    Hooks run on the thread that created the shortcut and must not raise.
+
+    Args:
+        hook: Callable taking the ShortcutResult
+    """
+    if hook not in _timing_hooks:
+        _timing_hooks.append(hook)
+
+
+def timings_enabled() -> bool:
+    """Whether create_url_shortcut() currently records timings for every call."""
+    return bool(_timing_hooks)
+
+
+def remove_timing_hook(hook: TimingHook) -> None:
+    """Unregister a callback added with add_timing_hook()."""
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+
+def _emit_timings(result: ShortcutResult) -> None:
+    """Pass a timed result to every registered hook."""
+    for hook in list(_timing_hooks):
+        try:
+            hook(result)
+        except Exception:
+            pass
+
+
+# Two-label names whose "TLD" is far more often a file extension, e.g. setup.py
+FILE_EXTENSION_TLDS = frozenset({'py', 'md', 'sh', 'rs', 'pl', 'ps', 'zip', 'mov'})
+
+# Long TLDs that bare two-label names are still accepted under; other long
+# generic TLDs are ordinary words too ("hello.world", "our.community")
+BARE_LONG_TLDS = frozenset({'info', 'mobi', 'name', 'aero', 'coop', 'museum'})
+
+
+def detect_url_host(text: str) -> Optional[str]:
+    """
+    Check if text looks like a URL and return its host.
+
+    Used for clipboard auto-detection. Text with an explicit http(s)://
+    prefix is accepted if it has a host. Otherwise the host must end in a
+    known public suffix (see psl.py) with a name in front of it. A bare
+    name.tld (no scheme, no www., no path) is rejected if the TLD is more
+    often something else: a file extension, or a long generic TLD that
+    is also a word, like world or community.
+
+    The host is extracted in a single pass, so callers can use the result
+    instead of parsing the URL again.
 
     Args:
         text: Text to check
 
     Returns:
-        True if text appears to be a URL
+        The lowercase host (without port or credentials), or None if the
+        text doesn't look like a URL
     """
-    if not text or not text.strip():
-        return False
+    if not text:
+        return None
 
     text = text.strip()
+    if not text:
+        return None
 
     # Must not contain spaces or newlines (URLs don't have these)
     if ' ' in text or '\n' in text or '\t' in text:
-        return False
+        return None
 
-    # Accept if it starts with http:// or https://
-    if text.startswith(('http://', 'https://')):
-        return True
+    head = text[:8].lower()
+    has_scheme = head.startswith(('http://', 'https://'))
+    host_start = head.index('://') + 3 if has_scheme else 0
+
+    # Host ends at the first path, query or fragment delimiter
+    host_end = len(text)
+    for delimiter in '/?#':
+        pos = text.find(delimiter, host_start, host_end)
+        if pos != -1:
+            host_end = pos
+    host = text[host_start:host_end].lower()
+
+    if '@' in host:
+        # Credentials are fine in a full URL; without a scheme it's an email address
+        if not has_scheme:
+            return None
+        host = host.rsplit('@', 1)[1]
+
+    if host.startswith('['):
+        # IPv6 literal, only meaningful with a scheme
+        return host[:host.find(']') + 1] if has_scheme and ']' in host else None
+
+    host = host.split(':', 1)[0]
+    # Same rule as LinkURL.parse(), so a detected URL always validates
+    if not host or host.startswith('.') or host.endswith('.'):
+        return None
 
-    # Accept if it looks like a domain with common TLD
-    common_tlds = (
-        '.com', '.org', '.net', '.io', '.co', '.edu', '.gov', '.mil',
-        '.dev', '.app', '.ai', '.info', '.biz', '.me', '.tv', '.us',
-        '.uk', '.ca', '.de', '.fr', '.au', '.jp', '.cn', '.in', '.br',
-        '.xyz', '.tech', '.online', '.site', '.store', '.cloud', '.so',
-        '.gg', '.ly', '.to', '.fm', '.am', '.be', '.it', '.es', '.nl'
-    )
+    if has_scheme:
+        return host
 
-    # Check if text contains a TLD (case insensitive)
-    text_lower = text.lower()
-    for tld in common_tlds:
-        # TLD should be followed by nothing, /, :, or ?
-        tld_pos = text_lower.find(tld)
-        if tld_pos > 0:  # Must have something before the TLD
-            after_tld = text_lower[tld_pos + len(tld):]
-            if not after_tld or after_tld[0] in ('/', ':', '?', '#'):
-                return True
+    # No scheme: require a registrable name under a known public suffix
+    labels = host.split('.')
+    if len(labels) < 2 or not all(labels):
+        return None
+
+    suffix_labels = psl.get_rules().suffix_labels(labels)
+    if suffix_labels == 0 or suffix_labels >= len(labels):
+        return None
 
-    return False
+    if len(labels) == 2 and host_end == len(text):
+        tld = labels[1]
+        if tld in FILE_EXTENSION_TLDS:
+            return None
+        if len(tld) > 3 and tld not in BARE_LONG_TLDS and not tld.startswith('xn--'):
+            return None
 
+    return host
 
-def validate_url(url: str) -> Tuple[bool, str]:
+
+def is_likely_url(text: str) -> bool:
     """
-    Validate a URL string.
+    Check if text looks like a URL (for clipboard auto-detection).
+
+    More strict than validate_url() - requires explicit http(s):// prefix
+    or a domain under a known public suffix. See detect_url_host().
 
     Args:
-        url: The URL to validate
+        text: Text to check
 
     Returns:
-        Tuple of (is_valid, error_message_or_normalized_url)
+        True if text appears to be a URL
     """
-    if not url or not url.strip():
-        return False, "URL cannot be empty"
+    return detect_url_host(text) is not None
 
-    url = url.strip()
 
-    # Add https:// if no scheme provided
-    if not re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', url):
-        url = 'https://' + url
+_SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*://')
 
-    try:
-        parsed = urlparse(url)
+
+class LinkURL:
+    """
+    A validated, normalized web URL.
+
+    Created once by LinkURL.parse() (which is what validate_url() uses)
+    and then passed through the pipeline, so create_url_shortcut(),
+    fetch_favicon() and the GUIs never parse the same URL again.
+    Instances are immutable.
+    """
+
+    __slots__ = ('url', 'scheme', 'host', 'port', 'netloc')
+
+    def __init__(self, url: str, scheme: str, host: str, port: Optional[int], netloc: str):
+        set_attr = object.__setattr__
+        set_attr(self, 'url', url)
+        set_attr(self, 'scheme', scheme)
+        set_attr(self, 'host', host)
+        set_attr(self, 'port', port)
+        set_attr(self, 'netloc', netloc)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LinkURL is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("LinkURL is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, LinkURL) and self.url == other.url
+
+    def __hash__(self):
+        return hash(self.url)
+
+    def __str__(self):
+        return self.url
+
+    def __repr__(self):
+        return f"LinkURL({self.url!r})"
+
+    @property
+    def base_url(self) -> str:
+        """Scheme and authority, e.g. https://example.com:8080"""
+        return f"{self.scheme}://{self.netloc}"
+
+    @property
+    def cache_key(self) -> str:
+        """Icon cache key; icons are cached per host (and port)."""
+        return self.host if self.port is None else f"{self.host}:{self.port}"
+
+    @property
+    def suggested_name(self) -> str:
+        """Shortcut name derived from the domain (e.g. "Notion" for www.notion.so)."""
+        return self.host.replace('www.', '').split('.')[0].title()
+
+    @classmethod
+    def parse(cls, url: str) -> 'LinkURL':
+        """
+        Validate and normalize a URL string.
+
+        Adds https:// when no scheme is given.
+
+        Args:
+            url: The URL to parse
+
+        Returns:
+            The LinkURL
+
+        Raises:
+            ValueError: With a user-facing message if the URL is invalid
+        """
+        if not url or not url.strip():
+            raise ValueError("URL cannot be empty")
+
+        url = url.strip()
+
+        # Add https:// if no scheme provided
+        if not _SCHEME_RE.match(url):
+            url = 'https://' + url
+
+        try:
+            parsed = urlsplit(url)
+            netloc = parsed.netloc
+            if '@' in netloc or ':' in netloc or '[' in netloc:
+                host = parsed.hostname or ''
+                port = parsed.port
+            else:
+                host = netloc.lower()
+                port = None
+        except Exception as e:
+            raise ValueError(f"Invalid URL format: {e}") from None
 
         # Must have a scheme and netloc (domain)
         if not parsed.scheme:
-            return False, "URL must have a scheme (http:// or https://)"
+            raise ValueError("URL must have a scheme (http:// or https://)")
 
         if parsed.scheme not in ('http', 'https'):
-            return False, f"Unsupported scheme: {parsed.scheme}"
+            raise ValueError(f"Unsupported scheme: {parsed.scheme}")
 
-        if not parsed.netloc:
-            return False, "URL must have a domain"
+        if not netloc:
+            raise ValueError("URL must have a domain")
 
         # Basic domain validation
-        domain = parsed.netloc.split(':')[0]  # Remove port if present
-        if not domain or domain.startswith('.') or domain.endswith('.'):
-            return False, "Invalid domain format"
+        if not host or host.startswith('.') or host.endswith('.'):
+            raise ValueError("Invalid domain format")
+
+        return cls(url, parsed.scheme, host, port, netloc)
 
-        return True, url
 
-    except Exception as e:
-        return False, f"Invalid URL format: {e}"
+def as_link_url(url) -> Optional[LinkURL]:
+    """
+    Coerce a string or LinkURL to a LinkURL.
+
+    Args:
+        url: A URL string or an existing LinkURL
+
+    Returns:
+        The LinkURL, or None if the string isn't a valid URL
+    """
+    if isinstance(url, LinkURL):
+        return url
+    try:
+        return LinkURL.parse(url)
+    except ValueError:
+        return None
+
+
+def validate_url(url: str) -> Tuple[bool, str]:
+    """
+    Validate a URL string.
+
+    Args:
+        url: The URL to validate
+
+    Returns:
+        Tuple of (is_valid, error_message_or_normalized_url)
+    """
+    try:
+        return True, LinkURL.parse(url).url
+    except ValueError as e:
+        return False, str(e)
+
+
+# Invalid Windows filename characters become '_', control characters are dropped
+FILENAME_TRANSLATION = {ord(c): '_' for c in '<>:"/\\|?*'}
+FILENAME_TRANSLATION.update({c: None for c in range(32)})
+_FILENAME_INVALID_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+MAX_FILENAME_LENGTH = 200
 
 
 def sanitize_filename(name: str) -> str:
@@ -142,13 +426,9 @@ def sanitize_filename(name: str) -> str:
     Returns:
         A safe filename string
     """
-    # Remove or replace invalid Windows filename characters
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        name = name.replace(char, '_')
-
-    # Remove control characters
-    name = ''.join(c for c in name if ord(c) >= 32)
+    # Replace invalid Windows filename characters and remove control characters
+    if _FILENAME_INVALID_RE.search(name):
+        name = name.translate(FILENAME_TRANSLATION)
 
     # Trim whitespace and dots from ends
     name = name.strip(' .')
@@ -158,13 +438,87 @@ def sanitize_filename(name: str) -> str:
         name = "shortcut"
 
     # Limit length (Windows max is 255, but leave room for extension)
-    if len(name) > 200:
-        name = name[:200]
+    if len(name) > MAX_FILENAME_LENGTH:
+        name = name[:MAX_FILENAME_LENGTH]
 
     return name
 
 
-def fetch_favicon(url: str) -> Optional[str]:
+# Request settings shared by every favicon fetch
+FAVICON_TIMEOUT = 5
+FAVICON_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Fallback favicon service. Overridable through the environment so the
+# benchmark harness can point it at a local stand-in server.
+FAVICON_FALLBACK_URL = os.environ.get(
+    'LINKDROP_FAVICON_FALLBACK_URL',
+    "https://www.google.com/s2/favicons?domain={domain}&sz=256"
+)
+
+_http_session: Optional['requests.Session'] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> 'requests.Session':
+    """
+    Get the shared HTTP session used for favicon fetching.
+
+    Reusing one session keeps connections alive between requests, which
+    matters when many icons are fetched in a batch or from several threads.
+
+    Returns:
+        The process-wide requests.Session
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(FAVICON_HEADERS)
+                _http_session = session
+    return _http_session
+
+
+def get_icon_cache_key(url: Union[str, LinkURL]) -> Optional[str]:
+    """
+    Get the icon cache key for a URL.
+
+    Icons are cached per domain, so every URL on the same host shares
+    one cache entry.
+
+    Args:
+        url: The website URL or LinkURL
+
+    Returns:
+        The cache key (the URL's domain), or None if the URL is invalid
+    """
+    link = as_link_url(url)
+    return link.cache_key if link else None
+
+
+def get_icon_cache_path(url: Union[str, LinkURL]) -> Optional[str]:
+    """
+    Get the path where the icon for a URL is (or would be) cached.
+
+    Args:
+        url: The website URL or LinkURL
+
+    Returns:
+        Path to the .ico file in the icon cache, or None if the URL is invalid
+    """
+    cache_key = get_icon_cache_key(url)
+    if not cache_key:
+        return None
+    return os.path.join(get_icon_cache_dir(), sanitize_filename(cache_key) + ".ico")
+
+
+def fetch_favicon(url: Union[str, LinkURL], timings: Optional[ShortcutTimings] = None) -> Optional[str]:
     """
     Fetch a favicon for a URL and cache it as an .ico file.
 
@@ -177,63 +531,93 @@ def fetch_favicon(url: str) -> Optional[str]:
     2. Google Favicon service (more reliable)
 
     Args:
-        url: The website URL
+        url: The website URL or LinkURL
+        timings: Optional ShortcutTimings that receives the cache lookup,
+            fetch attempt and conversion timings
 
     Returns:
         Path to the cached .ico file, or None if fetching failed
     """
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc
-        base_url = f"{parsed.scheme}://{domain}"
-    except Exception:
+    start = time.perf_counter()
+    link = as_link_url(url)
+    if link is None:
         return None
 
     # Build cache path using domain name
-    cache_dir = get_icon_cache_dir()
-    icon_filename = sanitize_filename(domain) + ".ico"
-    icon_path = os.path.join(cache_dir, icon_filename)
+    icon_path = get_icon_cache_path(link)
 
     # Return cached icon if it already exists
-    if os.path.exists(icon_path):
+    cache_hit = os.path.exists(icon_path)
+    if timings is not None:
+        timings.cache_lookup += time.perf_counter() - start
+        timings.cache_hit = cache_hit
+    if metrics.registry.enabled:
+        metrics.icon_cache_lookups.inc(result='hit' if cache_hit else 'miss')
+    if cache_hit:
         return icon_path
 
-    # Request timeout and headers
-    timeout = 5
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
     # Try direct favicon.ico first
-    try:
-        response = requests.get(
-            f"{base_url}/favicon.ico",
-            timeout=timeout,
-            headers=headers,
-            allow_redirects=True
-        )
-        if response.status_code == 200 and len(response.content) > 0:
-            if _save_as_ico(response.content, icon_path):
-                return icon_path
-    except requests.RequestException:
-        pass
+    if _fetch_icon_source('direct', f"{link.base_url}/favicon.ico", icon_path, timings):
+        return icon_path
 
     # Fallback to Google's favicon service (request largest available size)
+    if _fetch_icon_source('fallback', FAVICON_FALLBACK_URL.format(domain=link.cache_key), icon_path, timings):
+        return icon_path
+
+    return None
+
+
+def _fetch_icon_source(
+    source: str,
+    icon_url: str,
+    icon_path: str,
+    timings: Optional[ShortcutTimings] = None
+) -> bool:
+    """
+    Download an icon from one source and save it to the cache.
+
+    Args:
+        source: Source name recorded in timings ('direct' or 'fallback')
+        icon_url: URL of the icon image
+        icon_path: Cache path to save the .ico file to
+        timings: Optional ShortcutTimings to record the attempt in
+
+    Returns:
+        True if the icon was downloaded and saved
+    """
+    import requests
+
+    start = time.perf_counter()
+    attempt = FetchAttempt(source=source, seconds=0.0)
+    saved = False
+
     try:
-        google_favicon_url = f"https://www.google.com/s2/favicons?domain={domain}&sz=256"
-        response = requests.get(
-            google_favicon_url,
-            timeout=timeout,
-            headers=headers,
+        response = get_http_session().get(
+            icon_url,
+            timeout=FAVICON_TIMEOUT,
             allow_redirects=True
         )
+        attempt.status_code = response.status_code
+        attempt.seconds = time.perf_counter() - start
+
         if response.status_code == 200 and len(response.content) > 0:
-            if _save_as_ico(response.content, icon_path):
-                return icon_path
+            convert_start = time.perf_counter()
+            saved = _save_as_ico(response.content, icon_path)
+            if timings is not None:
+                timings.convert += time.perf_counter() - convert_start
+            if not saved:
+                attempt.outcome = "convert_failed"
+        else:
+            attempt.outcome = "http_error"
     except requests.RequestException:
-        pass
+        attempt.seconds = time.perf_counter() - start
+        attempt.outcome = "network_error"
 
-    return None
+    if timings is not None:
+        timings.fetch_attempts.append(attempt)
+    if metrics.registry.enabled:
+        metrics.favicon_fetches.inc(source=source, outcome=attempt.outcome)
+    return saved
 
 
 def _save_as_ico(image_data: bytes, output_path: str) -> bool:
@@ -255,6 +639,7 @@ def _save_as_ico(image_data: bytes, output_path: str) -> bool:
             return True
 
         # Convert other formats to ICO using Pillow
+        from PIL import Image
         img = Image.open(BytesIO(image_data))
 
         # Convert to RGBA if needed
@@ -291,56 +676,76 @@ def _save_as_ico(image_data: bytes, output_path: str) -> bool:
 
 def create_url_shortcut(
     name: str,
-    url: str,
+    url: Union[str, LinkURL],
     save_dir: str,
     notes: Optional[str] = None,
-    fetch_icon: bool = True
+    fetch_icon: bool = True,
+    collect_timings: bool = False,
+    icon_path: Optional[str] = None,
+    check_dir: bool = True,
+    exclusive: bool = False,
+    writer: Optional['ShortcutWriter'] = None,
+    timings: Optional[ShortcutTimings] = None
 ) -> ShortcutResult:
     """
     Create a Windows .url shortcut file.
 
     Args:
         name: The shortcut name (will be sanitized and used as filename)
-        url: The target URL
+        url: The target URL, as a string or an already validated LinkURL
         save_dir: Directory to save the shortcut (supports UNC paths)
         notes: Optional notes/description
         fetch_icon: Whether to fetch and embed the favicon
+        collect_timings: Attach per-phase timings to the result. Timings are
+            also collected whenever a timing hook is registered.
+        icon_path: Icon file to use instead of fetching one (for callers
+            that already fetched the icon for this domain)
+        check_dir: Verify that save_dir exists. Batches check the
+            destination once up front and pass False, which saves a
+            round trip per shortcut on network shares.
+        exclusive: Fail instead of replacing an existing file. The check
+            is part of creating the file, so it can't race another writer.
+            The failed result has file_path set.
+        writer: ShortcutWriter to write through (concurrency limits and
+            retries for network destinations); the file is written
+            directly if None
+        timings: Timings the caller already started for this shortcut
+            (e.g. the icon fetch behind icon_path); the remaining phases
+            are added to them and they are attached to the result
 
     Returns:
         ShortcutResult with success status and file paths
     """
-    # Validate URL
-    is_valid, result = validate_url(url)
-    if not is_valid:
-        return ShortcutResult(success=False, error=result)
-
-    normalized_url = result
-
-    # Validate save directory
-    if not save_dir:
-        return ShortcutResult(success=False, error="Save directory cannot be empty")
+    if not (collect_timings or _timing_hooks or timings is not None):
+        result = _create_url_shortcut(
+            name, url, save_dir, notes, fetch_icon, None, icon_path, check_dir, exclusive, writer
+        )
+    else:
+        timings = timings or ShortcutTimings()
+        result = _create_url_shortcut(
+            name, url, save_dir, notes, fetch_icon, timings, icon_path, check_dir, exclusive, writer
+        )
+        result.timings = timings
+        _emit_timings(result)
 
-    # Normalize path (works with both local and UNC paths)
-    save_dir = os.path.normpath(save_dir)
+    if metrics.registry.enabled:
+        metrics.shortcuts_created.inc(result='success' if result.success else 'failure')
+    return result
 
-    if not os.path.isdir(save_dir):
-        return ShortcutResult(success=False, error=f"Directory does not exist: {save_dir}")
 
-    # Sanitize filename
-    safe_name = sanitize_filename(name)
-    if not safe_name:
-        return ShortcutResult(success=False, error="Invalid shortcut name")
-
-    # Build file path
-    shortcut_path = os.path.join(save_dir, f"{safe_name}.url")
+def build_shortcut_content(link: LinkURL, icon_path: Optional[str] = None, notes: Optional[str] = None) -> str:
+    """
+    Build the text of a .url file.
 
-    # Fetch favicon if requested (cached in %LOCALAPPDATA%\LinkDrop\icons\)
-    icon_path = None
-    if fetch_icon:
-        icon_path = fetch_favicon(normalized_url)
+    Args:
+        link: The target URL
+        icon_path: Icon file to reference, if any
+        notes: Optional notes, stored as a single-line Comment
 
-    # Build .url file content
-    lines = ["[InternetShortcut]", f"URL={normalized_url}"]
+    Returns:
+        The file content
+    """
+    lines = ["[InternetShortcut]", f"URL={link.url}"]
 
     if icon_path:
         lines.append("IconIndex=0")
@@ -352,14 +757,267 @@ def create_url_shortcut(
         comment = ' '.join(notes.strip().split())
         lines.append(f"Comment={comment}")
 
-    content = '\n'.join(lines) + '\n'
+    return '\n'.join(lines) + '\n'
 
-    # Write the file
+
+def write_shortcut_file(path: str, content: str, exclusive: bool = False) -> None:
+    """
+    Write .url file content to disk.
+
+    Args:
+        path: Full path of the .url file
+        content: Text from build_shortcut_content()
+        exclusive: Raise FileExistsError instead of replacing an existing file
+
+    Raises:
+        OSError: If the file can't be written
+    """
+    with open(path, 'x' if exclusive else 'w', encoding='ascii', errors='replace') as f:
+        f.write(content)
+
+
+def replace_shortcut_file(path: str, content: str) -> None:
+    """
+    Write .url file content atomically.
+
+    The content goes to a temporary file in the same folder, which is
+    then renamed over path, so readers see the old file or the new one,
+    never a partly written one.
+
+    Raises:
+        OSError: If the file can't be written
+    """
+    directory, filename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=".tmp", dir=directory or None)
     try:
-        with open(shortcut_path, 'w', encoding='ascii', errors='replace') as f:
+        with os.fdopen(fd, 'w', encoding='ascii', errors='replace') as f:
             f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class ShortcutFile:
+    """The fields LinkDrop uses from an existing .url file."""
+    url: Optional[str] = None
+    icon_file: Optional[str] = None
+    comment: Optional[str] = None
+
+
+def parse_shortcut_content(text: str) -> ShortcutFile:
+    """
+    Read the [InternetShortcut] section of .url file text.
+
+    A small hand-written reader: .url files are tiny and configparser
+    would cost more than the file read itself on large inventories.
+    Keys are case-insensitive; other sections and keys are ignored.
+
+    Args:
+        text: The file content
+
+    Returns:
+        The ShortcutFile (fields that are missing are None)
+    """
+    shortcut = ShortcutFile()
+    in_section = False
+    for line in text.splitlines():
+        line = line.strip()
+        if line[:1] == '[':
+            in_section = line.lower() == '[internetshortcut]'
+            continue
+        if not in_section:
+            continue
+        key, sep, value = line.partition('=')
+        if not sep:
+            continue
+        key = key.strip().lower()
+        if key == 'url':
+            shortcut.url = value.strip()
+        elif key == 'iconfile':
+            shortcut.icon_file = value.strip() or None
+        elif key == 'comment':
+            shortcut.comment = value.strip() or None
+    return shortcut
+
+
+def read_shortcut_file(path: str) -> ShortcutFile:
+    """
+    Read an existing .url file.
+
+    UTF-16 files (with a byte order mark) and UTF-8 are read as such;
+    anything else is taken as Latin-1, which never fails.
+
+    Raises:
+        OSError: If the file can't be read
+    """
+    return parse_shortcut_content(_read_shortcut_text(path))
+
+
+def _read_shortcut_text(path: str) -> str:
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        return data.decode('utf-16', errors='replace')
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+def update_shortcut_file(path: str, url: Optional[str] = None, icon_file: Optional[str] = None) -> None:
+    """
+    Change the URL and/or icon of an existing .url file in place.
+
+    Every other line (Comment, IconIndex, other sections) is kept as it
+    is, and the file is replaced atomically.
+
+    Args:
+        path: The .url file
+        url: New URL (None keeps the current one)
+        icon_file: New icon file (None keeps the current one, '' removes it)
+
+    Raises:
+        OSError: If the file can't be read or written
+    """
+    lines: list = _read_shortcut_text(path).splitlines()
+    remove_icon = icon_file == ''
+    if remove_icon:
+        icon_file = None
+    updates = {'url': url, 'iconfile': icon_file}
+    present = set()
+    section_end = None
+    in_section = False
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped[:1] == '[':
+            if in_section:
+                section_end = i
+            in_section = stripped.lower() == '[internetshortcut]'
+            continue
+        if not in_section:
+            continue
+        key, sep, _ = stripped.partition('=')
+        key = key.strip().lower()
+        present.add(key)
+        if sep and remove_icon and key in ('iconfile', 'iconindex'):
+            lines[i] = None
+        elif sep and updates.get(key) is not None:
+            lines[i] = f"{'URL' if key == 'url' else 'IconFile'}={updates.pop(key)}"
+
+    missing = []
+    if updates.get('url') is not None:
+        missing.append(f"URL={updates['url']}")
+    if updates.get('iconfile') is not None:
+        if 'iconindex' not in present:
+            missing.append("IconIndex=0")
+        missing.append(f"IconFile={updates['iconfile']}")
+    if missing:
+        if not any(line.strip().lower() == '[internetshortcut]' for line in lines):
+            lines.insert(0, "[InternetShortcut]")
+            section_end = 1
+        if section_end is None:
+            section_end = len(lines)
+        lines[section_end:section_end] = missing
+
+    replace_shortcut_file(path, '\n'.join(line for line in lines if line is not None) + '\n')
+
+
+def _validate_shortcut_inputs(
+    name: str,
+    url: Union[str, LinkURL],
+    save_dir: str,
+    check_dir: bool = True
+) -> Tuple[Optional[str], Optional[LinkURL], str, str]:
+    """
+    Validate the inputs of create_url_shortcut().
+
+    Returns:
+        Tuple of (error_or_None, link, normalized_save_dir, safe_name)
+    """
+    # Validate URL
+    if isinstance(url, LinkURL):
+        link = url
+    else:
+        try:
+            link = LinkURL.parse(url)
+        except ValueError as e:
+            return str(e), None, "", ""
+
+    # Validate save directory
+    if not save_dir:
+        return "Save directory cannot be empty", None, "", ""
+
+    if check_dir:
+        # Normalize path (works with both local and UNC paths)
+        save_dir = os.path.normpath(save_dir)
+
+        if not os.path.isdir(save_dir):
+            return f"Directory does not exist: {save_dir}", None, "", ""
+
+    # Sanitize filename
+    safe_name = sanitize_filename(name)
+    if not safe_name:
+        return "Invalid shortcut name", None, "", ""
+
+    return None, link, save_dir, safe_name
+
+
+def _create_url_shortcut(
+    name: str,
+    url: Union[str, LinkURL],
+    save_dir: str,
+    notes: Optional[str],
+    fetch_icon: bool,
+    timings: Optional[ShortcutTimings],
+    icon_path: Optional[str] = None,
+    check_dir: bool = True,
+    exclusive: bool = False,
+    writer: Optional['ShortcutWriter'] = None
+) -> ShortcutResult:
+    """Create a shortcut, recording phase timings if a timings object is given."""
+    start = time.perf_counter()
+    error, link, save_dir, safe_name = _validate_shortcut_inputs(name, url, save_dir, check_dir)
+    if timings is not None:
+        timings.validate = time.perf_counter() - start
+    if error:
+        return ShortcutResult(success=False, error=error)
+
+    # Build file path
+    shortcut_path = os.path.join(save_dir, f"{safe_name}.url")
+
+    # Fetch favicon if requested (cached in %LOCALAPPDATA%\LinkDrop\icons\)
+    if icon_path is None and fetch_icon:
+        icon_path = fetch_favicon(link, timings)
+
+    content = build_shortcut_content(link, icon_path, notes)
+
+    # Write the file
+    write_start = time.perf_counter()
+    try:
+        if writer is not None:
+            writer.write(shortcut_path, content, exclusive)
+        else:
+            write_shortcut_file(shortcut_path, content, exclusive)
+    except FileExistsError:
+        return ShortcutResult(
+            success=False,
+            file_path=shortcut_path,
+            icon_path=icon_path,
+            error=f"File already exists: {shortcut_path}"
+        )
     except OSError as e:
         return ShortcutResult(success=False, error=f"Failed to write file: {e}")
+    finally:
+        write_seconds = time.perf_counter() - write_start
+        if timings is not None:
+            timings.write = write_seconds
+        if metrics.registry.enabled:
+            metrics.shortcut_write_seconds.observe(write_seconds, destination=get_destination_kind(save_dir))
 
     return ShortcutResult(
         success=True,
@@ -402,41 +1060,59 @@ def parse_batch_line(line: str) -> Tuple[Optional[str], Optional[str], Optional[
 def create_batch_shortcuts(
     batch_text: str,
     save_dir: str,
-    fetch_icons: bool = True
+    fetch_icons: bool = True,
+    collision_policy: str = "suffix",
+    staged: bool = False,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
 ) -> list[ShortcutResult]:
     """
     Create multiple shortcuts from batch text input.
 
+    The batch is planned first (see src/batch.py): repeated rows are
+    skipped, names that collide within the batch are resolved with the
+    collision policy, and each domain's favicon is fetched once. For very
+    large inputs, src.batch.stream_batch() does the same work in constant
+    memory and yields each result as it finishes.
+
+    Rows can build a folder tree below save_dir, with a fourth column or
+    folders in the name ("Projects/Apollo/Board | URL"); the folders are
+    created as needed and the whole tree is one parallel job.
+
     Args:
-        batch_text: Multi-line text with format "Name | URL | Notes" per line
+        batch_text: Multi-line text with format "Name | URL | Notes | Folder" per line
         save_dir: Directory to save all shortcuts
         fetch_icons: Whether to fetch favicons
+        collision_policy: 'suffix' (Name (2).url), 'skip' or 'error'
+        staged: Transactional mode: all files are built in a staging
+            directory inside save_dir and published together with
+            renames once every icon is fetched; if anything fails, no
+            shortcut of the batch is left behind
+        workers: Concurrent rows (default: the batch engine's
+            DEFAULT_WORKERS; 1 runs everything on the calling thread)
+        progress: Called with (done, total) after every row
 
     Returns:
-        List of ShortcutResult for each processed line
-    """
-    results = []
-
-    for line in batch_text.split('\n'):
-        name, url, notes = parse_batch_line(line)
+        List of ShortcutResult for each processed line, in input order
 
-        if name and url:
-            result = create_url_shortcut(
-                name=name,
-                url=url,
-                save_dir=save_dir,
-                notes=notes,
-                fetch_icon=fetch_icons
-            )
-            results.append(result)
-
-    return results
+    Raises:
+        BatchPlanError: If names collide and collision_policy is 'error'
+    """
+    from src.batch import DEFAULT_WORKERS, plan_batch, execute_plan
+
+    plan = plan_batch(batch_text, collision_policy)
+    return execute_plan(
+        plan,
+        save_dir,
+        fetch_icons=fetch_icons,
+        progress=progress,
+        staged=staged,
+        workers=DEFAULT_WORKERS if workers is None else workers
+    )
 
 
 if __name__ == "__main__":
     # Simple test
-    import tempfile
-
     with tempfile.TemporaryDirectory() as tmpdir:
         print(f"Testing in: {tmpdir}")
 
@@ -461,9 +1137,11 @@ if __name__ == "__main__":
             url="https://example.com",
             save_dir=tmpdir,
             notes="This is a test note",
-            fetch_icon=True
+            fetch_icon=True,
+            collect_timings=True
         )
         print(f"  Result: success={result.success}")
+        print(f"  Timings: {result.timings}")
         if result.success:
             print(f"  File: {result.file_path}")
             print(f"  Icon: {result.icon_path}")
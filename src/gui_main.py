@@ -9,6 +9,7 @@ import sys
 import os
 import ctypes
 import threading
+import webbrowser
 import customtkinter as ctk
 from tkinter import messagebox
 
@@ -16,8 +17,13 @@ from tkinter import messagebox
 if __name__ == "__main__":
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core import create_url_shortcut, validate_url, is_likely_url, sanitize_filename, ShortcutResult
+from src.core import create_url_shortcut, as_link_url, is_likely_url, sanitize_filename, ShortcutResult
+from src.batch import DEFAULT_WORKERS, DirectorySnapshot, plan_rows, execute_plan
+from src.journal import BatchJournal, find_journals, run_journaled
+from src.writer import LOCAL_DESTINATION, destination_of
 from src.config import Config, load_config, save_config
+from src.search import SearchIndex, configured_roots
+from src.metrics import configure_metrics, shutdown_metrics
 
 # App colors
 TEAL_ACCENT = "#4ecdc4"
@@ -115,22 +121,10 @@ class BatchRow(ctk.CTkFrame):
         if self.name_entry.get().strip():
             return
 
-        url = self.url_entry.get().strip()
-        if not url:
-            return
-
-        try:
-            from urllib.parse import urlparse
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            name = domain.replace('www.', '').split('.')[0].title()
-            if name:
-                self.name_entry.delete(0, 'end')
-                self.name_entry.insert(0, name)
-        except Exception:
-            pass
+        link = as_link_url(self.url_entry.get().strip())
+        if link and link.suggested_name:
+            self.name_entry.delete(0, 'end')
+            self.name_entry.insert(0, link.suggested_name)
 
     def get_data(self):
         """Return (name, url) tuple."""
@@ -157,6 +151,11 @@ class LinkDropApp(ctk.CTk):
 
         self.config_data = load_config()
         self.batch_rows = []
+        self.search_index = None
+        self._search_after = None
+
+        # Metrics are off unless enabled in config or via LINKDROP_METRICS
+        configure_metrics(self.config_data.metrics_format)
 
         self.setup_window()
         self.create_widgets()
@@ -236,13 +235,17 @@ class LinkDropApp(ctk.CTk):
         # Add tabs
         self.tab_single = self.tabview.add("  Single  ")
         self.tab_batch = self.tabview.add("  Batch  ")
+        self.tab_search = self.tabview.add("  Search  ")
 
         self.tab_single.grid_columnconfigure(0, weight=1)
         self.tab_batch.grid_columnconfigure(0, weight=1)
         self.tab_batch.grid_rowconfigure(1, weight=1)
+        self.tab_search.grid_columnconfigure(0, weight=1)
+        self.tab_search.grid_rowconfigure(1, weight=1)
 
         self.create_single_tab()
         self.create_batch_tab()
+        self.create_search_tab()
 
         # Folder selection frame
         folder_frame = ctk.CTkFrame(main_frame, fg_color=("#d0d0d0", DARKER_BG), corner_radius=10)
@@ -385,6 +388,18 @@ class LinkDropApp(ctk.CTk):
         btn_frame = ctk.CTkFrame(tab, fg_color="transparent")
         btn_frame.grid(row=4, column=0, sticky="e")
 
+        # Resume button (shown only while an interrupted batch has a journal)
+        self.batch_resume_btn = ctk.CTkButton(
+            btn_frame,
+            text="Resume",
+            width=90,
+            height=36,
+            fg_color=("#c0c0c0", "#3a3d4e"),
+            hover_color=("#a0a0a0", "#4a4d5e"),
+            text_color=("#333333", "#ffffff"),
+            command=self.resume_batch
+        )
+
         ctk.CTkButton(
             btn_frame,
             text="Clear All",
@@ -394,7 +409,7 @@ class LinkDropApp(ctk.CTk):
             hover_color=("#a0a0a0", "#4a4d5e"),
             text_color=("#333333", "#ffffff"),
             command=self.clear_batch
-        ).grid(row=0, column=0, padx=(0, 10))
+        ).grid(row=0, column=1, padx=(0, 10))
 
         self.batch_create_btn = ctk.CTkButton(
             btn_frame,
@@ -406,7 +421,85 @@ class LinkDropApp(ctk.CTk):
             text_color="#1a1f2e",
             command=self.create_batch
         )
-        self.batch_create_btn.grid(row=0, column=1)
+        self.batch_create_btn.grid(row=0, column=2)
+
+    def create_search_tab(self):
+        """Create the tab that searches shortcuts under the favorite folders."""
+        tab = self.tab_search
+
+        self.search_entry = ctk.CTkEntry(
+            tab,
+            placeholder_text="Search shortcuts by name, folder, site or comment",
+            height=36
+        )
+        self.search_entry.grid(row=0, column=0, sticky="ew", pady=(10, 10))
+        self.search_entry.bind('<KeyRelease>', lambda e: self._schedule_search())
+
+        self.search_results = ctk.CTkScrollableFrame(
+            tab,
+            fg_color=("#ffffff", "#2a3245"),
+            corner_radius=8
+        )
+        self.search_results.grid(row=1, column=0, sticky="nsew", pady=(0, 10))
+        self.search_results.grid_columnconfigure(0, weight=1)
+
+    def refresh_search_index(self):
+        """Update the search index on a worker thread (only changed files are read)."""
+        roots = configured_roots(self.config_data)
+        if not roots:
+            return
+        try:
+            # The index from the last session is searchable while it updates
+            self.search_index = self.search_index or SearchIndex()
+        except Exception:
+            return  # Search stays unavailable; creating shortcuts is unaffected
+        index = self.search_index
+
+        def do_update():
+            try:
+                index.update(roots, prune=True)
+            except Exception:
+                return
+            self.after(0, self.on_search_index_updated)
+
+        threading.Thread(target=do_update, daemon=True).start()
+
+    def on_search_index_updated(self):
+        if self.search_entry.get().strip():
+            self.run_search()
+
+    def _schedule_search(self):
+        """Search shortly after typing stops."""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(150, self.run_search)
+
+    def run_search(self):
+        """Show the shortcuts matching the search box."""
+        self._search_after = None
+        for child in self.search_results.winfo_children():
+            child.destroy()
+
+        text = self.search_entry.get().strip()
+        if not text:
+            return
+        if self.search_index is None:
+            self.status_var.set("Add favorite folders in the config to search their shortcuts")
+            return
+
+        results = self.search_index.search(text)
+        for i, result in enumerate(results):
+            ctk.CTkButton(
+                self.search_results,
+                text=f"{result.name}\n{result.url or result.path}",
+                anchor="w",
+                height=44,
+                fg_color="transparent",
+                hover_color=("#e0e0e0", "#3a3d4e"),
+                text_color=("#333333", "#ffffff"),
+                command=lambda url=result.url: url and webbrowser.open(url)
+            ).grid(row=i, column=0, sticky="ew", pady=1)
+        self.status_var.set(f"{len(results)} matching shortcuts" if results else "No matching shortcuts")
 
     def add_batch_row(self):
         """Add a new row to the batch entry table."""
@@ -473,6 +566,8 @@ class LinkDropApp(ctk.CTk):
         initial_folder = self.config_data.get_initial_folder()
         self.folder_var.set(initial_folder)
         self.update_recent_folders()
+        self.update_resume_button()
+        self.refresh_search_index()
 
         # Check clipboard for URL on startup
         self.after(100, self._check_clipboard_for_url)
@@ -521,22 +616,10 @@ class LinkDropApp(ctk.CTk):
         if self.single_name.get().strip():
             return
 
-        url = self.single_url.get().strip()
-        if not url:
-            return
-
-        try:
-            from urllib.parse import urlparse
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            name = domain.replace('www.', '').split('.')[0].title()
-            if name:
-                self.single_name.delete(0, 'end')
-                self.single_name.insert(0, name)
-        except Exception:
-            pass
+        link = as_link_url(self.single_url.get().strip())
+        if link and link.suggested_name:
+            self.single_name.delete(0, 'end')
+            self.single_name.insert(0, link.suggested_name)
 
     def clear_single(self):
         """Clear single tab fields."""
@@ -567,8 +650,8 @@ class LinkDropApp(ctk.CTk):
             self.single_name.focus_set()
             return
 
-        is_valid, msg = validate_url(url)
-        if not is_valid:
+        link = as_link_url(url)
+        if link is None:
             self.single_url.focus_set()
             return
 
@@ -600,7 +683,7 @@ class LinkDropApp(ctk.CTk):
         def do_create():
             result = create_url_shortcut(
                 name=name,
-                url=url,
+                url=link,
                 save_dir=folder,
                 fetch_icon=self.single_fetch_icon.get()
             )
@@ -633,13 +716,15 @@ class LinkDropApp(ctk.CTk):
         if not valid_rows:
             return
 
-        # Check for existing files
-        existing_files = []
-        for name, url in valid_rows:
-            safe_name = sanitize_filename(name)
-            shortcut_path = os.path.join(folder, f"{safe_name}.url")
-            if os.path.exists(shortcut_path):
-                existing_files.append(safe_name)
+        # Plan first: drops repeated rows and renames in-batch name collisions
+        plan = plan_rows(valid_rows)
+
+        # Check for existing files against one listing of the folder
+        snapshot = DirectorySnapshot(folder)
+        existing_files = [
+            entry.filename for entry in plan.to_create
+            if snapshot.exists(entry.folder, entry.filename)
+        ]
 
         if existing_files:
             if len(existing_files) == 1:
@@ -658,46 +743,121 @@ class LinkDropApp(ctk.CTk):
             if not response:
                 return
 
-        # Show progress
+        fetch_icons = self.batch_fetch_icon.get()
+
+        # Journal progress so an interrupted batch can be resumed
+        try:
+            journal = BatchJournal.create(folder, fetch_icons)
+        except OSError:
+            journal = None
+
+        self.status_var.set(f"Creating {len(plan.to_create)} shortcuts...")
+
+        if journal is not None:
+            self._run_batch(plan.entries, journal, whole_input=True)
+            return
+
+        self._show_batch_progress()
+
+        def do_batch():
+            def on_progress(done, total):
+                self.after(0, lambda p=done / total: self.batch_progress.set(p))
+
+            results = execute_plan(plan, folder, fetch_icons=fetch_icons, progress=on_progress)
+            named = [(entry.name, result) for entry, result in zip(plan.entries, results)]
+            self.after(0, lambda: self.on_batch_complete(named, folder))
+
+        threading.Thread(target=do_batch, daemon=True).start()
+
+    def resume_batch(self):
+        """Retry the unfinished rows of the most recent interrupted batch."""
+        paths = find_journals()
+        if not paths:
+            self.update_resume_button()
+            return
+
+        try:
+            journal = BatchJournal.open(paths[0])
+        except (OSError, ValueError):
+            messagebox.showerror("Resume Batch", "The batch journal could not be read.")
+            return
+
+        if not os.path.isdir(journal.save_dir):
+            messagebox.showerror("Resume Batch", f"The folder no longer exists:\n{journal.save_dir}")
+            return
+
+        entries = journal.pending()
+        response = messagebox.askyesno(
+            "Resume Batch",
+            f"Resume the interrupted batch in:\n{journal.save_dir}\n\n"
+            f"{len(entries)} unfinished shortcut(s) will be created."
+        )
+        if not response:
+            return
+
+        self.status_var.set(f"Resuming {len(entries)} shortcuts...")
+        self._run_batch(entries, journal, whole_input=journal.planned, clear=False)
+
+    def _show_batch_progress(self):
         self.batch_progress.grid(row=3, column=0, sticky="ew", pady=(0, 10))
         self.batch_progress.set(0)
-
         self.batch_create_btn.configure(state="disabled")
-        self.status_var.set(f"Creating {len(valid_rows)} shortcuts...")
+        self.batch_resume_btn.configure(state="disabled")
 
-        def do_batch():
-            results = []
-            for i, (name, url) in enumerate(valid_rows):
-                result = create_url_shortcut(
-                    name=name,
-                    url=url,
-                    save_dir=folder,
-                    fetch_icon=self.batch_fetch_icon.get()
-                )
-                results.append((name, result))
+    def _run_batch(self, entries: list, journal: BatchJournal, whole_input: bool, clear: bool = True):
+        """Create planned rows on a worker thread, journaling progress."""
+        self._show_batch_progress()
 
-                progress = (i + 1) / len(valid_rows)
-                self.after(0, lambda p=progress: self.batch_progress.set(p))
+        # Local folders keep the simple one-at-a-time path; on network
+        # shares rows overlap so their round trips aren't paid in sequence
+        remote = destination_of(journal.save_dir) != LOCAL_DESTINATION
+        workers = DEFAULT_WORKERS if remote else 1
 
-            self.after(0, lambda: self.on_batch_complete(results, folder))
+        def do_batch():
+            total = len(entries) or 1
+            named = []
+            for done, (entry, result) in enumerate(
+                run_journaled(entries, journal, workers=workers, whole_input=whole_input), start=1
+            ):
+                named.append((entry.name, result))
+                self.after(0, lambda p=done / total: self.batch_progress.set(p))
+            self.after(0, lambda: self.on_batch_complete(named, journal.save_dir, clear))
 
         threading.Thread(target=do_batch, daemon=True).start()
 
-    def on_batch_complete(self, results: list, folder: str):
+    def update_resume_button(self):
+        """Show the Resume button only while an unfinished batch journal exists."""
+        try:
+            unfinished = bool(find_journals())
+        except OSError:
+            unfinished = False
+
+        if unfinished:
+            self.batch_resume_btn.grid(row=0, column=0, padx=(0, 10))
+        else:
+            self.batch_resume_btn.grid_forget()
+
+    def on_batch_complete(self, results: list, folder: str, clear: bool = True):
         """Handle batch creation completion."""
         self.batch_create_btn.configure(state="normal")
+        self.batch_resume_btn.configure(state="normal")
         self.batch_progress.grid_forget()
+        self.update_resume_button()
 
         success_count = sum(1 for _, r in results if r.success)
-        fail_count = len(results) - success_count
+        skip_count = sum(1 for _, r in results if r.skipped)
+        fail_count = len(results) - success_count - skip_count
 
-        self.status_var.set(f"Created {success_count} shortcuts, {fail_count} failed")
+        status = f"Created {success_count} shortcuts, {fail_count} failed"
+        if skip_count:
+            status += f", {skip_count} duplicates skipped"
+        self.status_var.set(status)
 
         self.config_data.add_recent_folder(folder)
         self.update_recent_folders()
         save_config(self.config_data)
 
-        if fail_count == 0:
+        if fail_count == 0 and clear:
             self.clear_batch()
 
     def on_close(self):
@@ -706,6 +866,9 @@ class LinkDropApp(ctk.CTk):
         self.config_data.last_window_y = self.winfo_y()
         self.config_data.fetch_favicon_default = self.single_fetch_icon.get()
         save_config(self.config_data)
+        shutdown_metrics()
+        if self.search_index is not None:
+            self.search_index.close()
         self.destroy()
 
 
@@ -18,7 +18,9 @@ from tkinter import messagebox
 if __name__ == "__main__":
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core import create_url_shortcut, validate_url, is_likely_url, sanitize_filename
+from src.core import create_url_shortcut, as_link_url, is_likely_url, sanitize_filename
+from src.config import load_config
+from src.metrics import configure_metrics
 
 # App colors
 TEAL_ACCENT = "#4ecdc4"
@@ -195,22 +197,10 @@ class QuickPopup(ctk.CTk):
         if self.name_entry.get().strip():
             return
 
-        url = self.url_entry.get().strip()
-        if not url:
-            return
-
-        try:
-            from urllib.parse import urlparse
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            name = domain.replace('www.', '').split('.')[0].title()
-            if name:
-                self.name_entry.delete(0, 'end')
-                self.name_entry.insert(0, name)
-        except Exception:
-            pass
+        link = as_link_url(self.url_entry.get().strip())
+        if link and link.suggested_name:
+            self.name_entry.delete(0, 'end')
+            self.name_entry.insert(0, link.suggested_name)
 
     def create_shortcut(self):
         """Validate inputs and create the shortcut."""
@@ -226,8 +216,8 @@ class QuickPopup(ctk.CTk):
             self.name_entry.focus_set()
             return
 
-        is_valid, msg = validate_url(url)
-        if not is_valid:
+        link = as_link_url(url)
+        if link is None:
             self.url_entry.focus_set()
             return
 
@@ -254,7 +244,7 @@ class QuickPopup(ctk.CTk):
         # Create shortcut
         result = create_url_shortcut(
             name=name,
-            url=url,
+            url=link,
             save_dir=self.save_dir,
             fetch_icon=True
         )
@@ -278,6 +268,9 @@ def main():
         print(f"Error: Folder not found: {save_dir}")
         sys.exit(1)
 
+    # Metrics are off unless enabled in config or via LINKDROP_METRICS
+    configure_metrics(load_config().metrics_format)
+
     # Run the popup
     app = QuickPopup(save_dir)
     app.mainloop()
@@ -0,0 +1,279 @@
+"""
+LinkDrop Icon Maintenance
+
+Two jobs that keep shortcut icons and the icon cache in step:
+
+    repair   Finds shortcuts whose IconFile no longer exists (the cache
+             was cleared, or the files came from another machine or
+             user) and points them at this machine's cache: an icon that
+             is already cached for the domain is relinked, otherwise it
+             is fetched, once per domain.
+    gc       Deletes cached icons that no shortcut under the roots refers
+             to. Only icons older than --min-age days are removed, so an
+             icon cache warmed by prefetch for upcoming shortcuts
+             survives, and nothing is removed if part of a root couldn't
+             be read (the reference set would be incomplete).
+
+Roots default to the favorite folders and default folder from the
+config. Shortcuts outside the scanned roots (a desktop, say) aren't
+seen, so include every folder whose shortcuts use the cache before
+running gc.
+
+Usage:
+    python src/icons.py repair \\\\server\\share\\Links
+    python src/icons.py gc C:\\Links D:\\Team --dry-run
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Iterable, Iterator, Optional
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import LinkURL, as_link_url, fetch_favicon, get_icon_cache_dir, get_icon_cache_path, update_shortcut_file
+from src.inventory import DEFAULT_WORKERS, InventoryCache, scan_inventory
+
+
+DEFAULT_MIN_AGE_DAYS = 30
+
+STATUS_RELINKED = "relinked"     # Pointed at an icon already in the cache
+STATUS_FETCHED = "fetched"       # Icon fetched, shortcut pointed at it
+STATUS_FAILED = "failed"
+STATUS_PLANNED = "planned"       # Dry run
+STATUS_DELETED = "deleted"
+STATUS_UNREFERENCED = "unreferenced"  # Dry run of gc
+
+
+def _icon_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+@dataclass
+class IconScan:
+    """What a scan of the roots found out about icon references."""
+    broken: list                    # (InventoryRecord, LinkURL) with a missing IconFile
+    referenced: set                 # _icon_key() of every existing IconFile
+    shortcuts: int = 0
+    errors: int = 0                 # Folders or files that couldn't be read
+
+
+def scan_icons(roots: Iterable[str], workers: int = DEFAULT_WORKERS) -> IconScan:
+    """
+    Find broken icon references and the set of icons in use.
+
+    Each distinct IconFile path is checked once, however many shortcuts
+    share it.
+    """
+    scan = IconScan([], set())
+    exists: dict[str, bool] = {}
+    for root in roots:
+        for record in scan_inventory(root, workers, InventoryCache.for_root(root)):
+            if record.error:
+                scan.errors += 1
+                continue
+            scan.shortcuts += 1
+            if not record.icon_file:
+                continue
+            key = _icon_key(record.icon_file)
+            if key not in exists:
+                exists[key] = os.path.isfile(record.icon_file)
+            if exists[key]:
+                scan.referenced.add(key)
+                continue
+            link = as_link_url(record.url or '')
+            if link is not None:
+                scan.broken.append((record, link))
+    return scan
+
+
+@dataclass
+class IconRepair:
+    """One shortcut whose icon reference was (or would be) repaired."""
+    path: str
+    url: Optional[str]
+    domain: str
+    old_icon: Optional[str]
+    new_icon: Optional[str]
+    status: str
+    error: Optional[str] = None
+
+
+def _resolve_icon(link: LinkURL, fetch: bool) -> tuple:
+    """(icon path or None, status) for a domain."""
+    cached = get_icon_cache_path(link)
+    if cached and os.path.isfile(cached):
+        return cached, STATUS_RELINKED
+    if not fetch:
+        return None, STATUS_FAILED
+    icon_path = fetch_favicon(link)
+    return icon_path, STATUS_FETCHED if icon_path else STATUS_FAILED
+
+
+def repair_icons(
+    broken: list,
+    fetch: bool = True,
+    workers: int = DEFAULT_WORKERS,
+    dry_run: bool = False
+) -> Iterator[IconRepair]:
+    """
+    Point shortcuts with missing icons at this machine's icon cache.
+
+    Args:
+        broken: (InventoryRecord, LinkURL) pairs from scan_icons()
+        fetch: Fetch icons that aren't cached (otherwise only relink)
+        workers: Domains fetched and files rewritten concurrently
+        dry_run: Resolve nothing, change nothing; report what would happen
+
+    Yields:
+        IconRepair per shortcut
+    """
+    by_domain: dict[str, list] = {}
+    for record, link in broken:
+        by_domain.setdefault(link.cache_key, []).append((record, link))
+
+    if dry_run:
+        for domain, items in by_domain.items():
+            for record, link in items:
+                yield IconRepair(record.path, record.url, domain, record.icon_file, None, STATUS_PLANNED)
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="linkdrop-icons") as executor:
+        resolved = executor.map(lambda items: _resolve_icon(items[0][1], fetch), by_domain.values())
+
+        def relink(item: tuple) -> IconRepair:
+            (record, _), domain, icon_path, status = item
+            repair = IconRepair(record.path, record.url, domain, record.icon_file, icon_path, status)
+            if icon_path is None:
+                repair.error = "No icon found for this site" if fetch else "Not cached (fetching is off)"
+                return repair
+            try:
+                update_shortcut_file(record.path, icon_file=icon_path)
+            except OSError as e:
+                repair.status = STATUS_FAILED
+                repair.error = f"Rewrite failed: {e}"
+            return repair
+
+        items = [
+            (pair, domain, icon_path, status)
+            for (domain, pairs), (icon_path, status) in zip(by_domain.items(), resolved)
+            for pair in pairs
+        ]
+        yield from executor.map(relink, items)
+
+
+def collect_garbage(
+    referenced: set,
+    min_age_days: float = DEFAULT_MIN_AGE_DAYS,
+    dry_run: bool = False
+) -> Iterator[tuple]:
+    """
+    Delete cached icons that aren't referenced.
+
+    Args:
+        referenced: _icon_key() of the icons in use (from scan_icons())
+        min_age_days: Keep icons modified more recently than this
+        dry_run: Only report what would be deleted
+
+    Yields:
+        (icon path, size in bytes, status, error)
+    """
+    cutoff = time.time() - min_age_days * 86400
+    with os.scandir(get_icon_cache_dir()) as it:
+        candidates = [item for item in it if item.name.lower().endswith('.ico') and item.is_file()]
+    for item in candidates:
+        if _icon_key(item.path) in referenced:
+            continue
+        try:
+            stat = item.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                os.remove(item.path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            yield item.path, 0, STATUS_FAILED, str(e)
+            continue
+        yield item.path, stat.st_size, STATUS_UNREFERENCED if dry_run else STATUS_DELETED, None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_FAILURES, EXIT_USAGE
+    from src.config import load_config
+    from src.search import configured_roots
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop icons",
+        description="Repair shortcuts with missing icons, or clean unused icons out of the cache."
+    )
+    parser.add_argument("job", choices=("repair", "gc"), help="repair: fix missing icons; gc: delete unused cached icons")
+    parser.add_argument("roots", nargs="*", help="Folders of shortcuts (default: favorite and default folders)")
+    parser.add_argument("--no-fetch", action="store_true", help="repair: only relink icons that are already cached")
+    parser.add_argument(
+        "--min-age",
+        type=float,
+        default=DEFAULT_MIN_AGE_DAYS,
+        help=f"gc: keep icons changed within this many days (default: {DEFAULT_MIN_AGE_DAYS})"
+    )
+    parser.add_argument("--force", action="store_true", help="gc: delete even if some folders couldn't be read")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Folders scanned, icons fetched and files rewritten concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Show what would change, change nothing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    roots = args.roots or configured_roots(load_config())
+    if not roots:
+        print("Error: No folders given and none configured", file=sys.stderr)
+        return EXIT_USAGE
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"Error: Directory does not exist: {root}", file=sys.stderr)
+            return EXIT_USAGE
+
+    start = time.perf_counter()
+    scan = scan_icons(roots, args.workers)
+    counts: dict[str, int] = {}
+
+    if args.job == "repair":
+        for repair in repair_icons(scan.broken, not args.no_fetch, args.workers, args.dry_run):
+            counts[repair.status] = counts.get(repair.status, 0) + 1
+            sys.stdout.write(json.dumps(asdict(repair)) + '\n')
+        summary = ', '.join(f"{count} {status}" for status, count in counts.items()) or 'no missing icons'
+        summary = f"{scan.shortcuts} shortcuts: {summary}"
+    else:
+        if scan.errors and not args.force:
+            print(
+                f"Error: {scan.errors} folders or files couldn't be read, so some icons in use may be missed; "
+                f"nothing deleted (use --force to delete anyway)",
+                file=sys.stderr
+            )
+            return EXIT_FAILURES
+        freed = 0
+        for path, size, status, error in collect_garbage(scan.referenced, args.min_age, args.dry_run):
+            counts[status] = counts.get(status, 0) + 1
+            freed += size
+            sys.stdout.write(json.dumps({'icon': path, 'size': size, 'status': status, 'error': error}) + '\n')
+        summary = ', '.join(f"{count} {status}" for status, count in counts.items()) or 'no unused icons'
+        summary = f"{len(scan.referenced)} icons in use; {summary} ({freed / 1024:.0f} KB)"
+    sys.stdout.flush()
+
+    if not args.quiet:
+        errors = f", {scan.errors} unreadable" if scan.errors else ""
+        print(f"{summary}{errors} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return EXIT_FAILURES if counts.get(STATUS_FAILED) or scan.errors else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
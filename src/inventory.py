@@ -0,0 +1,308 @@
+"""
+LinkDrop Shortcut Inventory
+
+Reads back every .url file under a folder tree: path, URL, IconFile,
+Comment and modification time. Built for shares with tens of thousands
+of shortcuts:
+
+- Directories are listed with os.scandir on a thread pool, so the round
+  trips of a network share overlap instead of adding up.
+- Files are read in chunks on the same pool and parsed with the small
+  [InternetShortcut] reader in core, not configparser.
+- Results stream out as they are found.
+- A per-root cache under %LOCALAPPDATA%\\LinkDrop\\inventory\\ remembers
+  each file's size and mtime; files that haven't changed since the last
+  scan aren't opened again.
+
+Usage:
+    python src/inventory.py \\\\server\\share\\Links
+    python src/inventory.py C:\\Links D:\\Team --format csv > links.csv
+"""
+
+import sys
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import read_shortcut_file
+
+
+DEFAULT_WORKERS = 16
+READ_CHUNK = 64           # Files parsed per pool task
+CACHE_VERSION = 1
+
+# Folders skipped while walking (leftovers of interrupted staged batches)
+SKIPPED_PREFIXES = (".linkdrop-staging-",)
+
+
+@dataclass
+class InventoryRecord:
+    """One .url file, or a folder that couldn't be read."""
+    path: str                          # Absolute path
+    relative_path: str                 # Path relative to the scanned root
+    url: Optional[str] = None
+    icon_file: Optional[str] = None
+    comment: Optional[str] = None
+    mtime_ns: int = 0
+    size: int = 0
+    cached: bool = False               # Taken from the cache, file not opened
+    error: Optional[str] = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'url': self.url,
+            'icon_file': self.icon_file,
+            'comment': self.comment,
+            'mtime': self.mtime,
+            'size': self.size,
+            'error': self.error,
+        }
+
+
+def get_inventory_dir() -> str:
+    """
+    Get the inventory cache directory path.
+
+    Returns:
+        Path to %LOCALAPPDATA%\\LinkDrop\\inventory\\
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    inventory_dir = os.path.join(local_app_data, 'LinkDrop', 'inventory')
+    os.makedirs(inventory_dir, exist_ok=True)
+    return inventory_dir
+
+
+class InventoryCache:
+    """
+    Size and mtime of every file seen by the last scan of a root.
+
+    get() is called from the scanner's worker threads and only reads;
+    the scan itself calls put() on the consuming thread and replaces the
+    cache contents once a scan finishes, so deleted files drop out.
+    """
+
+    def __init__(self, path: Optional[str] = None, entries: Optional[dict[str, list]] = None):
+        self.path = path
+        self._entries: dict[str, list] = entries or {}
+        self._seen: dict[str, list] = {}
+
+    @classmethod
+    def for_root(cls, root: str) -> 'InventoryCache':
+        """Load the cache for a root (empty if there is none or it's unreadable)."""
+        key = hashlib.sha1(os.path.normcase(os.path.abspath(root)).encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(get_inventory_dir(), key + '.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                return cls(path, data.get('files') or {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, relative_path: str, mtime_ns: int, size: int) -> Optional[tuple]:
+        """(url, icon_file, comment) if the file is unchanged since it was cached."""
+        cached = self._entries.get(relative_path)
+        if cached and cached[0] == mtime_ns and cached[1] == size:
+            return cached[2], cached[3], cached[4]
+        return None
+
+    def put(self, record: InventoryRecord) -> None:
+        self._seen[record.relative_path] = [
+            record.mtime_ns, record.size, record.url, record.icon_file, record.comment
+        ]
+
+    def finish(self) -> None:
+        """Replace the cached entries with those seen by this scan and save."""
+        self._entries, self._seen = self._seen, {}
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'files': self._entries}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # A missing cache only costs time on the next scan
+
+
+@dataclass
+class _Listing:
+    directories: list[str]
+    records: list[InventoryRecord]     # Cache hits and folder errors
+    to_read: list[InventoryRecord]     # Stat'ed, still to be opened
+
+
+def _list_directory(root: str, relative: str, cache: Optional[InventoryCache]) -> _Listing:
+    listing = _Listing([], [], [])
+    directory = os.path.join(root, relative) if relative else root
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                relative_path = os.path.join(relative, item.name) if relative else item.name
+                try:
+                    if item.is_dir(follow_symlinks=False):
+                        if not item.name.startswith(SKIPPED_PREFIXES):
+                            listing.directories.append(relative_path)
+                        continue
+                    if item.name[-4:].lower() != '.url':
+                        continue
+                    stat = item.stat(follow_symlinks=False)
+                except OSError as e:
+                    listing.records.append(InventoryRecord(item.path, relative_path, error=f"Cannot read file: {e}"))
+                    continue
+                record = InventoryRecord(item.path, relative_path, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                hit = cache.get(relative_path, record.mtime_ns, record.size) if cache is not None else None
+                if hit is not None:
+                    record.url, record.icon_file, record.comment = hit
+                    record.cached = True
+                    listing.records.append(record)
+                else:
+                    listing.to_read.append(record)
+    except OSError as e:
+        listing.records.append(InventoryRecord(directory, relative, error=f"Cannot read folder: {e}"))
+    return listing
+
+
+def _read_records(records: list[InventoryRecord]) -> list[InventoryRecord]:
+    for record in records:
+        try:
+            shortcut = read_shortcut_file(record.path)
+        except OSError as e:
+            record.error = f"Cannot read file: {e}"
+            continue
+        record.url, record.icon_file, record.comment = shortcut.url, shortcut.icon_file, shortcut.comment
+    return records
+
+
+def scan_inventory(
+    root: str,
+    workers: int = DEFAULT_WORKERS,
+    cache: Optional[InventoryCache] = None
+) -> Iterator[InventoryRecord]:
+    """
+    Stream every .url file below root.
+
+    Folders that can't be listed and files that can't be read are
+    yielded as records with error set; the scan carries on.
+
+    Args:
+        root: Folder to scan
+        workers: Directories listed and file chunks read concurrently
+        cache: Cache of the previous scan of this root; unchanged files
+            are taken from it. It is updated and saved when the scan
+            runs to the end.
+
+    Yields:
+        InventoryRecord per file, in no particular order
+    """
+    root = os.path.abspath(root)
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="linkdrop-inventory")
+    try:
+        pending = {executor.submit(_list_directory, root, '', cache)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if isinstance(result, _Listing):
+                    for relative in result.directories:
+                        pending.add(executor.submit(_list_directory, root, relative, cache))
+                    for start in range(0, len(result.to_read), READ_CHUNK):
+                        pending.add(executor.submit(_read_records, result.to_read[start:start + READ_CHUNK]))
+                    records = result.records
+                else:
+                    records = result
+                for record in records:
+                    if cache is not None and record.error is None:
+                        cache.put(record)
+                    yield record
+        if cache is not None:
+            cache.finish()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_roots(
+    roots: Iterable[str],
+    workers: int = DEFAULT_WORKERS,
+    use_cache: bool = True
+) -> Iterator[InventoryRecord]:
+    """scan_inventory() over several roots, each with its own cache."""
+    for root in roots:
+        cache = InventoryCache.for_root(root) if use_cache else None
+        yield from scan_inventory(root, workers, cache)
+
+
+CSV_FIELDS = ('path', 'url', 'icon_file', 'comment', 'mtime', 'size', 'error')
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_FAILURES, EXIT_USAGE
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop inventory",
+        description="List every shortcut under one or more folders (path, URL, icon, comment, mtime)."
+    )
+    parser.add_argument("roots", nargs="+", help="Folders to scan")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Folders listed and files read concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="Output format (default: jsonl)")
+    parser.add_argument("--no-cache", action="store_true", help="Read every file, ignoring the previous scan")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    for root in args.roots:
+        if not os.path.isdir(root):
+            print(f"Error: Directory does not exist: {root}", file=sys.stderr)
+            return EXIT_USAGE
+
+    start = time.perf_counter()
+    total = cached = errors = 0
+    writer = csv.writer(sys.stdout, lineterminator='\n') if args.format == "csv" else None
+    if writer:
+        writer.writerow(CSV_FIELDS)
+
+    for record in scan_roots(args.roots, args.workers, not args.no_cache):
+        total += 1
+        cached += record.cached
+        errors += record.error is not None
+        data = record.to_dict()
+        if writer:
+            writer.writerow([data[name] for name in CSV_FIELDS])
+        else:
+            sys.stdout.write(json.dumps(data) + '\n')
+    sys.stdout.flush()
+
+    if not args.quiet:
+        print(
+            f"{total - errors} shortcuts ({cached} unchanged since the last scan), "
+            f"{errors} errors in {time.perf_counter() - start:.1f}s",
+            file=sys.stderr
+        )
+    return EXIT_FAILURES if errors else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+LinkDrop Batch Journal
+
+Makes long batches resumable. While a batch runs, every planned row and
+every finished row is appended to a journal file in
+%LOCALAPPDATA%\\LinkDrop\\journals\\, one JSON object per line:
+
+    {"type": "batch", "id": ..., "save_dir": ..., "fetch_icons": ..., "overwrite": ...}
+    {"type": "row", "line": 12, "name": ..., "filename": ..., "url": ..., ...}
+    {"type": "result", "line": 12, "done": true, "error": null}
+    {"type": "planned"}     (every row of the input has been recorded)
+
+If the machine sleeps or the network drops halfway through, the journal
+says exactly which rows were finished. Resuming skips those and retries
+the failed and pending rows only. Once every row is done the journal is
+deleted; a journal that is still on disk is an unfinished batch.
+
+Appending one line per event keeps the cost per row tiny, and a line
+cut short by a crash is simply ignored when the journal is read back.
+"""
+
+import os
+import json
+import time
+import uuid
+from typing import IO, Iterable, Iterator, Optional, Tuple
+
+from src.core import LinkURL, ShortcutResult
+from src.batch import (
+    PlannedShortcut, ACTION_CREATE, OVERWRITE_REPLACE, DEFAULT_WORKERS, execute_stream
+)
+from src.writer import ShortcutWriter
+
+
+JOURNAL_EXTENSION = ".journal"
+SYNC_EVERY = 64  # Records between fsyncs, so a power cut loses little
+
+
+def get_journal_dir() -> str:
+    """
+    Get the journal directory path.
+
+    Returns:
+        Path to %LOCALAPPDATA%\\LinkDrop\\journals\\
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    journal_dir = os.path.join(local_app_data, 'LinkDrop', 'journals')
+    os.makedirs(journal_dir, exist_ok=True)
+    return journal_dir
+
+
+def find_journals() -> list[str]:
+    """
+    List the journals of unfinished batches, newest first.
+
+    Returns:
+        Journal file paths
+    """
+    journal_dir = get_journal_dir()
+    paths = [
+        os.path.join(journal_dir, name)
+        for name in os.listdir(journal_dir)
+        if name.endswith(JOURNAL_EXTENSION)
+    ]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def resolve_journal(ref: str) -> str:
+    """
+    Find a journal by path or by id.
+
+    Raises:
+        FileNotFoundError: If there is no such journal
+    """
+    if os.path.isfile(ref):
+        return ref
+    path = os.path.join(get_journal_dir(), ref + JOURNAL_EXTENSION)
+    if os.path.isfile(path):
+        return path
+    raise FileNotFoundError(f"No unfinished batch journal: {ref}")
+
+
+def _entry_from_record(record: dict) -> PlannedShortcut:
+    entry = PlannedShortcut(
+        line_number=record['line'],
+        name=record['name'],
+        filename=record['filename'],
+        url=record['url'],
+        notes=record.get('notes'),
+        action=record.get('action', ACTION_CREATE),
+        error=record.get('error'),
+        folder=record.get('folder', ''),
+    )
+    if entry.action == ACTION_CREATE:
+        entry.link = LinkURL.parse(entry.url)
+        entry.cache_key = entry.link.cache_key
+    return entry
+
+
+class BatchJournal:
+    """
+    Append-only record of one batch run.
+
+    Create one with BatchJournal.create() for a new batch, or
+    BatchJournal.open() to resume an unfinished one.
+    """
+
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self.header = header
+        self.rows: dict[int, dict] = {}   # Line number -> row record (only kept when resuming)
+        self.recorded: set[int] = set()   # Line numbers with a row record
+        self.done: set[int] = set()       # Line numbers created or skipped
+        self.planned = False              # The whole input has been recorded
+        self.removed = False
+        self._file: Optional[IO[str]] = None
+        self._unsynced = 0
+        self._torn = False                # The file ends in a partial line
+
+    @property
+    def id(self) -> str:
+        return self.header['id']
+
+    @property
+    def save_dir(self) -> str:
+        return self.header['save_dir']
+
+    @property
+    def fetch_icons(self) -> bool:
+        return self.header.get('fetch_icons', True)
+
+    @property
+    def overwrite(self) -> str:
+        return self.header.get('overwrite', OVERWRITE_REPLACE)
+
+    @property
+    def outstanding(self) -> int:
+        """Recorded rows that still have to be created."""
+        return len(self.recorded - self.done)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.planned and not self.outstanding
+
+    @classmethod
+    def create(
+        cls,
+        save_dir: str,
+        fetch_icons: bool = True,
+        overwrite: str = OVERWRITE_REPLACE
+    ) -> 'BatchJournal':
+        """
+        Start the journal of a new batch.
+
+        Args:
+            save_dir: Directory the batch writes to
+            fetch_icons: Whether the batch fetches favicons
+            overwrite: The batch's overwrite policy
+
+        Returns:
+            The open journal
+        """
+        # Sortable by start time; the random part keeps batches started in the same second apart
+        batch_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        header = {
+            'type': 'batch',
+            'id': batch_id,
+            'save_dir': os.path.abspath(save_dir),
+            'fetch_icons': bool(fetch_icons),
+            'overwrite': overwrite,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        journal = cls(os.path.join(get_journal_dir(), batch_id + JOURNAL_EXTENSION), header)
+        journal._write(header)
+        return journal
+
+    @classmethod
+    def open(cls, path: str) -> 'BatchJournal':
+        """
+        Read an existing journal and reopen it for appending.
+
+        Raises:
+            ValueError: If the file isn't a batch journal
+        """
+        header = None
+        rows: dict[int, dict] = {}
+        done: set[int] = set()
+        planned = False
+        line = '\n'
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line after a crash
+                kind = record.get('type')
+                if kind == 'batch':
+                    header = record
+                elif kind == 'row':
+                    rows[record['line']] = record
+                elif kind == 'result':
+                    if record.get('done'):
+                        done.add(record['line'])
+                    else:
+                        done.discard(record['line'])
+                elif kind == 'planned':
+                    planned = True
+
+        if header is None:
+            raise ValueError(f"Not a batch journal: {path}")
+
+        journal = cls(path, header)
+        journal.rows = rows
+        journal.recorded = set(rows)
+        journal.done = done
+        journal.planned = planned
+        journal._torn = not line.endswith('\n')
+        return journal
+
+    def pending(self) -> list[PlannedShortcut]:
+        """The recorded rows that failed or never finished, in input order."""
+        return [
+            _entry_from_record(self.rows[line])
+            for line in sorted(self.recorded - self.done)
+        ]
+
+    def _write(self, record: dict) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._torn:
+                self._file.write('\n')
+                self._torn = False
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= SYNC_EVERY:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def record_row(self, entry: PlannedShortcut) -> None:
+        """Record a planned row (once; rows already in the journal are ignored)."""
+        if entry.line_number in self.recorded:
+            return
+        self.recorded.add(entry.line_number)
+        self._write({
+            'type': 'row',
+            'line': entry.line_number,
+            'name': entry.name,
+            'filename': entry.filename,
+            'url': entry.url,
+            'notes': entry.notes,
+            'folder': entry.folder,
+            'action': entry.action,
+            'error': entry.error,
+        })
+
+    def record_result(self, entry: PlannedShortcut, result: ShortcutResult) -> None:
+        """
+        Record a finished row.
+
+        Created and skipped rows count as done, and so do rows that can
+        only fail again however often they are retried: rows the plan
+        already rejected (an invalid URL) and rows refused because their
+        file exists under the 'error' overwrite policy (the failed
+        result has file_path set).
+        """
+        conflict = not result.success and result.file_path is not None
+        done = result.success or result.skipped or conflict or entry.action != ACTION_CREATE
+        if done:
+            self.done.add(entry.line_number)
+        else:
+            self.done.discard(entry.line_number)
+        self._write({'type': 'result', 'line': entry.line_number, 'done': done, 'error': result.error})
+
+    def mark_planned(self) -> None:
+        """Record that every row of the input is in the journal."""
+        if not self.planned:
+            self.planned = True
+            self._write({'type': 'planned'})
+
+    def track(self, entries: Iterable[PlannedShortcut], whole_input: bool = True) -> Iterator[PlannedShortcut]:
+        """
+        Record rows as they pass through, skipping rows already done.
+
+        If whole_input is True, the journal is marked as planned once
+        entries is exhausted.
+        """
+        for entry in entries:
+            if entry.line_number in self.done:
+                continue
+            self.record_row(entry)
+            yield entry
+        if whole_input:
+            self.mark_planned()
+
+    def close(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> bool:
+        """
+        Close the journal, deleting it if the batch is complete.
+
+        A journal that recorded no rows (the input couldn't be read) has
+        nothing to resume and is deleted too.
+
+        Returns:
+            True if the journal was deleted
+        """
+        self.close()
+        if (self.is_complete or not self.recorded) and not self.removed:
+            try:
+                os.remove(self.path)
+                self.removed = True
+            except OSError:
+                pass
+        return self.removed
+
+
+def run_journaled(
+    entries: Iterable[PlannedShortcut],
+    journal: BatchJournal,
+    workers: int = DEFAULT_WORKERS,
+    ordered: bool = True,
+    whole_input: bool = True,
+    writer: Optional[ShortcutWriter] = None
+) -> Iterator[Tuple[PlannedShortcut, ShortcutResult]]:
+    """
+    execute_stream() with every planned and finished row journaled.
+
+    The destination, icon and overwrite settings come from the journal,
+    so a resumed batch behaves like the original run. Rows the journal
+    already has as done are left out. The journal is deleted when the
+    batch completes, and kept (for resuming) if any row failed or the
+    caller stopped early.
+
+    Args:
+        entries: Planned rows, e.g. from iter_plan(), or journal.pending()
+        journal: Journal from BatchJournal.create() or BatchJournal.open()
+        workers: Concurrent rows (1 runs everything on the calling thread)
+        ordered: Yield in input order; if False, yield in completion order
+        whole_input: entries is the entire batch input (False when
+            retrying journal.pending() of a journal that isn't planned)
+        writer: Writer to create the files through (default: a new one)
+
+    Yields:
+        (PlannedShortcut, ShortcutResult) for every row carried out
+    """
+    try:
+        for entry, result in execute_stream(
+            journal.track(entries, whole_input),
+            journal.save_dir,
+            fetch_icons=journal.fetch_icons,
+            workers=workers,
+            ordered=ordered,
+            overwrite=journal.overwrite,
+            writer=writer
+        ):
+            journal.record_result(entry, result)
+            yield entry, result
+    finally:
+        journal.finish()
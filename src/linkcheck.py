@@ -0,0 +1,370 @@
+"""
+LinkDrop Dead-Link Checker
+
+Checks that the shortcuts in .url files still lead somewhere. Each
+distinct URL is requested once, however many shortcuts point at it:
+
+- HEAD first; servers that refuse HEAD or answer it with an error get a
+  GET for the first byte only (Range: bytes=0-0), so pages aren't
+  downloaded.
+- Redirects are followed one hop at a time and recorded, so the report
+  shows the chain, the final URL and whether every hop was permanent
+  (301/308).
+- Requests share the connection pool used for favicons, at most
+  --per-host at once to any one host, and no more than --rate per
+  second overall.
+
+Each shortcut is classified as ok, redirected, restricted (401/403:
+the link works but needs a login), broken (other 4xx/5xx) or
+unreachable (DNS, connection or timeout errors). Non-web links
+(file:, mailto: and the like) are skipped.
+
+With --fix-redirects, shortcuts whose link moved permanently to a
+working page are rewritten in place to the final URL; Comment, icon
+and everything else in the file are kept.
+
+Usage:
+    python src/linkcheck.py \\\\server\\share\\Links
+    python src/linkcheck.py C:\\Links --report links.json --fix-redirects
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urljoin, urlsplit
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import FAVICON_TIMEOUT, get_http_session, read_shortcut_file, update_shortcut_file
+from src.inventory import InventoryCache, scan_inventory
+
+
+DEFAULT_WORKERS = 32
+DEFAULT_PER_HOST = 4
+DEFAULT_RATE = 100.0          # Requests per second, all hosts together
+MAX_REDIRECTS = 10
+
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+PERMANENT_STATUSES = frozenset({301, 308})
+RESTRICTED_STATUSES = frozenset({401, 403, 407})
+
+# Outcomes
+OUTCOME_OK = "ok"
+OUTCOME_REDIRECTED = "redirected"
+OUTCOME_RESTRICTED = "restricted"
+OUTCOME_BROKEN = "broken"
+OUTCOME_UNREACHABLE = "unreachable"
+OUTCOME_SKIPPED = "skipped"
+OUTCOMES = (OUTCOME_OK, OUTCOME_REDIRECTED, OUTCOME_RESTRICTED, OUTCOME_BROKEN, OUTCOME_UNREACHABLE, OUTCOME_SKIPPED)
+
+
+class RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HostLimits:
+    """One semaphore per host, created on first use."""
+
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._semaphores: dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.Semaphore(self.per_host)
+            return semaphore
+
+
+@dataclass
+class LinkStatus:
+    """The result of checking one URL."""
+    url: str
+    outcome: str
+    status: Optional[int] = None           # Final HTTP status
+    final_url: Optional[str] = None
+    redirects: list = field(default_factory=list)  # [status, location] per hop
+    method: Optional[str] = None           # Method of the final request (HEAD or GET)
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def permanent(self) -> bool:
+        """Every redirect hop was permanent."""
+        return bool(self.redirects) and all(status in PERMANENT_STATUSES for status, _ in self.redirects)
+
+
+@dataclass
+class CheckedShortcut:
+    """A .url file with the status of its link."""
+    path: str
+    link: LinkStatus
+    fixed: bool = False                    # Rewritten to the final URL
+    error: Optional[str] = None            # The file couldn't be read or rewritten
+
+    def to_dict(self) -> dict:
+        record = {'path': self.path, 'fixed': self.fixed}
+        record.update(asdict(self.link))
+        record['permanent'] = self.link.permanent
+        if self.error:
+            record['error'] = self.error
+        return record
+
+
+class LinkChecker:
+    """Checks URLs concurrently within per-host and global limits."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        per_host: int = DEFAULT_PER_HOST,
+        rate: float = DEFAULT_RATE,
+        timeout: float = FAVICON_TIMEOUT * 2
+    ):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.hosts = HostLimits(per_host)
+        self.limiter = RateLimiter(rate)
+        self.session = get_http_session()
+
+    def _request(self, method: str, url: str):
+        headers = {'Range': 'bytes=0-0'} if method == 'GET' else None
+        with self.hosts.get(urlsplit(url).netloc.lower()):
+            self.limiter.wait()
+            response = self.session.request(
+                method, url, headers=headers, timeout=self.timeout, allow_redirects=False, stream=True
+            )
+            response.close()
+        return response
+
+    def check(self, url: str) -> LinkStatus:
+        """
+        Check one URL.
+
+        Returns:
+            LinkStatus (never raises for network errors)
+        """
+        import requests
+
+        start = time.perf_counter()
+        result = LinkStatus(url, OUTCOME_UNREACHABLE)
+        current = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                method = 'HEAD'
+                response = self._request(method, current)
+                if response.status_code >= 400:
+                    # Plenty of servers reject or mishandle HEAD
+                    method = 'GET'
+                    response = self._request(method, current)
+                location = response.headers.get('Location')
+                if response.status_code in REDIRECT_STATUSES and location:
+                    current = urljoin(current, location)
+                    result.redirects.append([response.status_code, current])
+                    continue
+                result.status = response.status_code
+                result.method = method
+                result.final_url = current
+                break
+            else:
+                result.error = f"More than {MAX_REDIRECTS} redirects"
+        except requests.RequestException as e:
+            result.error = f"{type(e).__name__}: {e}"
+        except ValueError as e:
+            result.error = f"Invalid URL: {e}"
+
+        status = result.status
+        if status is None:
+            result.outcome = OUTCOME_UNREACHABLE
+        elif status < 400 or status == 416:
+            result.outcome = OUTCOME_REDIRECTED if result.redirects else OUTCOME_OK
+        elif status in RESTRICTED_STATUSES:
+            result.outcome = OUTCOME_RESTRICTED
+        else:
+            result.outcome = OUTCOME_BROKEN
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def check_all(self, urls: Iterable[str]) -> Iterator[LinkStatus]:
+        """Check URLs concurrently, yielding results as they complete."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="linkdrop-linkcheck") as executor:
+            futures = [executor.submit(self.check, url) for url in urls]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def collect_shortcuts(paths: Iterable[str]) -> tuple[dict[str, list[str]], list[CheckedShortcut]]:
+    """
+    Read the links of .url files and of every .url file under folders.
+
+    Returns:
+        (URL -> paths of the shortcuts pointing at it, shortcuts that
+        were skipped or couldn't be read)
+    """
+    by_url: dict[str, list[str]] = {}
+    skipped: list[CheckedShortcut] = []
+
+    def add(path: str, url: Optional[str], error: Optional[str] = None) -> None:
+        if error:
+            skipped.append(CheckedShortcut(path, LinkStatus(url or '', OUTCOME_SKIPPED), error=error))
+        elif not url or urlsplit(url).scheme.lower() not in ('http', 'https'):
+            skipped.append(CheckedShortcut(path, LinkStatus(url or '', OUTCOME_SKIPPED)))
+        else:
+            by_url.setdefault(url, []).append(path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            for record in scan_inventory(path, cache=InventoryCache.for_root(path)):
+                add(record.path, record.url, record.error)
+        else:
+            try:
+                add(os.path.abspath(path), read_shortcut_file(path).url)
+            except OSError as e:
+                add(os.path.abspath(path), None, f"Cannot read file: {e}")
+    return by_url, skipped
+
+
+def check_shortcuts(
+    paths: Iterable[str],
+    checker: Optional[LinkChecker] = None,
+    fix_redirects: bool = False
+) -> Iterator[CheckedShortcut]:
+    """
+    Check the links of .url files (and folders of them).
+
+    Args:
+        paths: .url files and folders
+        checker: LinkChecker to use (default settings if None)
+        fix_redirects: Rewrite shortcuts whose link moved permanently to
+            a working page to the final URL
+
+    Yields:
+        CheckedShortcut per shortcut; skipped ones first, the rest as
+        their URLs complete
+    """
+    checker = checker or LinkChecker()
+    by_url, skipped = collect_shortcuts(paths)
+    yield from skipped
+
+    for link in checker.check_all(by_url):
+        fix = fix_redirects and link.permanent and link.outcome == OUTCOME_REDIRECTED
+        for path in by_url[link.url]:
+            shortcut = CheckedShortcut(path, link)
+            if fix:
+                try:
+                    update_shortcut_file(path, url=link.final_url)
+                    shortcut.fixed = True
+                except OSError as e:
+                    shortcut.error = f"Failed to rewrite: {e}"
+            yield shortcut
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_FAILURES, EXIT_USAGE
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop check",
+        description="Find shortcuts whose links are broken or have moved."
+    )
+    parser.add_argument("paths", nargs="+", help=".url files or folders of them")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Requests in flight (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=DEFAULT_PER_HOST,
+        help=f"Requests in flight to any one host (default: {DEFAULT_PER_HOST})"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help=f"Most requests per second overall, 0 for no limit (default: {DEFAULT_RATE:g})"
+    )
+    parser.add_argument("--timeout", type=float, default=FAVICON_TIMEOUT * 2, help="Seconds per request")
+    parser.add_argument(
+        "--fix-redirects",
+        action="store_true",
+        help="Rewrite shortcuts whose link moved permanently (301/308) to the final URL"
+    )
+    parser.add_argument("--report", help="Write a JSON report to this file")
+    parser.add_argument("--all", action="store_true", help="Print working links too, not just problems")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"Error: No such file or folder: {path}", file=sys.stderr)
+            return EXIT_USAGE
+
+    start = time.perf_counter()
+    checker = LinkChecker(args.workers, args.per_host, args.rate, args.timeout)
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    fixed = 0
+    records = []
+
+    for shortcut in check_shortcuts(args.paths, checker, args.fix_redirects):
+        counts[shortcut.link.outcome] += 1
+        fixed += shortcut.fixed
+        record = shortcut.to_dict()
+        if args.report:
+            records.append(record)
+        if args.all or shortcut.link.outcome not in (OUTCOME_OK, OUTCOME_SKIPPED) or shortcut.error:
+            sys.stdout.write(json.dumps(record) + '\n')
+            sys.stdout.flush()
+
+    elapsed = time.perf_counter() - start
+    if args.report:
+        try:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'summary': dict(counts, fixed=fixed, elapsed=round(elapsed, 3)),
+                    'shortcuts': sorted(records, key=lambda r: r['path']),
+                }, f, indent=2)
+        except OSError as e:
+            print(f"Error writing report: {e}", file=sys.stderr)
+            return EXIT_USAGE
+
+    if not args.quiet:
+        summary = ', '.join(f"{count} {outcome}" for outcome, count in counts.items() if count) or 'no shortcuts'
+        if fixed:
+            summary += f" ({fixed} fixed)"
+        print(f"{summary} in {elapsed:.1f}s", file=sys.stderr)
+    return EXIT_FAILURES if counts[OUTCOME_BROKEN] or counts[OUTCOME_UNREACHABLE] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
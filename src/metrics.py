@@ -0,0 +1,305 @@
+"""
+LinkDrop Metrics
+
+Lightweight in-process counters and histograms for fleet-wide numbers:
+icon cache hit rate, favicon success by source, shortcut write latency
+by destination, and batch sizes.
+
+Metrics are off by default. When disabled, every recording call returns
+after a single attribute check. When enabled, a background thread
+periodically flushes a snapshot under %LOCALAPPDATA%\\LinkDrop\\ in one of
+two formats:
+
+    prometheus  metrics.prom, rewritten atomically (node_exporter textfile format)
+    jsonl       metrics.jsonl, one JSON snapshot appended per flush; once
+                the file reaches JSONL_MAX_BYTES it is moved to
+                metrics.jsonl.1 (replacing the previous one)
+
+Enable with configure_metrics('prometheus'), the LINKDROP_METRICS
+environment variable, or the metrics_format config setting.
+"""
+
+import os
+import json
+import time
+import atexit
+import bisect
+import threading
+from typing import Optional
+
+
+FORMAT_PROMETHEUS = "prometheus"
+FORMAT_JSONL = "jsonl"
+FORMATS = (FORMAT_PROMETHEUS, FORMAT_JSONL)
+
+DEFAULT_FLUSH_INTERVAL = 30.0
+JSONL_MAX_BYTES = 5 * 1024 * 1024  # Size at which metrics.jsonl is rotated
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    inner = ','.join(f'{k}="{v}"' for k, v in pairs)
+    return '{' + inner + '}'
+
+
+class Counter:
+    """A monotonically increasing count, split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: value for key, value in self._values.items()}
+
+    def render_prometheus(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+    def to_json(self) -> list[dict]:
+        return [{'labels': dict(key), 'value': value} for key, value in sorted(self.snapshot().items())]
+
+
+class Histogram:
+    """Cumulative bucketed observations, split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def render_prometheus(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+    def to_json(self) -> list[dict]:
+        out = []
+        for key, series in sorted(self.snapshot().items()):
+            out.append({
+                'labels': dict(key),
+                'buckets': dict(zip((f'{b:g}' for b in self.buckets), series[:-2])),
+                'sum': series[-2],
+                'count': series[-1],
+            })
+        return out
+
+
+class MetricsRegistry:
+    """Holds every metric and owns the periodic flush thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self.format = FORMAT_PROMETHEUS
+        self.path: Optional[str] = None
+        self.interval = DEFAULT_FLUSH_INTERVAL
+        self._metrics: dict[str, object] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help_text)
+        return self._metrics[name]
+
+    def histogram(self, name: str, help_text: str, buckets: tuple) -> Histogram:
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help_text, buckets)
+        return self._metrics[name]
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render_prometheus())
+        return '\n'.join(lines) + '\n'
+
+    def render_json(self) -> dict:
+        return {
+            'timestamp': round(time.time(), 3),
+            'metrics': {
+                name: {'type': metric.kind, 'series': metric.to_json()}
+                for name, metric in self._metrics.items()
+            },
+        }
+
+    def flush(self) -> bool:
+        """
+        Write the current snapshot to the metrics file.
+
+        Returns:
+            True if the snapshot was written
+        """
+        if not self.path:
+            return False
+
+        with self._flush_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if self.format == FORMAT_JSONL:
+                    self._rotate_jsonl()
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(self.render_json()) + '\n')
+                else:
+                    # Write then rename so a collector never reads a partial file
+                    tmp_path = self.path + '.tmp'
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(self.render_prometheus())
+                    os.replace(tmp_path, self.path)
+                return True
+            except OSError:
+                return False
+
+    def _rotate_jsonl(self) -> None:
+        """Keep the JSONL file bounded: move a full one aside to <path>.1."""
+        try:
+            if os.path.getsize(self.path) < JSONL_MAX_BYTES:
+                return
+        except FileNotFoundError:
+            return
+        os.replace(self.path, self.path + '.1')
+
+    def start(self, fmt: str, path: Optional[str] = None, interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        """Enable recording and start the periodic flush thread."""
+        self.format = fmt
+        self.path = path or get_default_metrics_path(fmt)
+        self.interval = interval
+        self.enabled = True
+
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="linkdrop-metrics", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop recording, write a final snapshot and stop the flush thread."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+def get_default_metrics_path(fmt: str) -> str:
+    """
+    Get the default metrics file path for a format.
+
+    Returns:
+        Path to %LOCALAPPDATA%\\LinkDrop\\metrics.prom (or metrics.jsonl)
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    filename = 'metrics.jsonl' if fmt == FORMAT_JSONL else 'metrics.prom'
+    return os.path.join(local_app_data, 'LinkDrop', filename)
+
+
+registry = MetricsRegistry()
+
+icon_cache_lookups = registry.counter(
+    "linkdrop_icon_cache_lookups_total",
+    "Icon cache lookups by result (hit or miss)."
+)
+favicon_fetches = registry.counter(
+    "linkdrop_favicon_fetches_total",
+    "Favicon fetch attempts by source and outcome."
+)
+shortcuts_created = registry.counter(
+    "linkdrop_shortcuts_total",
+    "Shortcut creations by result (success or failure)."
+)
+shortcut_write_seconds = registry.histogram(
+    "linkdrop_shortcut_write_seconds",
+    "Time to write one .url file, by destination kind (local, unc, mapped).",
+    LATENCY_BUCKETS
+)
+batch_size = registry.histogram(
+    "linkdrop_batch_size",
+    "Number of shortcuts requested per batch.",
+    SIZE_BUCKETS
+)
+
+
+def configure_metrics(
+    fmt: Optional[str] = None,
+    path: Optional[str] = None,
+    interval: float = DEFAULT_FLUSH_INTERVAL
+) -> bool:
+    """
+    Enable metrics if a format is given.
+
+    Args:
+        fmt: 'prometheus' or 'jsonl'. Falls back to the LINKDROP_METRICS
+            environment variable; empty or unknown values leave metrics off.
+        path: Metrics file path (defaults to %LOCALAPPDATA%\\LinkDrop\\)
+        interval: Seconds between flushes
+
+    Returns:
+        True if metrics are enabled
+    """
+    fmt = (fmt or os.environ.get('LINKDROP_METRICS', '')).strip().lower()
+    if fmt not in FORMATS:
+        return False
+
+    registry.start(fmt, path, interval)
+    atexit.unregister(registry.stop)
+    atexit.register(registry.stop)
+    return True
+
+
+def shutdown_metrics() -> None:
+    """Write a final snapshot and disable metrics."""
+    registry.stop()
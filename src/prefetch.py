@@ -0,0 +1,248 @@
+"""
+LinkDrop Icon Cache Prefetch
+
+Warms the favicon cache for a list of URLs or domains so that later
+shortcut creation never has to touch the network.
+
+Reads one URL per line from a file or stdin. Lines in the batch format
+("Name | URL | Notes") are accepted too, and blank lines and # comments
+are skipped. URLs are deduplicated by icon cache key (domain) and the
+remaining domains are fetched concurrently.
+
+Usage:
+    python src/prefetch.py urls.txt
+    type urls.txt | python src/prefetch.py -
+    python src/prefetch.py urls.txt --workers 16 --report prefetch.json
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import Iterable, Optional, TextIO
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import LinkURL, as_link_url, parse_batch_line, fetch_favicon, get_icon_cache_path
+
+
+DEFAULT_WORKERS = 8
+
+# Per-domain outcomes
+STATUS_HIT = "hit"            # Already in the cache, no network used
+STATUS_MISS = "miss"          # Not cached, fetched and stored successfully
+STATUS_FAILED = "failed"      # Not cached and every source failed
+
+
+@dataclass
+class PrefetchEntry:
+    """Outcome of prefetching the icon for one cache key."""
+    cache_key: str
+    url: str
+    status: str
+    icon_path: Optional[str] = None
+    seconds: float = 0.0
+
+
+@dataclass
+class PrefetchReport:
+    """Summary of a prefetch run."""
+    entries: list[PrefetchEntry] = field(default_factory=list)
+    invalid: list[str] = field(default_factory=list)
+    duplicates: int = 0
+    elapsed: float = 0.0
+
+    def count(self, status: str) -> int:
+        """Count entries with the given status."""
+        return sum(1 for e in self.entries if e.status == status)
+
+    @property
+    def hits(self) -> int:
+        return self.count(STATUS_HIT)
+
+    @property
+    def misses(self) -> int:
+        return self.count(STATUS_MISS)
+
+    @property
+    def failures(self) -> int:
+        return self.count(STATUS_FAILED)
+
+    def to_dict(self) -> dict:
+        """Return the report as a JSON-serializable dict."""
+        return {
+            'summary': {
+                'domains': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'failures': self.failures,
+                'invalid': len(self.invalid),
+                'duplicates': self.duplicates,
+                'elapsed': round(self.elapsed, 3),
+            },
+            'entries': [asdict(e) for e in self.entries],
+            'invalid': self.invalid,
+        }
+
+
+def extract_url(line: str) -> Optional[str]:
+    """
+    Extract the URL from one input line.
+
+    Args:
+        line: A bare URL/domain or a batch-format line
+
+    Returns:
+        The raw URL text, or None for blank lines and comments
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if '|' in line:
+        _, url, _ = parse_batch_line(line)
+        return url
+
+    return line
+
+
+def collect_targets(lines: Iterable[str], report: PrefetchReport) -> dict[str, LinkURL]:
+    """
+    Normalize input lines and dedupe them by icon cache key.
+
+    Args:
+        lines: Input lines
+        report: Report that receives invalid lines and the duplicate count
+
+    Returns:
+        Dict of cache key -> first URL seen for it
+    """
+    targets: dict[str, LinkURL] = {}
+
+    for line in lines:
+        raw = extract_url(line)
+        if not raw:
+            continue
+
+        link = as_link_url(raw)
+        if link is None:
+            report.invalid.append(raw)
+            continue
+
+        if link.cache_key in targets:
+            report.duplicates += 1
+        else:
+            targets[link.cache_key] = link
+
+    return targets
+
+
+def _prefetch_one(link: LinkURL) -> PrefetchEntry:
+    """Fetch (or confirm cached) the icon for one cache key."""
+    start = time.perf_counter()
+
+    icon_path = get_icon_cache_path(link)
+    if icon_path and os.path.exists(icon_path):
+        return PrefetchEntry(link.cache_key, link.url, STATUS_HIT, icon_path, time.perf_counter() - start)
+
+    icon_path = fetch_favicon(link)
+    status = STATUS_MISS if icon_path else STATUS_FAILED
+    return PrefetchEntry(link.cache_key, link.url, status, icon_path, time.perf_counter() - start)
+
+
+def prefetch_icons(
+    lines: Iterable[str],
+    workers: int = DEFAULT_WORKERS,
+    progress: Optional[TextIO] = None
+) -> PrefetchReport:
+    """
+    Warm the icon cache for every URL in the input.
+
+    Args:
+        lines: Input lines (URLs, domains or batch-format lines)
+        workers: Number of concurrent fetches
+        progress: Stream for per-domain progress output (None for silent)
+
+    Returns:
+        PrefetchReport with hits, misses and failures
+    """
+    report = PrefetchReport()
+    start = time.perf_counter()
+
+    targets = collect_targets(lines, report)
+    total = len(targets)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(_prefetch_one, link) for link in targets.values()]
+        for done, future in enumerate(as_completed(futures), start=1):
+            entry = future.result()
+            report.entries.append(entry)
+            if progress:
+                print(
+                    f"[{done:>{len(str(total))}}/{total}] {entry.status:<6} {entry.cache_key}",
+                    file=progress,
+                    flush=True
+                )
+
+    report.entries.sort(key=lambda e: e.cache_key)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="linkdrop-prefetch",
+        description="Warm the LinkDrop icon cache for a list of URLs or domains."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="File with one URL per line (batch format accepted), or - for stdin"
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent fetches (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument("--report", help="Write a JSON report to this file")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Suppress progress output")
+    args = parser.parse_args(argv)
+
+    progress = None if args.quiet else sys.stderr
+
+    if args.input == "-":
+        report = prefetch_icons(sys.stdin, workers=args.workers, progress=progress)
+    else:
+        try:
+            with open(args.input, 'r', encoding='utf-8-sig') as f:
+                report = prefetch_icons(f, workers=args.workers, progress=progress)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+
+    print(
+        f"{len(report.entries)} domains: {report.hits} hits, {report.misses} misses, "
+        f"{report.failures} failures ({len(report.invalid)} invalid, "
+        f"{report.duplicates} duplicates) in {report.elapsed:.1f}s"
+    )
+
+    if args.report:
+        try:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report.to_dict(), f, indent=2)
+        except OSError as e:
+            print(f"Error writing report: {e}", file=sys.stderr)
+            return 2
+
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
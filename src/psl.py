@@ -0,0 +1,160 @@
+"""
+LinkDrop Public Suffix Matching
+
+Answers "does this host end in a real public suffix, with a registrable
+name in front of it?" using the Public Suffix List bundled in
+src/data/public_suffix_list.dat. Only the list's ICANN section is
+bundled, so platform suffixes such as github.io still count as
+registrable names.
+
+The rules are loaded lazily on first use into frozensets. A host is
+checked by walking its labels from the right, one set lookup per label,
+so the cost is proportional to the host length rather than to the size
+of the list.
+"""
+
+import os
+import threading
+from typing import Optional
+
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'public_suffix_list.dat')
+
+# Used only if the bundled list can't be read
+FALLBACK_TLDS = (
+    'com', 'org', 'net', 'io', 'co', 'edu', 'gov', 'mil',
+    'dev', 'app', 'ai', 'info', 'biz', 'me', 'tv', 'us',
+    'uk', 'ca', 'de', 'fr', 'au', 'jp', 'cn', 'in', 'br',
+    'xyz', 'tech', 'online', 'site', 'store', 'cloud', 'so',
+    'gg', 'ly', 'to', 'fm', 'am', 'be', 'it', 'es', 'nl'
+)
+
+
+class SuffixRules:
+    """The parsed rule sets of the Public Suffix List."""
+
+    __slots__ = ('rules', 'wildcards', 'exceptions', 'nodes')
+
+    def __init__(self, lines):
+        rules = set()
+        wildcards = set()   # "ck" for the rule "*.ck"
+        exceptions = set()  # "www.ck" for the rule "!www.ck"
+
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('//'):
+                continue
+            if line.startswith('!'):
+                exceptions.add(line[1:])
+            elif line.startswith('*.'):
+                wildcards.add(line[2:])
+            else:
+                rules.add(line)
+
+        # Every suffix of every rule, so a walk can stop as soon as no
+        # longer rule can match (the flattened form of a suffix trie)
+        nodes = set()
+        for rule in rules | wildcards | exceptions:
+            parts = rule.split('.')
+            for i in range(len(parts)):
+                nodes.add('.'.join(parts[i:]))
+
+        self.rules = frozenset(rules)
+        self.wildcards = frozenset(wildcards)
+        self.exceptions = frozenset(exceptions)
+        self.nodes = frozenset(nodes)
+
+    def suffix_labels(self, labels: list[str]) -> int:
+        """
+        Count how many trailing labels form the public suffix.
+
+        Args:
+            labels: Lowercase host labels, left to right
+
+        Returns:
+            Number of labels in the public suffix, or 0 if the top-level
+            label is not a known suffix
+        """
+        count = len(labels)
+        matched = 0
+        candidate = ''
+
+        for depth in range(1, count + 1):
+            label = labels[count - depth]
+            candidate = label if depth == 1 else label + '.' + candidate
+
+            if candidate in self.exceptions:
+                return depth - 1
+            if candidate in self.rules:
+                matched = max(matched, depth)
+            if candidate in self.wildcards:
+                matched = max(matched, depth + 1)
+            if candidate not in self.nodes:
+                break
+
+        return matched
+
+
+_rules: Optional[SuffixRules] = None
+_rules_lock = threading.Lock()
+
+
+def get_rules() -> SuffixRules:
+    """
+    Get the suffix rules, loading the bundled list on first use.
+
+    Returns:
+        The shared SuffixRules instance
+    """
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                try:
+                    with open(DATA_FILE, 'r', encoding='utf-8') as f:
+                        _rules = SuffixRules(f)
+                except OSError:
+                    _rules = SuffixRules(FALLBACK_TLDS)
+    return _rules
+
+
+def public_suffix(host: str) -> Optional[str]:
+    """
+    Get the public suffix of a host (e.g. "co.uk" for "bbc.co.uk").
+
+    Args:
+        host: A hostname without scheme, port or path
+
+    Returns:
+        The public suffix, or None if the top-level domain is unknown
+    """
+    labels = host.lower().rstrip('.').split('.')
+    n = get_rules().suffix_labels(labels)
+    if n == 0 or n > len(labels):
+        return None
+    return '.'.join(labels[-n:])
+
+
+def registrable_domain(host: str) -> Optional[str]:
+    """
+    Get the registrable domain of a host (e.g. "bbc.co.uk" for "www.bbc.co.uk").
+
+    Args:
+        host: A hostname without scheme, port or path
+
+    Returns:
+        The public suffix plus one label, or None if the host is itself a
+        public suffix or its top-level domain is unknown
+    """
+    labels = host.lower().rstrip('.').split('.')
+    n = get_rules().suffix_labels(labels)
+    if n == 0 or n >= len(labels) or not all(labels):
+        return None
+    return '.'.join(labels[-n - 1:])
+
+
+if __name__ == "__main__":
+    for test_host in ["example.com", "www.bbc.co.uk", "foo.ch", "co.uk", "site.github.io",
+                      "localhost", "foo.community", "a.b.kawasaki.jp", "city.kawasaki.jp"]:
+        print(f"  {test_host!r}: suffix={public_suffix(test_host)!r}, "
+              f"registrable={registrable_domain(test_host)!r}")
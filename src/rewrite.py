@@ -0,0 +1,395 @@
+"""
+LinkDrop Bulk URL Rewrite
+
+Rewrites the links of many shortcuts at once, e.g. when a vendor moves
+from jira.corp.example.com to example.atlassian.net. Shortcuts are
+matched and rewritten by one rule:
+
+    --host OLD --to NEW         links on host OLD move to host NEW
+                                (path, query, port and login are kept)
+    --regex PATTERN --to REPL   re.sub(PATTERN, REPL, url); \\1 etc. refer
+                                to groups of PATTERN
+
+Each rewritten file keeps its Comment and every other line; only URL
+(and IconFile, when the site changed and a favicon for the new domain
+could be fetched) are replaced, atomically. Files are rewritten in
+parallel, and each new domain's favicon is fetched once.
+
+Before anything is written, every planned change is recorded in an undo
+journal in %LOCALAPPDATA%\\LinkDrop\\rewrites\\. --undo puts the old URL
+and icon back in the files that still have the new URL, so shortcuts
+edited since are left alone.
+
+Usage:
+    python src/rewrite.py \\\\server\\share\\Links --host jira.corp.example.com --to example.atlassian.net --dry-run
+    python src/rewrite.py C:\\Links --regex "^http://" --to "https://"
+    python src/rewrite.py --undo 20240501-101500-3f2a9c1e
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import uuid
+import argparse
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import as_link_url, read_shortcut_file, update_shortcut_file
+from src.batch import DEFAULT_WORKERS, _IconMemo
+from src.inventory import InventoryCache, scan_inventory
+
+
+UNDO_EXTENSION = ".undo"
+
+STATUS_PLANNED = "planned"
+STATUS_REWRITTEN = "rewritten"
+STATUS_RESTORED = "restored"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+
+
+def get_undo_dir() -> str:
+    """
+    Get the undo journal directory path.
+
+    Returns:
+        Path to %LOCALAPPDATA%\\LinkDrop\\rewrites\\
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    undo_dir = os.path.join(local_app_data, 'LinkDrop', 'rewrites')
+    os.makedirs(undo_dir, exist_ok=True)
+    return undo_dir
+
+
+def resolve_undo_journal(ref: str) -> str:
+    """
+    Find an undo journal by path or by id.
+
+    Raises:
+        FileNotFoundError: If there is no such journal
+    """
+    if os.path.isfile(ref):
+        return ref
+    path = os.path.join(get_undo_dir(), ref + UNDO_EXTENSION)
+    if os.path.isfile(path):
+        return path
+    raise FileNotFoundError(f"No rewrite undo journal: {ref}")
+
+
+class RewriteRule:
+    """Maps a URL to its rewritten form (None if the rule doesn't apply)."""
+
+    def __init__(self, host: Optional[str] = None, pattern: Optional[str] = None, replacement: str = ''):
+        """
+        Args:
+            host: Rewrite links on this host to the host in replacement
+            pattern: Regular expression to replace (used if host is None)
+            replacement: New host, or re.sub() replacement for pattern
+
+        Raises:
+            ValueError: If neither host nor pattern is given, or the
+                pattern doesn't compile
+        """
+        if host is None and pattern is None:
+            raise ValueError("A rewrite needs --host or --regex")
+        self.host = host.lower().rstrip('.') if host else None
+        self.replacement = replacement
+        try:
+            self.pattern = re.compile(pattern) if pattern is not None else None
+        except re.error as e:
+            raise ValueError(f"Invalid --regex: {e}") from e
+
+    def describe(self) -> dict:
+        if self.host:
+            return {'host': self.host, 'to': self.replacement}
+        return {'regex': self.pattern.pattern, 'to': self.replacement}
+
+    def apply(self, url: str) -> Optional[str]:
+        if self.pattern is not None:
+            rewritten, count = self.pattern.subn(self.replacement, url)
+            return rewritten if count else None
+
+        try:
+            parts = urlsplit(url)
+            if (parts.hostname or '').rstrip('.') != self.host:
+                return None
+            port = parts.port
+        except ValueError:
+            return None
+        netloc = self.replacement
+        if port is not None and ':' not in netloc:
+            netloc = f"{netloc}:{port}"
+        userinfo, at, _ = parts.netloc.rpartition('@')
+        if at:
+            netloc = f"{userinfo}@{netloc}"
+        return urlunsplit(parts._replace(netloc=netloc))
+
+
+@dataclass
+class Rewrite:
+    """One shortcut a rewrite touches."""
+    path: str
+    old_url: str
+    new_url: Optional[str]
+    old_icon: Optional[str] = None
+    new_icon: Optional[str] = None
+    status: str = STATUS_PLANNED
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'old_url': self.old_url,
+            'new_url': self.new_url,
+            'old_icon': self.old_icon,
+            'new_icon': self.new_icon,
+            'status': self.status,
+            'error': self.error,
+        }
+
+
+def find_rewrites(paths: Iterable[str], rule: RewriteRule, workers: int = DEFAULT_WORKERS) -> Iterator[Rewrite]:
+    """
+    Find the shortcuts a rule changes.
+
+    Args:
+        paths: .url files and folders of them
+        rule: The rewrite rule
+        workers: Folders listed and files read concurrently
+
+    Yields:
+        Rewrite per matching shortcut; ones whose new URL isn't valid
+        have status 'failed'
+    """
+    def records():
+        for path in paths:
+            if os.path.isdir(path):
+                yield from (
+                    (r.path, r.url, r.icon_file) for r in scan_inventory(path, workers, InventoryCache.for_root(path))
+                    if r.error is None
+                )
+            else:
+                try:
+                    shortcut = read_shortcut_file(path)
+                except OSError:
+                    continue
+                yield os.path.abspath(path), shortcut.url, shortcut.icon_file
+
+    for path, url, icon_file in records():
+        if not url:
+            continue
+        new_url = rule.apply(url)
+        if new_url is None or new_url == url:
+            continue
+        link = as_link_url(new_url)
+        if link is None:
+            yield Rewrite(path, url, new_url, icon_file, status=STATUS_FAILED, error="Rewritten URL is not valid")
+        else:
+            yield Rewrite(path, url, link.url, icon_file)
+
+
+class UndoJournal:
+    """Write-ahead record of a rewrite: every change is logged before any file is touched."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def create(cls, rule: RewriteRule, rewrites: list[Rewrite]) -> 'UndoJournal':
+        # Sortable by start time; the random part keeps rewrites started in the same second apart
+        rewrite_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        journal = cls(os.path.join(get_undo_dir(), rewrite_id + UNDO_EXTENSION))
+        with open(journal.path, 'w', encoding='utf-8') as f:
+            header = {'type': 'rewrite', 'id': rewrite_id, 'started': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            header.update(rule.describe())
+            f.write(json.dumps(header) + '\n')
+            for rewrite in rewrites:
+                f.write(json.dumps({
+                    'type': 'file',
+                    'path': rewrite.path,
+                    'old_url': rewrite.old_url,
+                    'old_icon': rewrite.old_icon,
+                    'new_url': rewrite.new_url,
+                }) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return journal
+
+    @property
+    def id(self) -> str:
+        return os.path.basename(self.path)[:-len(UNDO_EXTENSION)]
+
+    def records(self) -> list[dict]:
+        """The file records (a torn last line is ignored)."""
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') == 'file':
+                    records.append(record)
+        return records
+
+
+def _rewrite_one(rewrite: Rewrite, icons: Optional[_IconMemo]) -> Rewrite:
+    try:
+        if icons is not None:
+            old_link = as_link_url(rewrite.old_url)
+            new_link = as_link_url(rewrite.new_url)
+            if new_link and (old_link is None or old_link.cache_key != new_link.cache_key):
+                rewrite.new_icon = icons.get(new_link)
+        update_shortcut_file(rewrite.path, url=rewrite.new_url, icon_file=rewrite.new_icon)
+        rewrite.status = STATUS_REWRITTEN
+    except OSError as e:
+        rewrite.status = STATUS_FAILED
+        rewrite.error = f"Rewrite failed: {e}"
+    return rewrite
+
+
+def apply_rewrites(
+    rewrites: list[Rewrite],
+    fetch_icons: bool = True,
+    workers: int = DEFAULT_WORKERS
+) -> Iterator[Rewrite]:
+    """
+    Rewrite the files, in parallel.
+
+    Yields:
+        Each Rewrite, in order, with status 'rewritten' or 'failed'
+    """
+    icons = _IconMemo() if fetch_icons else None
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="linkdrop-rewrite") as executor:
+        yield from executor.map(lambda rewrite: _rewrite_one(rewrite, icons), rewrites)
+
+
+def _restore_one(record: dict) -> Rewrite:
+    rewrite = Rewrite(record['path'], record['new_url'], record['old_url'], new_icon=record.get('old_icon'))
+    try:
+        current = read_shortcut_file(rewrite.path).url
+        if current == rewrite.new_url:
+            rewrite.status = STATUS_SKIPPED  # The rewrite never got to this file
+            return rewrite
+        if current != rewrite.old_url:
+            rewrite.status = STATUS_SKIPPED
+            rewrite.error = "Changed since the rewrite"
+            return rewrite
+        update_shortcut_file(rewrite.path, url=rewrite.new_url, icon_file=rewrite.new_icon or '')
+        rewrite.status = STATUS_RESTORED
+    except OSError as e:
+        rewrite.status = STATUS_FAILED
+        rewrite.error = f"Restore failed: {e}"
+    return rewrite
+
+
+def undo_rewrite(journal: UndoJournal, workers: int = DEFAULT_WORKERS) -> Iterator[Rewrite]:
+    """
+    Put back the URLs and icons a rewrite replaced.
+
+    Files whose URL is no longer the rewritten one are skipped. The
+    journal is deleted unless a file failed or had changed since (undoing
+    a later rewrite first may make those restorable).
+
+    Yields:
+        Rewrite per journaled file (old_url is the URL being replaced)
+    """
+    keep = False
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="linkdrop-rewrite") as executor:
+        for rewrite in executor.map(_restore_one, journal.records()):
+            keep = keep or rewrite.error is not None
+            yield rewrite
+    if not keep:
+        try:
+            os.remove(journal.path)
+        except OSError:
+            pass
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_FAILURES, EXIT_USAGE
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop rewrite",
+        description="Rewrite the links of many shortcuts at once, with an undo journal."
+    )
+    parser.add_argument("paths", nargs="*", help=".url files or folders of them")
+    rules = parser.add_mutually_exclusive_group()
+    rules.add_argument("--host", help="Rewrite links on this host")
+    rules.add_argument("--regex", help="Rewrite links matching this regular expression")
+    parser.add_argument("--to", help="New host (with --host) or replacement (with --regex)")
+    parser.add_argument("--undo", metavar="ID", help="Undo an earlier rewrite (journal id or path)")
+    parser.add_argument("--no-icons", action="store_true", help="Don't fetch favicons for new domains")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Files rewritten concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Show what would change, change nothing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts: dict[str, int] = {}
+
+    if args.undo:
+        try:
+            journal = UndoJournal(resolve_undo_journal(args.undo))
+            results = undo_rewrite(journal, args.workers)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    else:
+        if not args.paths or args.to is None or not (args.host or args.regex):
+            parser.print_usage(sys.stderr)
+            print("Error: give folders or files, --host or --regex, and --to (or --undo ID)", file=sys.stderr)
+            return EXIT_USAGE
+        for path in args.paths:
+            if not os.path.exists(path):
+                print(f"Error: No such file or folder: {path}", file=sys.stderr)
+                return EXIT_USAGE
+        try:
+            rule = RewriteRule(args.host, args.regex, args.to)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_USAGE
+
+        found = list(find_rewrites(args.paths, rule, args.workers))
+        invalid = [r for r in found if r.status == STATUS_FAILED]
+        rewrites = [r for r in found if r.status != STATUS_FAILED]
+        journal = None
+        if args.dry_run or not rewrites:
+            results = iter(found)
+        else:
+            try:
+                journal = UndoJournal.create(rule, rewrites)
+            except OSError as e:
+                print(f"Error: Cannot write the undo journal: {e}", file=sys.stderr)
+                return EXIT_USAGE
+            results = chain(invalid, apply_rewrites(rewrites, not args.no_icons, args.workers))
+
+    for rewrite in results:
+        counts[rewrite.status] = counts.get(rewrite.status, 0) + 1
+        sys.stdout.write(json.dumps(rewrite.to_dict()) + '\n')
+    sys.stdout.flush()
+
+    if not args.quiet:
+        summary = ', '.join(f"{count} {status}" for status, count in counts.items()) or 'no matching shortcuts'
+        print(f"{summary} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        if not args.undo and journal is not None:
+            print(f"Undo with: linkdrop rewrite --undo {journal.id}", file=sys.stderr)
+    return EXIT_FAILURES if counts.get(STATUS_FAILED) else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
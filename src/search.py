@@ -0,0 +1,378 @@
+"""
+LinkDrop Shortcut Search
+
+A local full-text index of the shortcuts under a set of root folders
+(by default the favorite folders from the config), so that finding "the
+Notion link for project X" doesn't mean an Explorer search over SMB.
+
+The index is a SQLite database in %LOCALAPPDATA%\\LinkDrop\\search.db
+with an FTS5 table over each shortcut's name, folder, host, URL and
+comment. Updates reuse the inventory scanner with the stored size and
+mtime of every file, so only new and changed files are read again;
+deleted files and roots that are no longer configured drop out.
+
+Queries match every word as a prefix ("notion apo" finds
+"Apollo - Notion.url"), best matches first, and return in milliseconds.
+
+Usage:
+    python src/search.py notion apollo
+    python src/search.py --root \\\\server\\share\\Links wiki
+    python src/search.py --no-update budget --json
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.inventory import DEFAULT_WORKERS, InventoryCache, scan_inventory
+from src.config import Config
+
+
+SCHEMA_VERSION = 1
+DEFAULT_LIMIT = 50
+
+# Relative weight of each indexed column when ranking matches
+RANK_WEIGHTS = (10.0, 4.0, 5.0, 1.0, 2.0)  # name, folder, host, url, comment
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    relative_path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    url TEXT,
+    icon_file TEXT,
+    comment TEXT,
+    UNIQUE (root, relative_path)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS shortcuts_fts USING fts5(
+    name, folder, host, url, comment,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def get_index_path() -> str:
+    """
+    Get the search index path.
+
+    Returns:
+        Path to %LOCALAPPDATA%\\LinkDrop\\search.db
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    index_dir = os.path.join(local_app_data, 'LinkDrop')
+    os.makedirs(index_dir, exist_ok=True)
+    return os.path.join(index_dir, 'search.db')
+
+
+def configured_roots(config: Config) -> list[str]:
+    """The folders to index: the favorite folders, plus the default folder."""
+    roots = list(config.favorite_folders)
+    if config.default_folder:
+        roots.append(config.default_folder)
+    seen = set()
+    unique = []
+    for root in roots:
+        key = os.path.normcase(os.path.abspath(root))
+        if key not in seen:
+            seen.add(key)
+            unique.append(os.path.abspath(root))
+    return unique
+
+
+def _host(url: Optional[str]) -> str:
+    try:
+        host = urlsplit(url or '').hostname or ''
+    except ValueError:
+        return ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def _fts_row(relative_path: str, url: Optional[str], comment: Optional[str]) -> tuple:
+    folder, filename = os.path.split(relative_path)
+    name = filename[:-4] if filename[-4:].lower() == '.url' else filename
+    return name, folder.replace(os.sep, ' / '), _host(url), url or '', comment or ''
+
+
+def build_query(text: str) -> str:
+    """
+    Turn what the user typed into an FTS5 query.
+
+    Every word must match, as a prefix; FTS syntax characters in the
+    input are treated as separators, so any text is a valid query.
+    """
+    return ' '.join(f'"{word}"*' for word in _WORD_RE.findall(text.lower()))
+
+
+@dataclass
+class SearchResult:
+    """One matching shortcut."""
+    path: str
+    name: str
+    url: Optional[str] = None
+    comment: Optional[str] = None
+    icon_file: Optional[str] = None
+
+
+@dataclass
+class IndexStats:
+    """What an index update changed."""
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+
+class SearchIndex:
+    """
+    The shortcut search index.
+
+    One connection is shared by the GUI thread (queries) and a
+    background thread (updates); a lock serializes them. Updates scan
+    without holding it and write each root's changes in one short
+    transaction, so queries stay fast while an update runs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_index_path()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS shortcuts_fts;" + SCHEMA
+                )
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'SearchIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def update(self, roots: Iterable[str], workers: int = DEFAULT_WORKERS, prune: bool = False) -> IndexStats:
+        """
+        Bring the index up to date with the shortcuts under roots.
+
+        Only files whose size or mtime changed are read. Files that
+        disappeared are removed, unless their folder couldn't be read
+        this time. Other indexed roots are left alone unless prune is
+        set, so indexing an extra folder doesn't drop the configured ones.
+
+        Args:
+            roots: Folders to index
+            workers: Folders listed and files read concurrently
+            prune: roots is the full set; remove shortcuts under any other root
+
+        Returns:
+            IndexStats for the whole update
+        """
+        start = time.perf_counter()
+        stats = IndexStats()
+        roots = [os.path.abspath(root) for root in roots]
+
+        if prune:
+            with self._lock, self._conn:
+                indexed = [row[0] for row in self._conn.execute("SELECT DISTINCT root FROM files")]
+                for root in indexed:
+                    if root not in roots:
+                        stats.removed += self._remove(
+                            self._conn.execute("SELECT id FROM files WHERE root = ?", (root,)).fetchall()
+                        )
+
+        for root in roots:
+            if os.path.isdir(root):
+                self._update_root(root, workers, stats)
+            else:
+                stats.errors += 1
+
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _remove(self, ids: list) -> int:
+        self._conn.executemany("DELETE FROM shortcuts_fts WHERE rowid = ?", ids)
+        self._conn.executemany("DELETE FROM files WHERE id = ?", ids)
+        return len(ids)
+
+    def _update_root(self, root: str, workers: int, stats: IndexStats) -> None:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, relative_path, mtime_ns, size, url, icon_file, comment FROM files WHERE root = ?",
+                (root,)
+            ).fetchall()
+        ids = {row[1]: row[0] for row in rows}
+        cache = InventoryCache(entries={row[1]: list(row[2:]) for row in rows})
+
+        changed = []
+        seen = set()
+        unreadable = []
+        for record in scan_inventory(root, workers, cache):
+            if record.error:
+                stats.errors += 1
+                unreadable.append(record.relative_path)
+                continue
+            seen.add(record.relative_path)
+            if record.cached:
+                stats.unchanged += 1
+            else:
+                changed.append(record)
+
+        # Keep what was indexed under folders (or files) that couldn't be read
+        gone = []
+        if '' not in unreadable:
+            skipped = set(unreadable)
+            prefixes = tuple(path + os.sep for path in unreadable)
+            gone = [
+                (row_id,) for path, row_id in ids.items()
+                if path not in seen and path not in skipped and not path.startswith(prefixes)
+            ]
+
+        with self._lock, self._conn:
+            stats.removed += self._remove(gone)
+            for record in changed:
+                fts_row = _fts_row(record.relative_path, record.url, record.comment)
+                row_id = ids.get(record.relative_path)
+                if row_id is None:
+                    row_id = self._conn.execute(
+                        "INSERT INTO files (root, relative_path, mtime_ns, size, url, icon_file, comment)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (root, record.relative_path, record.mtime_ns, record.size,
+                         record.url, record.icon_file, record.comment)
+                    ).lastrowid
+                    stats.added += 1
+                else:
+                    self._conn.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ?, url = ?, icon_file = ?, comment = ? WHERE id = ?",
+                        (record.mtime_ns, record.size, record.url, record.icon_file, record.comment, row_id)
+                    )
+                    self._conn.execute("DELETE FROM shortcuts_fts WHERE rowid = ?", (row_id,))
+                    stats.updated += 1
+                self._conn.execute(
+                    "INSERT INTO shortcuts_fts (rowid, name, folder, host, url, comment) VALUES (?, ?, ?, ?, ?, ?)",
+                    (row_id,) + fts_row
+                )
+
+    def search(self, text: str, limit: int = DEFAULT_LIMIT) -> list[SearchResult]:
+        """
+        Find shortcuts matching every word of text.
+
+        Args:
+            text: Words to look for in names, folders, hosts, URLs and comments
+            limit: Most results to return
+
+        Returns:
+            Matching shortcuts, best first (empty for an empty query)
+        """
+        query = build_query(text)
+        if not query:
+            return []
+        weights = ', '.join(str(w) for w in RANK_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT files.root, files.relative_path, files.url, files.comment, files.icon_file"
+                " FROM shortcuts_fts JOIN files ON files.id = shortcuts_fts.rowid"
+                f" WHERE shortcuts_fts MATCH ? ORDER BY bm25(shortcuts_fts, {weights}) LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        return [
+            SearchResult(
+                path=os.path.join(root, relative_path),
+                name=os.path.basename(relative_path)[:-4],
+                url=url,
+                comment=comment,
+                icon_file=icon_file,
+            )
+            for root, relative_path, url, comment, icon_file in rows
+        ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_FAILURES, EXIT_USAGE
+    from src.config import load_config
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop search",
+        description="Search the shortcuts under your favorite folders by name, folder, host, URL or comment."
+    )
+    parser.add_argument("query", nargs="*", help="Words to look for (every word must match, as a prefix)")
+    parser.add_argument(
+        "--root",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Extra folder to index (repeatable; default: favorite and default folders from the config)"
+    )
+    parser.add_argument("--no-update", action="store_true", help="Search the index as it is, without rescanning")
+    parser.add_argument("-l", "--limit", type=int, default=DEFAULT_LIMIT, help=f"Most results (default: {DEFAULT_LIMIT})")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Folders listed and files read concurrently while updating (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    roots = args.root or configured_roots(load_config())
+    if not roots and not args.no_update:
+        print("Error: No folders to index; add favorite folders or pass --root", file=sys.stderr)
+        return EXIT_USAGE
+
+    with SearchIndex() as index:
+        stats = None
+        if not args.no_update:
+            # Only the configured set is complete; --root folders are added to the index
+            stats = index.update(roots, args.workers, prune=not args.root)
+            if not args.quiet:
+                print(
+                    f"Indexed {len(index)} shortcuts: {stats.added} added, {stats.updated} updated, "
+                    f"{stats.removed} removed, {stats.errors} errors in {stats.seconds:.1f}s",
+                    file=sys.stderr
+                )
+
+        text = ' '.join(args.query)
+        if text:
+            start = time.perf_counter()
+            results = index.search(text, args.limit)
+            for result in results:
+                if args.json:
+                    sys.stdout.write(json.dumps(asdict(result)) + '\n')
+                else:
+                    sys.stdout.write(f"{result.name}\t{result.url or ''}\t{result.path}\n")
+            sys.stdout.flush()
+            if not args.quiet:
+                print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+
+    return EXIT_FAILURES if stats and stats.errors else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+LinkDrop Sitemap Import
+
+Creates one shortcut per page listed in a sitemap, e.g. every page of a
+project wiki.
+
+Sources can be a URL or a local file, in any of these forms:
+
+    sitemap.xml        <urlset> of page URLs
+    sitemap index      <sitemapindex> of further sitemaps (followed, nested
+                       up to MAX_INDEX_DEPTH levels)
+    sitemap.xml.gz     gzip-compressed, detected from the content
+    link list          plain text, one URL per line
+
+XML is read with an incremental parser straight from the network
+stream, and each <url> element is discarded once its <loc> has been
+read, so a sitemap with tens of thousands of entries never sits in
+memory. Repeated URLs (within one sitemap or across an index) are
+dropped using a small fingerprint per URL.
+
+Shortcut names come from the last segment of the URL path
+("/wiki/Getting_Started" -> "Getting Started"), or with --titles from
+each page's <title>, fetched with bounded concurrency.
+
+Usage:
+    python src/sitemap.py https://wiki.example.com/sitemap.xml -d C:\\Links\\Wiki
+    python src/sitemap.py sitemap.xml.gz -d C:\\Links --titles --title-workers 8
+"""
+
+import sys
+import os
+import re
+import io
+import gzip
+import html
+import argparse
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+from urllib.parse import unquote, urlsplit
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import as_link_url, get_http_session
+
+
+SITEMAP_TIMEOUT = 30
+TITLE_TIMEOUT = 5
+TITLE_READ_LIMIT = 64 * 1024  # <title> is expected near the top of the page
+MAX_INDEX_DEPTH = 3
+DEFAULT_TITLE_WORKERS = 8
+
+PAGE_EXTENSIONS = ('.html', '.htm', '.php', '.asp', '.aspx', '.jsp')
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+SITEMAP_LOC = SITEMAP_NS + 'loc'
+SITEMAP_ENTRIES = {SITEMAP_NS + 'url': 'url', SITEMAP_NS + 'sitemap': 'sitemap'}
+
+_TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title', re.IGNORECASE | re.DOTALL)
+_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+def _is_remote(source: str) -> bool:
+    return source.lower().startswith(('http://', 'https://'))
+
+
+def _open_source(source: str, stack: ExitStack) -> BinaryIO:
+    """
+    Open a sitemap URL or file as a binary stream, gunzipping if needed.
+
+    The stream (and any HTTP response) is registered on the ExitStack.
+    """
+    if _is_remote(source):
+        response = get_http_session().get(source, timeout=SITEMAP_TIMEOUT, stream=True)
+        stack.callback(response.close)
+        response.raise_for_status()
+        response.raw.decode_content = True  # Undo Content-Encoding: gzip
+        response.raw.auto_close = False  # Else BufferedReader fails at EOF
+        raw = io.BufferedReader(response.raw)
+    else:
+        raw = stack.enter_context(open(source, 'rb'))
+
+    if raw.peek(2)[:2] == b'\x1f\x8b':
+        return stack.enter_context(gzip.GzipFile(fileobj=raw))
+    return raw
+
+
+def _iter_locs(stream: BinaryIO) -> Iterator[tuple]:
+    """
+    Yield ('url' | 'sitemap', loc) pairs from sitemap XML, incrementally.
+
+    Only a sitemap-namespace <loc> directly inside <url>/<sitemap> counts,
+    so extension children such as <image:loc> can't replace the page URL.
+    Every finished <url>/<sitemap> element is cleared from the tree so
+    memory use doesn't grow with the number of entries.
+    """
+    root = None
+    path: list[str] = []  # Tags of the open elements
+    loc = None
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            path.append(elem.tag)
+            continue
+
+        path.pop()
+        if elem.tag == SITEMAP_LOC and path and path[-1] in SITEMAP_ENTRIES:
+            loc = (elem.text or '').strip()
+        elif elem.tag in SITEMAP_ENTRIES:
+            if loc:
+                yield SITEMAP_ENTRIES[elem.tag], loc
+            loc = None
+            root.clear()
+
+
+def _iter_link_list(stream: BinaryIO) -> Iterator[tuple]:
+    """Yield ('url', line) pairs from a plain text list of URLs."""
+    for raw_line in io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace'):
+        line = raw_line.strip()
+        if line and not line.startswith('#'):
+            yield 'url', line
+
+
+def iter_sitemap_urls(source: str, max_depth: int = MAX_INDEX_DEPTH) -> Iterator[str]:
+    """
+    Stream the page URLs of a sitemap, following sitemap indexes.
+
+    Nested sitemaps listed by a downloaded index are only followed if
+    they are http(s) URLs too; only a local index may point at local
+    files.
+
+    Args:
+        source: Sitemap URL or local file path
+        max_depth: How many levels of nested sitemap indexes to follow
+
+    Yields:
+        Each distinct page URL, in sitemap order
+    """
+    seen_pages: set[int] = set()
+    seen_sitemaps: set[str] = set()
+    pending = deque([(source, 0)])
+
+    while pending:
+        current, depth = pending.popleft()
+        if current in seen_sitemaps:
+            continue
+        seen_sitemaps.add(current)
+
+        with ExitStack() as stack:
+            stream = _open_source(current, stack)
+            head = stream.peek(64)[:64] if hasattr(stream, 'peek') else b''
+            is_xml = head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<')
+            entries = _iter_locs(stream) if is_xml else _iter_link_list(stream)
+
+            for kind, loc in entries:
+                if kind == 'sitemap':
+                    # A downloaded index must not make us read local files
+                    if depth < max_depth and (_is_remote(loc) or not _is_remote(current)):
+                        pending.append((loc, depth + 1))
+                    continue
+
+                # Fingerprint instead of the string keeps dedup memory small
+                fingerprint = hash(loc)
+                if fingerprint in seen_pages:
+                    continue
+                seen_pages.add(fingerprint)
+                yield loc
+
+
+def name_from_url(url: str) -> str:
+    """
+    Derive a shortcut name from a URL path.
+
+    "/wiki/Getting_Started" -> "Getting Started", "/docs/install.html" ->
+    "Install"; the site name for the home page.
+    """
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split('/') if s]
+    if not segments:
+        link = as_link_url(url)
+        return link.suggested_name if link else url
+
+    name = unquote(segments[-1])
+    if name.lower().endswith(PAGE_EXTENSIONS):
+        name = name.rsplit('.', 1)[0]
+    if name.lower() in ('index', 'default', 'home') and len(segments) > 1:
+        name = unquote(segments[-2])
+
+    name = ' '.join(name.replace('_', ' ').replace('-', ' ').split())
+    if name and name == name.lower():
+        name = name[:1].upper() + name[1:]
+    return name or url
+
+
+def fetch_title(url: str) -> Optional[str]:
+    """
+    Fetch a page's <title>, reading no more than TITLE_READ_LIMIT bytes.
+
+    Returns:
+        The title text, or None if it couldn't be fetched or found
+    """
+    import requests
+
+    try:
+        with get_http_session().get(url, timeout=TITLE_TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                return None
+
+            data = b''
+            for chunk in response.iter_content(8192):
+                data += chunk
+                if b'</title' in data.lower() or len(data) >= TITLE_READ_LIMIT:
+                    break
+            encoding = response.encoding
+    except requests.RequestException:
+        return None
+
+    match = _TITLE_RE.search(data)
+    if not match:
+        return None
+
+    charset = _CHARSET_RE.search(data)
+    if charset:
+        encoding = charset.group(1).decode('ascii', 'replace')
+    try:
+        text = match.group(1).decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        text = match.group(1).decode('utf-8', errors='replace')
+
+    title = ' '.join(html.unescape(text).split())
+    return title or None
+
+
+def _bounded_map(func: Callable, items: Iterable, workers: int) -> Iterator[tuple]:
+    """
+    Yield (item, func(item)) in input order, with at most a few calls
+    per worker queued at once, so a long input is never read ahead.
+    """
+    limit = workers * 4
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="linkdrop-titles") as executor:
+        queue: deque = deque()
+        for item in items:
+            queue.append((item, executor.submit(func, item)))
+            if len(queue) >= limit:
+                done_item, future = queue.popleft()
+                yield done_item, future.result()
+        while queue:
+            done_item, future = queue.popleft()
+            yield done_item, future.result()
+
+
+def iter_sitemap_rows(
+    source: str,
+    titles: bool = False,
+    title_workers: int = DEFAULT_TITLE_WORKERS,
+    limit: Optional[int] = None
+) -> Iterator[tuple]:
+    """
+    Stream (name, url) rows for the batch engine from a sitemap.
+
+    Args:
+        source: Sitemap URL or local file path
+        titles: Name shortcuts after each page's <title> (falls back to
+            the URL path if the title can't be fetched)
+        title_workers: Concurrent title fetches
+        limit: Stop after this many pages
+
+    Yields:
+        (name, url) tuples
+    """
+    urls = iter_sitemap_urls(source)
+    if limit is not None:
+        urls = islice(urls, limit)
+
+    if not titles:
+        for url in urls:
+            yield name_from_url(url), url
+        return
+
+    for url, title in _bounded_map(fetch_title, urls, max(1, title_workers)):
+        yield title or name_from_url(url), url
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import add_batch_options, run_command
+    from src.batch import iter_plan_rows
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop sitemap",
+        description="Create a shortcut for every page in a sitemap or link list."
+    )
+    parser.add_argument("source", help="Sitemap URL or file (.xml, .xml.gz, sitemap index, or a list of URLs)")
+    parser.add_argument("--titles", action="store_true", help="Name shortcuts after each page's <title>")
+    parser.add_argument(
+        "--title-workers",
+        type=int,
+        default=DEFAULT_TITLE_WORKERS,
+        help=f"Concurrent title fetches (default: {DEFAULT_TITLE_WORKERS})"
+    )
+    parser.add_argument("--limit", type=int, help="Import at most this many pages")
+    add_batch_options(parser)
+    args = parser.parse_args(argv)
+
+    rows = iter_sitemap_rows(args.source, args.titles, args.title_workers, args.limit)
+    entries = iter_plan_rows(rows, args.collisions)
+    # requests' exceptions are OSErrors
+    return run_command(args, entries, errors=(OSError, ET.ParseError))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
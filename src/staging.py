@@ -0,0 +1,284 @@
+"""
+LinkDrop Staged Batch Commit
+
+All-or-nothing batches. Instead of writing each shortcut into the
+destination as soon as its icon is ready (so teammates watching a shared
+folder see it fill up over minutes), every .url file is first written to
+a hidden staging directory inside the destination. Once the whole batch
+has been staged, the files are published with renames in one short
+commit step:
+
+- The staging directory is inside the save folder, so it is on the same
+  volume and every rename is atomic. No file is ever seen half-written.
+- An existing file that is being replaced is first renamed into the
+  staging directory, so it can be put back.
+- If any file can't be staged or published, everything published so far
+  is moved back, the replaced files are restored, and no shortcut of
+  the batch is left behind.
+
+Icon fetching and all other network work is over before the first
+rename, so the commit itself takes a fraction of a second even for
+large batches.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+from typing import Iterable, Optional, Tuple
+
+from src.core import ShortcutResult
+from src.batch import (
+    PlannedShortcut, DirectorySnapshot, ACTION_CREATE, OVERWRITE_REPLACE, OVERWRITE_SKIP,
+    DEFAULT_WORKERS, ProgressCallback, execute_stream
+)
+from src.writer import FileOps, ShortcutWriter
+
+
+STAGING_PREFIX = ".linkdrop-staging-"
+
+FILE_ATTRIBUTE_HIDDEN = 0x2
+
+
+def _hide(path: str) -> None:
+    """Mark a directory hidden in Explorer (Windows only; dot-names hide it elsewhere)."""
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        ctypes.windll.kernel32.SetFileAttributesW(path, FILE_ATTRIBUTE_HIDDEN)
+    except (AttributeError, OSError):
+        pass
+
+
+def _rename_noreplace(src: str, dst: str) -> None:
+    """
+    Rename src to dst, failing with FileExistsError if dst exists.
+
+    os.rename() already refuses to replace on Windows. Elsewhere it
+    replaces silently, so a hard link (which refuses) is used instead,
+    with a checked rename for file systems without hard links.
+    """
+    if os.name == 'nt':
+        os.rename(src, dst)
+        return
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        raise
+    except OSError:
+        if os.path.lexists(dst):
+            raise FileExistsError(dst)
+        os.rename(src, dst)
+        return
+    os.unlink(src)
+
+
+class StagingFileOps(FileOps):
+    """
+    FileOps that writes every file into a staging directory instead of
+    its real path, remembering where it belongs.
+
+    Destinations and remoteness are those of the wrapped FileOps, so a
+    ShortcutWriter keeps the share's concurrency limit and retries.
+    """
+
+    def __init__(self, save_dir: str, inner: Optional[FileOps] = None):
+        self.inner = inner or FileOps()
+        self.directory = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=save_dir)
+        _hide(self.directory)
+        self._lock = threading.Lock()
+        self._count = 0
+        self.staged: dict[str, Tuple[str, bool]] = {}  # final path -> (staged path, exclusive)
+
+    def destination(self, path: str) -> str:
+        return self.inner.destination(path)
+
+    def is_remote(self, destination: str) -> bool:
+        return self.inner.is_remote(destination)
+
+    def _next_path(self, suffix: str) -> str:
+        with self._lock:
+            self._count += 1
+            return os.path.join(self.directory, f"{self._count}{suffix}")
+
+    def write(self, path: str, content: str, exclusive: bool = False) -> None:
+        staged_path = self._next_path('.url')
+        try:
+            # The staged name is ours alone, so a retried write may replace it
+            self.inner.write(staged_path, content)
+        except OSError as e:
+            e.filename = path  # Report the shortcut, not the staging file
+            raise
+        with self._lock:
+            self.staged[path] = (staged_path, exclusive)
+
+    def publish(self) -> dict[str, str]:
+        """
+        Move every staged file into place.
+
+        Files whose place is taken and that must not replace it
+        (exclusive writes) are left out and reported.
+
+        Returns:
+            Final path -> error, for the files that weren't published
+
+        Raises:
+            OSError: If a rename failed; everything published has been
+                rolled back
+        """
+        published: list[Tuple[str, str, Optional[str]]] = []  # (final, staged, backup)
+        conflicts: dict[str, str] = {}
+
+        try:
+            for final_path, (staged_path, exclusive) in self.staged.items():
+                backup = None
+                try:
+                    _rename_noreplace(staged_path, final_path)
+                except FileExistsError:
+                    if exclusive:
+                        conflicts[final_path] = f"File already exists: {final_path}"
+                        continue
+                    backup = self._next_path('.bak')
+                    os.rename(final_path, backup)
+                    published.append((final_path, staged_path, backup))
+                    _rename_noreplace(staged_path, final_path)
+                    continue
+                published.append((final_path, staged_path, None))
+        except OSError:
+            self._unpublish(published)
+            raise
+
+        return conflicts
+
+    def _unpublish(self, published: list) -> None:
+        """Undo publish(): move new files back out and restore replaced ones."""
+        for final_path, staged_path, backup in reversed(published):
+            try:
+                if os.path.lexists(final_path) and not os.path.lexists(staged_path):
+                    os.replace(final_path, staged_path)
+                if backup is not None:
+                    os.replace(backup, final_path)
+            except OSError:
+                pass
+
+    def discard(self) -> None:
+        """Delete the staging directory and anything left in it."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _remove_new_folders(folders: list[str]) -> None:
+    """Remove the folders a rolled-back batch created, if they are empty."""
+    for folder in sorted(folders, key=len, reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+
+def execute_staged(
+    entries: Iterable[PlannedShortcut],
+    save_dir: str,
+    fetch_icons: bool = True,
+    workers: int = DEFAULT_WORKERS,
+    overwrite: str = OVERWRITE_REPLACE,
+    writer: Optional[ShortcutWriter] = None,
+    progress: Optional[ProgressCallback] = None
+) -> list[Tuple[PlannedShortcut, ShortcutResult]]:
+    """
+    Carry out planned rows as one transaction.
+
+    Rows are staged exactly as execute_stream() would create them, then
+    published together. If any row that should have been created
+    failed, or a rename fails during the commit, nothing is published:
+    every created row's result is turned into a failure saying why.
+
+    Rows that are skipped or rejected by the plan, and rows skipped by
+    the overwrite policy, don't abort the batch.
+
+    Args:
+        entries: Planned rows (all held in memory until the commit)
+        save_dir: Directory to save all shortcuts
+        fetch_icons: Whether to fetch favicons (once per domain)
+        workers: Concurrent rows while staging
+        overwrite: Existing files: 'replace', 'skip' or 'error'
+        writer: Writer whose file access, share limits and retries are
+            used for staging (the writer itself isn't changed)
+        progress: Called with (done, total) after every staged row
+
+    Returns:
+        (PlannedShortcut, ShortcutResult) for every entry, in input order
+    """
+    entries = list(entries)
+    total = len(entries)
+    writer = writer or ShortcutWriter()
+    snapshot = DirectorySnapshot(save_dir)
+    if not snapshot.is_valid:
+        error = snapshot.error
+        return [(entry, ShortcutResult(success=False, error=error)) for entry in entries]
+
+    try:
+        staging = StagingFileOps(snapshot.save_dir, writer.file_ops)
+    except OSError as e:
+        error = f"Failed to create staging folder: {e}"
+        return [(entry, ShortcutResult(success=False, error=error)) for entry in entries]
+
+    # A writer of our own, so the caller's writer is never redirected
+    staging_writer = ShortcutWriter(
+        max_pending=writer.max_pending,
+        concurrency=writer.concurrency,
+        limits=writer.limits,
+        retries=writer.retries,
+        retry_delay=writer.retry_delay,
+        file_ops=staging
+    )
+
+    results: list[Tuple[PlannedShortcut, ShortcutResult]] = []
+    reason = None
+    try:
+        for done, (entry, result) in enumerate(
+            execute_stream(
+                entries, save_dir, fetch_icons, workers,
+                overwrite=overwrite, writer=staging_writer, snapshot=snapshot
+            ),
+            start=1
+        ):
+            results.append((entry, result))
+            if progress:
+                progress(done, total)
+
+        reason = next(
+            (
+                result.error for entry, result in results
+                if entry.action == ACTION_CREATE and not result.success and result.file_path is None
+            ),
+            None
+        )
+        if reason is None:
+            try:
+                conflicts = staging.publish()
+            except OSError as e:
+                reason = f"Commit failed: {e}"
+            else:
+                for entry, result in results:
+                    if result.success and result.file_path in conflicts:
+                        result.success = False
+                        result.error = conflicts[result.file_path]
+                        result.skipped = overwrite == OVERWRITE_SKIP
+    except BaseException:
+        _remove_new_folders(snapshot.created)
+        raise
+    finally:
+        staging_writer.close()
+        staging.discard()
+
+    if reason is not None:
+        _remove_new_folders(snapshot.created)
+        for entry, result in results:
+            if result.success:
+                result.success = False
+                result.file_path = None
+                result.error = f"Batch rolled back: {reason}"
+
+    return results
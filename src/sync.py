@@ -0,0 +1,490 @@
+"""
+LinkDrop Manifest Sync
+
+Keeps a folder tree of shortcuts in line with a manifest, e.g. a team's
+spreadsheet of links, without rewriting every file on each run. The
+existing .url files under the root are read back and compared with the
+manifest, and only the difference is written:
+
+    create      in the manifest, no file yet
+    update      file exists, but its URL or comment differ (or it has no
+                icon while the icon cache has one for its domain)
+    delete      file under the root that isn't in the manifest (only
+                with --delete; a row that is skipped or invalid still
+                keeps its file)
+    unchanged   nothing to do; the file isn't touched
+
+Manifests can be:
+
+    batch       "Name | URL | Notes | Folder" lines, as for linkdrop batch
+    csv         columns name, url, notes (or comment) and folder (or path);
+                without a header row the columns are taken in that order
+    json        a list of objects with the same keys (or {"shortcuts": [...]});
+                folder may be a string ("Projects/Apollo") or a list
+
+Updates are written atomically (temporary file, then rename). Icons are
+only fetched for new shortcuts and for shortcuts whose site changed, so
+re-syncing an unchanged tree reads each file once and makes no network
+requests.
+
+Usage:
+    python src/sync.py links.csv -d \\\\server\\share\\Links
+    python src/sync.py links.json -d C:\\Links --delete --dry-run
+"""
+
+import sys
+import os
+import re
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import (
+    ShortcutFile, ShortcutResult, as_link_url, build_shortcut_content, get_icon_cache_path,
+    read_shortcut_file, replace_shortcut_file
+)
+from src.batch import (
+    BatchPlan, PlannedShortcut, ACTION_CREATE, ACTION_ERROR, ACTION_SKIP, COLLISION_SUFFIX, DEFAULT_WORKERS,
+    _IconMemo, plan_batch, plan_rows
+)
+from src.staging import STAGING_PREFIX
+
+
+FORMAT_BATCH = "batch"
+FORMAT_CSV = "csv"
+FORMAT_JSON = "json"
+FORMATS = (FORMAT_BATCH, FORMAT_CSV, FORMAT_JSON)
+
+# Sync actions
+SYNC_CREATE = "create"
+SYNC_UPDATE = "update"
+SYNC_DELETE = "delete"
+SYNC_UNCHANGED = "unchanged"
+SYNC_SKIP = "skip"        # Duplicate or colliding manifest row
+SYNC_ERROR = "error"      # Invalid manifest row, or the file couldn't be read
+
+_PATH_SEPARATOR_RE = re.compile(r'[\\/]')
+
+NAME_KEYS = ('name', 'title')
+URL_KEYS = ('url', 'link', 'href')
+NOTES_KEYS = ('notes', 'comment', 'description')
+FOLDER_KEYS = ('folder', 'path', 'folders')
+
+
+def _folders(value) -> tuple:
+    """Folder names from a "Projects/Apollo" string or a list."""
+    if not value:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(str(v) for v in value)
+    return tuple(_PATH_SEPARATOR_RE.split(str(value)))
+
+
+def _pick(record: dict, keys: tuple) -> Optional[str]:
+    for key in keys:
+        value = record.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _row(record: dict) -> tuple:
+    record = {str(k).strip().lower(): v for k, v in record.items()}
+    return (
+        str(_pick(record, NAME_KEYS) or ''),
+        str(_pick(record, URL_KEYS) or ''),
+        _pick(record, NOTES_KEYS) or None,
+        _folders(_pick(record, FOLDER_KEYS)),
+    )
+
+
+def iter_csv_rows(path: str) -> Iterator[tuple]:
+    """
+    Stream (name, url, notes, folders) rows from a CSV manifest.
+
+    A first row that names a url column is taken as the header.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        header = None
+        for values in csv.reader(f):
+            if not any(v.strip() for v in values):
+                continue
+            if header is None:
+                lowered = [v.strip().lower() for v in values]
+                header = lowered if any(key in lowered for key in URL_KEYS) else ()
+                if header:
+                    continue
+            if header:
+                yield _row(dict(zip(header, values)))
+            else:
+                padded = list(values) + [''] * 4
+                yield padded[0], padded[1], padded[2] or None, _folders(padded[3])
+
+
+def iter_json_rows(path: str) -> Iterator[tuple]:
+    """
+    Stream (name, url, notes, folders) rows from a JSON manifest.
+
+    Raises:
+        ValueError: If the file isn't a list of shortcut objects
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('shortcuts')
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a list of shortcuts in {path}")
+    for record in data:
+        if not isinstance(record, dict):
+            raise ValueError(f"Expected shortcut objects in {path}, got {type(record).__name__}")
+        yield _row(record)
+
+
+def detect_format(path: str) -> str:
+    """Guess a manifest's format from its extension, or its first character."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return FORMAT_CSV
+    if extension == '.json':
+        return FORMAT_JSON
+    with open(path, 'rb') as f:
+        head = f.read(64).lstrip(b'\xef\xbb\xbf \t\r\n')
+    return FORMAT_JSON if head[:1] in (b'[', b'{') else FORMAT_BATCH
+
+
+def load_manifest(path: str, fmt: Optional[str] = None, policy: str = COLLISION_SUFFIX) -> BatchPlan:
+    """
+    Read and plan a manifest.
+
+    Args:
+        path: Manifest file
+        fmt: 'batch', 'csv' or 'json' (detected if None)
+        policy: Collision policy for rows that map to the same file
+
+    Returns:
+        The BatchPlan; its entries are the shortcuts the root should hold
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If a JSON manifest is malformed
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == FORMAT_BATCH:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return plan_batch(f, policy)
+    rows = iter_csv_rows(path) if fmt == FORMAT_CSV else iter_json_rows(path)
+    return plan_rows(rows, policy)
+
+
+def list_shortcuts(root: str) -> dict[str, str]:
+    """
+    Find every .url file below root.
+
+    Returns:
+        Lowercased relative path -> relative path as found on disk
+    """
+    found: dict[str, str] = {}
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, relative) if relative else root) as it:
+                for item in it:
+                    path = os.path.join(relative, item.name) if relative else item.name
+                    if item.is_dir(follow_symlinks=False):
+                        if not item.name.startswith(STAGING_PREFIX):
+                            pending.append(path)
+                    elif item.name[-4:].lower() == '.url':
+                        found[path.lower()] = path
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return found
+
+
+@dataclass
+class SyncChange:
+    """What a sync does to one file."""
+    action: str
+    path: str                                 # Absolute path of the .url file
+    entry: Optional[PlannedShortcut] = None   # Manifest row (None for deletes)
+    changes: tuple = ()                       # Fields that differ: 'url', 'comment', 'icon'
+    icon_path: Optional[str] = None           # Icon to write, unless fetch_icon
+    fetch_icon: bool = False                  # Fetch the icon for the (new) site
+    error: Optional[str] = None
+
+
+def _file_text(value: Optional[str]) -> Optional[str]:
+    """A value as write_shortcut_file() stores it."""
+    return value.encode('ascii', 'replace').decode('ascii') if value else value
+
+
+def _desired_comment(notes: Optional[str]) -> Optional[str]:
+    if not notes or not notes.strip():
+        return None
+    return _file_text(' '.join(notes.split()))
+
+
+def _read(path: str) -> Tuple[Optional[ShortcutFile], Optional[str]]:
+    try:
+        return read_shortcut_file(path), None
+    except OSError as e:
+        return None, f"Failed to read file: {e}"
+
+
+def _compare(
+    entry: PlannedShortcut,
+    path: str,
+    existing: ShortcutFile,
+    fetch_icons: bool,
+    cached_icons: dict[str, Optional[str]]
+) -> SyncChange:
+    changes = []
+    if existing.url != _file_text(entry.url):
+        changes.append('url')
+    if existing.comment != _desired_comment(entry.notes):
+        changes.append('comment')
+
+    icon_path = existing.icon_file
+    fetch_icon = False
+    if 'url' in changes:
+        old_link = as_link_url(existing.url or '')
+        if fetch_icons and (old_link is None or old_link.cache_key != entry.cache_key or not icon_path):
+            fetch_icon = True
+            icon_path = None
+    elif fetch_icons and not icon_path:
+        # One stat per domain: pick up icons fetched since the file was made
+        if entry.cache_key not in cached_icons:
+            cache_path = get_icon_cache_path(entry.link)
+            cached_icons[entry.cache_key] = cache_path if cache_path and os.path.exists(cache_path) else None
+        icon_path = cached_icons[entry.cache_key]
+        if icon_path:
+            changes.append('icon')
+
+    if not changes:
+        return SyncChange(SYNC_UNCHANGED, path, entry, icon_path=icon_path)
+    return SyncChange(SYNC_UPDATE, path, entry, tuple(changes), icon_path, fetch_icon)
+
+
+def diff_manifest(
+    plan: BatchPlan,
+    root: str,
+    delete_orphans: bool = False,
+    fetch_icons: bool = True,
+    workers: int = DEFAULT_WORKERS
+) -> list[SyncChange]:
+    """
+    Compare a manifest with the shortcuts under root.
+
+    Existing files are read in parallel (the slow part on a network
+    share); nothing is written.
+
+    Args:
+        plan: Manifest plan from load_manifest()
+        root: Folder the manifest describes
+        delete_orphans: Include deletes for .url files not in the manifest
+        fetch_icons: Whether shortcuts should get icons
+        workers: Files read concurrently
+
+    Returns:
+        One SyncChange per manifest row (in manifest order), then the deletes
+    """
+    root = os.path.abspath(root)
+    existing = list_shortcuts(root)
+    claimed: set[str] = set()
+    changes: list[Optional[SyncChange]] = []
+    to_read: list[Tuple[int, PlannedShortcut, str]] = []
+
+    for entry in plan.entries:
+        key = entry.relative_path.lower()
+        path = os.path.join(root, existing.get(key, entry.relative_path))
+        # A row that names a file keeps it, even if the row can't be carried out
+        claimed.add(key)
+        if entry.action == ACTION_SKIP:
+            changes.append(SyncChange(SYNC_SKIP, path, entry, error=entry.error))
+        elif entry.action != ACTION_CREATE:
+            changes.append(SyncChange(SYNC_ERROR, path, entry, error=entry.error))
+        elif key in existing:
+            to_read.append((len(changes), entry, path))
+            changes.append(None)
+        else:
+            changes.append(SyncChange(SYNC_CREATE, path, entry, fetch_icon=fetch_icons))
+
+    cached_icons: dict[str, Optional[str]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="linkdrop-sync") as executor:
+        files = executor.map(_read, [path for _, _, path in to_read])
+        for (index, entry, path), (shortcut, error) in zip(to_read, files):
+            if shortcut is None:
+                changes[index] = SyncChange(SYNC_ERROR, path, entry, error=error)
+            else:
+                changes[index] = _compare(entry, path, shortcut, fetch_icons, cached_icons)
+
+    if delete_orphans:
+        for key in sorted(set(existing) - claimed):
+            changes.append(SyncChange(SYNC_DELETE, os.path.join(root, existing[key])))
+    return changes
+
+
+def _apply(change: SyncChange, icons: Optional[_IconMemo]) -> ShortcutResult:
+    try:
+        if change.action == SYNC_DELETE:
+            os.remove(change.path)
+            return ShortcutResult(success=True, file_path=change.path)
+
+        entry = change.entry
+        icon_path = change.icon_path
+        if change.fetch_icon and icons is not None:
+            icon_path = icons.get(entry.link)
+        if change.action == SYNC_CREATE:
+            os.makedirs(os.path.dirname(change.path), exist_ok=True)
+        replace_shortcut_file(change.path, build_shortcut_content(entry.link, icon_path, entry.notes))
+        return ShortcutResult(success=True, file_path=change.path, icon_path=icon_path)
+    except OSError as e:
+        return ShortcutResult(success=False, file_path=change.path, error=f"{change.action.capitalize()} failed: {e}")
+
+
+def apply_sync(
+    changes: list[SyncChange],
+    fetch_icons: bool = True,
+    workers: int = DEFAULT_WORKERS
+) -> Iterator[Tuple[SyncChange, ShortcutResult]]:
+    """
+    Carry out the creates, updates and deletes of a diff.
+
+    Unchanged, skipped and failed rows are passed through without
+    touching the disk. Each domain's icon is fetched at most once.
+
+    Yields:
+        (SyncChange, ShortcutResult) for every change, in order
+    """
+    icons = _IconMemo() if fetch_icons else None
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="linkdrop-sync") as executor:
+        futures = []
+        for change in changes:
+            if change.action in (SYNC_CREATE, SYNC_UPDATE, SYNC_DELETE):
+                futures.append((change, executor.submit(_apply, change, icons)))
+            else:
+                futures.append((change, None))
+        for change, future in futures:
+            if future is not None:
+                yield change, future.result()
+            elif change.action == SYNC_UNCHANGED:
+                yield change, ShortcutResult(success=True, file_path=change.path, icon_path=change.icon_path)
+            else:
+                yield change, ShortcutResult(
+                    success=False, file_path=change.path, error=change.error, skipped=change.action == SYNC_SKIP
+                )
+
+
+STATUS_BY_ACTION = {
+    SYNC_CREATE: "created",
+    SYNC_UPDATE: "updated",
+    SYNC_DELETE: "deleted",
+    SYNC_UNCHANGED: "unchanged",
+    SYNC_SKIP: "skipped",
+    SYNC_ERROR: "failed",
+}
+
+
+def _record(change: SyncChange, status: str, result: Optional[ShortcutResult]) -> dict:
+    entry = change.entry
+    record = {
+        'line': entry.line_number + 1 if entry else None,
+        'name': entry.name if entry else None,
+        'url': entry.url if entry else None,
+        'file': change.path,
+        'action': change.action,
+        'changes': list(change.changes),
+        'status': status,
+        'error': change.error,
+    }
+    if result is not None:
+        record['error'] = result.error
+    return record
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_FAILURES, EXIT_USAGE
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop sync",
+        description="Make a folder of shortcuts match a manifest, touching only what changed."
+    )
+    parser.add_argument("manifest", help="Manifest: CSV, JSON, or 'Name | URL | Notes | Folder' lines")
+    parser.add_argument("-d", "--dir", default=".", help="Root folder the manifest describes (default: current directory)")
+    parser.add_argument("--format", choices=FORMATS, help="Manifest format (default: detected)")
+    parser.add_argument("--delete", action="store_true", help="Delete .url files under the root that aren't in the manifest")
+    parser.add_argument("--force", action="store_true", help="--delete even if some manifest rows are invalid")
+    parser.add_argument("--no-icons", action="store_true", help="Don't fetch favicons")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Files read and written concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--collisions",
+        choices=("suffix", "skip", "error"),
+        default=COLLISION_SUFFIX,
+        help="Rows whose names map to the same file: suffix (Name (2)), skip, or error (default: suffix)"
+    )
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Show the changes, change nothing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dir):
+        print(f"Error: Directory does not exist: {args.dir}", file=sys.stderr)
+        return EXIT_USAGE
+
+    start = time.perf_counter()
+    try:
+        plan = load_manifest(args.manifest, args.format, args.collisions)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    # A mistyped row would otherwise look like a shortcut that was removed on purpose
+    invalid = plan.count(ACTION_ERROR)
+    if args.delete and invalid and not args.force:
+        print(
+            f"Error: {invalid} manifest rows are invalid, so --delete could remove shortcuts "
+            f"that are still wanted; nothing changed (fix the rows or use --force)",
+            file=sys.stderr
+        )
+        return EXIT_FAILURES
+
+    changes = diff_manifest(plan, args.dir, args.delete, not args.no_icons, args.workers)
+    counts: dict[str, int] = {}
+
+    if args.dry_run:
+        results = ((change, None) for change in changes)
+    else:
+        results = apply_sync(changes, not args.no_icons, args.workers)
+
+    for change, result in results:
+        if result is None:
+            status = "failed" if change.action == SYNC_ERROR else "planned"
+        elif result.success:
+            status = STATUS_BY_ACTION[change.action]
+        else:
+            status = "skipped" if result.skipped else "failed"
+        counts[status] = counts.get(status, 0) + 1
+        if status != "unchanged" or args.dry_run:
+            sys.stdout.write(json.dumps(_record(change, status, result)) + '\n')
+    sys.stdout.flush()
+
+    if not args.quiet:
+        summary = ', '.join(f"{count} {status}" for status, count in counts.items()) or 'nothing to do'
+        print(f"{summary} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return EXIT_FAILURES if counts.get("failed") else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+LinkDrop Drop Folders
+
+A long-running mode that turns lists dropped into a folder into
+shortcuts. Save (or copy) a .txt file of "Name | URL | Notes | Folder"
+lines, or a .csv with name, url, notes and folder columns, into a
+watched folder, and LinkDrop:
+
+1. creates its shortcuts in that folder through the batch engine,
+2. moves the list into processed\\ (or failed\\, if any row failed or
+   the file couldn't be read), prefixed with the time it was handled,
+3. writes a <list>.report.json next to it with every row's outcome.
+
+New files are noticed through inotify on Linux. Elsewhere, or with
+--poll, and for network shares where inotify sees nothing, the folders
+are listed periodically: every --min-interval seconds while lists are
+arriving, backing off to --max-interval when nothing happens. A file is
+only picked up once it has stopped changing, so a slow copy isn't read
+half written.
+
+All jobs share one process: the HTTP connection pool, the icon cache
+and the file writer stay warm between drops.
+
+Usage:
+    python src/watch.py \\\\server\\share\\Links\\Inbox
+    python src/watch.py C:\\Links\\Drop D:\\Team\\Drop --poll --no-icons
+"""
+
+import sys
+import os
+import json
+import time
+import select
+import struct
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+# Add parent directory to path for imports when running as script
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import get_http_session
+from src.batch import COLLISION_SUFFIX, DEFAULT_WORKERS, OVERWRITE_REPLACE, BatchPlanError, execute_plan
+from src.sync import FORMAT_BATCH, FORMAT_CSV, load_manifest
+from src.writer import ShortcutWriter
+
+
+DROP_EXTENSIONS = {'.txt': FORMAT_BATCH, '.csv': FORMAT_CSV}
+PROCESSED_FOLDER = "processed"
+FAILED_FOLDER = "failed"
+REPORT_SUFFIX = ".report.json"
+
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 30.0
+RESCAN_INTERVAL = 60.0     # Listing even with inotify, for events it can't see
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    """
+    Minimal inotify binding (ctypes, no dependencies) reporting files
+    that were closed after writing or moved into the watched folders.
+
+    Raises:
+        OSError: If inotify isn't available (not Linux) or a folder can't be watched
+    """
+
+    def __init__(self, folders: Iterable[str]):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._folders: dict[int, str] = {}
+        try:
+            for folder in folders:
+                wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"Cannot watch {folder}: {os.strerror(errno)}")
+                self._folders[wd] = folder
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout: float) -> list[str]:
+        """Paths written or moved in within timeout seconds (empty on timeout)."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name and wd in self._folders:
+                paths.append(os.path.join(self._folders[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def is_drop_file(path: str) -> bool:
+    """A list this mode picks up (not hidden, an editor's temp file, or a report)."""
+    name = os.path.basename(path)
+    if name.startswith(('.', '~')) or name.endswith(REPORT_SUFFIX):
+        return False
+    return os.path.splitext(name)[1].lower() in DROP_EXTENSIONS
+
+
+@dataclass
+class DropJob:
+    """The outcome of one dropped list."""
+    input: str                      # Where the list was dropped
+    moved_to: Optional[str] = None
+    report: Optional[str] = None
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    error: Optional[str] = None     # The list as a whole couldn't be processed
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.failed
+
+
+def _move_aside(path: str, folder: str) -> str:
+    """Move path into folder (created if needed) under a time-stamped name."""
+    target_dir = os.path.join(os.path.dirname(path), folder)
+    os.makedirs(target_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    name = os.path.basename(path)
+    target = os.path.join(target_dir, f"{stamp}-{name}")
+    counter = 2
+    while os.path.exists(target):
+        target = os.path.join(target_dir, f"{stamp}-{counter}-{name}")
+        counter += 1
+    os.replace(path, target)
+    return target
+
+
+class DropFolderWatcher:
+    """Watches folders for dropped lists and runs each through the batch engine."""
+
+    def __init__(
+        self,
+        folders: Iterable[str],
+        fetch_icons: bool = True,
+        workers: int = DEFAULT_WORKERS,
+        policy: str = COLLISION_SUFFIX,
+        overwrite: str = OVERWRITE_REPLACE,
+        poll: bool = False,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL
+    ):
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.fetch_icons = fetch_icons
+        self.workers = workers
+        self.policy = policy
+        self.overwrite = overwrite
+        self.poll = poll
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        # Shared by every job, so connections and per-share limits stay warm
+        self.writer = ShortcutWriter()
+        self._seen: dict[str, tuple] = {}    # path -> (size, mtime_ns) at the last listing
+        self._stuck: dict[str, tuple] = {}   # Lists that couldn't be moved aside, until they change
+
+    def process(self, path: str) -> DropJob:
+        """
+        Create the shortcuts of one dropped list, then move it aside with a report.
+
+        Never raises for problems with the list itself; they end up in
+        the job's error and the list goes to failed\\.
+        """
+        from src.cli import _record, _result_status
+
+        start = time.perf_counter()
+        job = DropJob(path)
+        save_dir = os.path.dirname(path)
+        rows = []
+        try:
+            plan = load_manifest(path, DROP_EXTENSIONS[os.path.splitext(path)[1].lower()], self.policy)
+            results = execute_plan(
+                plan, save_dir, self.fetch_icons,
+                overwrite=self.overwrite, writer=self.writer, workers=self.workers
+            )
+            for entry, result in zip(plan.entries, results):
+                status = _result_status(result)
+                rows.append(_record(entry, status, result, save_dir))
+            job.created = sum(1 for row in rows if row['status'] == 'created')
+            job.skipped = sum(1 for row in rows if row['status'] == 'skipped')
+            job.failed = len(rows) - job.created - job.skipped
+        except (OSError, ValueError, BatchPlanError) as e:
+            job.error = str(e)
+        except Exception as e:  # A bad list must never stop the watcher
+            job.error = f"{type(e).__name__}: {e}"
+        job.seconds = time.perf_counter() - start
+
+        try:
+            job.moved_to = _move_aside(path, PROCESSED_FOLDER if job.ok else FAILED_FOLDER)
+        except OSError as e:
+            job.error = job.error or f"Cannot move the list aside: {e}"
+            self._stuck[path] = self._signature(path)
+            return job
+
+        job.report = job.moved_to + REPORT_SUFFIX
+        report = {
+            'input': path,
+            'moved_to': job.moved_to,
+            'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(job.seconds, 3),
+            'summary': {'created': job.created, 'skipped': job.skipped, 'failed': job.failed},
+            'error': job.error,
+            'rows': rows,
+        }
+        try:
+            with open(job.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        except OSError:
+            job.report = None
+        return job
+
+    @staticmethod
+    def _signature(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _list(self) -> tuple:
+        """(lists that stopped changing since the last listing, lists still changing)."""
+        ready = []
+        changing = 0
+        current: dict[str, tuple] = {}
+        for folder in self.folders:
+            try:
+                with os.scandir(folder) as it:
+                    for item in it:
+                        if not is_drop_file(item.path) or not item.is_file():
+                            continue
+                        stat = item.stat()
+                        current[item.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue  # Share offline; try again at the next listing
+        for path, signature in current.items():
+            if self._stuck.get(path) == signature:
+                continue
+            if self._seen.get(path) == signature:
+                ready.append(path)
+            else:
+                changing += 1
+        self._seen = current
+        return ready, changing
+
+    def run(
+        self,
+        stop: Optional[threading.Event] = None,
+        on_job: Optional[Callable[[DropJob], None]] = None
+    ) -> None:
+        """
+        Watch until stop is set (or forever).
+
+        Args:
+            stop: Event that ends the loop
+            on_job: Called with every finished DropJob
+        """
+        stop = stop or threading.Event()
+        get_http_session()  # Open the shared pool up front
+        inotify = None
+        if not self.poll:
+            try:
+                inotify = Inotify(self.folders)
+            except OSError:
+                inotify = None
+
+        def handle(paths: Iterable[str]) -> int:
+            handled = 0
+            for path in paths:
+                if stop.is_set():
+                    break
+                if os.path.isfile(path) and self._stuck.get(path) != self._signature(path):
+                    job = self.process(path)
+                    self._seen.pop(path, None)
+                    handled += 1
+                    if on_job:
+                        on_job(job)
+            return handled
+
+        interval = self.min_interval
+        last_listing = 0.0
+        try:
+            while not stop.is_set():
+                if inotify is not None:
+                    written = [path for path in inotify.wait(min(1.0, RESCAN_INTERVAL)) if is_drop_file(path)]
+                    handle(written)
+                    if time.monotonic() - last_listing < (self.min_interval if self._seen else RESCAN_INTERVAL):
+                        continue
+                    ready, _ = self._list()
+                    last_listing = time.monotonic()
+                    handle(ready)
+                    continue
+
+                ready, changing = self._list()
+                if handle(ready) or changing:
+                    interval = self.min_interval
+                else:
+                    interval = min(interval * 2, self.max_interval)
+                stop.wait(interval)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.cli import EXIT_OK, EXIT_USAGE
+    from src.batch import COLLISION_POLICIES, OVERWRITE_POLICIES
+
+    parser = argparse.ArgumentParser(
+        prog="linkdrop watch",
+        description="Watch folders for dropped .txt/.csv lists and turn them into shortcuts."
+    )
+    parser.add_argument("folders", nargs="+", help="Folders to watch; shortcuts are created in the same folder")
+    parser.add_argument("--no-icons", action="store_true", help="Don't fetch favicons")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Shortcuts created concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--collisions",
+        choices=COLLISION_POLICIES,
+        default=COLLISION_SUFFIX,
+        help="Rows whose names map to the same file: suffix (Name (2)), skip, or error (default: suffix)"
+    )
+    parser.add_argument(
+        "--overwrite",
+        choices=OVERWRITE_POLICIES,
+        default=OVERWRITE_REPLACE,
+        help="What to do when a shortcut file already exists (default: replace)"
+    )
+    parser.add_argument("--poll", action="store_true", help="List the folders periodically instead of using inotify")
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=DEFAULT_MIN_INTERVAL,
+        help=f"Seconds between listings while lists arrive (default: {DEFAULT_MIN_INTERVAL:g})"
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=DEFAULT_MAX_INTERVAL,
+        help=f"Longest wait between listings when idle (default: {DEFAULT_MAX_INTERVAL:g})"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print a line per list to stderr")
+    args = parser.parse_args(argv)
+
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            print(f"Error: Directory does not exist: {folder}", file=sys.stderr)
+            return EXIT_USAGE
+
+    def on_job(job: DropJob) -> None:
+        sys.stdout.write(json.dumps({
+            'input': job.input, 'moved_to': job.moved_to, 'report': job.report,
+            'created': job.created, 'skipped': job.skipped, 'failed': job.failed,
+            'error': job.error, 'seconds': round(job.seconds, 3),
+        }) + '\n')
+        sys.stdout.flush()
+        if not args.quiet:
+            outcome = job.error or f"{job.created} created, {job.skipped} skipped, {job.failed} failed"
+            print(f"{os.path.basename(job.input)}: {outcome} in {job.seconds:.1f}s", file=sys.stderr)
+
+    watcher = DropFolderWatcher(
+        args.folders, not args.no_icons, args.workers, args.collisions, args.overwrite,
+        args.poll, args.min_interval, args.max_interval
+    )
+    if not args.quiet:
+        print(f"Watching {len(watcher.folders)} folder(s); Ctrl+C to stop", file=sys.stderr)
+    try:
+        watcher.run(on_job=on_job)
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""
+LinkDrop Shortcut Writer
+
+Writes .url files to network shares without paying one full round trip
+per file in sequence. On a share each small file create costs tens of
+milliseconds of latency but almost no bandwidth, so creates are issued
+concurrently:
+
+- At most max_pending writes are queued or running at once; submit()
+  blocks when the queue is full, so memory stays bounded.
+- Each destination (a \\\\server\\share or a mapped drive) has its own
+  concurrency limit, so one slow server can't take every slot and a
+  share isn't flooded with more parallel creates than it handles well.
+- Writes that fail with a transient error (network name deleted,
+  sharing violation, timeout, ...) are retried with backoff. If the
+  retry of an exclusive create finds the file already there with our
+  content, the timed-out attempt did succeed and no conflict is
+  reported.
+- Per-destination statistics report files, bytes, retries and
+  throughput.
+
+Local destinations keep the simple path: the file is written right away
+on the calling thread.
+
+The file system access is a FileOps object. LatencyFileOps adds a fixed
+delay (and optionally transient failures) to every write, which makes
+the slow-share behavior reproducible on any OS, e.g. in
+benchmarks/bench_writer.py.
+"""
+
+import os
+import time
+import errno
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core import get_destination_kind, write_shortcut_file
+
+
+DEFAULT_MAX_PENDING = 64
+DEFAULT_DESTINATION_CONCURRENCY = 8   # Parallel creates per share
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 0.2             # Seconds; doubles with every retry
+
+LOCAL_DESTINATION = "local"
+
+# Windows errors that usually clear up on their own
+TRANSIENT_WINERRORS = {
+    32,     # ERROR_SHARING_VIOLATION (antivirus or indexer has the file open)
+    33,     # ERROR_LOCK_VIOLATION
+    54,     # ERROR_NETWORK_BUSY
+    59,     # ERROR_UNEXP_NET_ERR
+    64,     # ERROR_NETNAME_DELETED (connection dropped)
+    121,    # ERROR_SEM_TIMEOUT
+    1231,   # ERROR_NETWORK_UNREACHABLE
+}
+TRANSIENT_ERRNOS = {
+    code for code in (
+        getattr(errno, name, None)
+        for name in ('EAGAIN', 'EBUSY', 'EINTR', 'EIO', 'ETIMEDOUT', 'ECONNRESET', 'ECONNABORTED', 'ESTALE')
+    )
+    if code is not None
+}
+
+
+def is_transient_error(error: OSError) -> bool:
+    """Whether a failed write is worth retrying."""
+    if isinstance(error, (FileExistsError, FileNotFoundError, IsADirectoryError, NotADirectoryError)):
+        return False
+    winerror = getattr(error, 'winerror', None)
+    if winerror is not None:
+        return winerror in TRANSIENT_WINERRORS
+    return error.errno in TRANSIENT_ERRNOS
+
+
+def destination_of(path: str) -> str:
+    """
+    The destination a path belongs to, for concurrency limits and stats.
+
+    Returns:
+        '\\\\server\\share' for UNC paths, 'X:' for mapped drives, or
+        'local'
+    """
+    kind = get_destination_kind(path)
+    if kind == 'unc':
+        parts = path.replace('/', '\\').lstrip('\\').split('\\')
+        return '\\\\' + '\\'.join(parts[:2]).lower()
+    if kind == 'mapped':
+        return os.path.splitdrive(path)[0].upper()
+    return LOCAL_DESTINATION
+
+
+class FileOps:
+    """Plain file system access; what ShortcutWriter uses by default."""
+
+    def destination(self, path: str) -> str:
+        return destination_of(path)
+
+    def is_remote(self, destination: str) -> bool:
+        return destination != LOCAL_DESTINATION
+
+    def write(self, path: str, content: str, exclusive: bool = False) -> None:
+        write_shortcut_file(path, content, exclusive)
+
+    def matches(self, path: str, content: str) -> bool:
+        """Whether the file at path holds exactly what write() would put there."""
+        expected = content.encode('ascii', 'replace').decode('ascii')
+        expected = expected.replace('\r\n', '\n').replace('\r', '\n')
+        try:
+            with open(path, 'r', encoding='ascii', errors='replace') as f:
+                return f.read() == expected
+        except OSError:
+            return False
+
+
+class LatencyFileOps(FileOps):
+    """
+    FileOps that behaves like a slow network share.
+
+    Every write is delayed by latency seconds (plus up to jitter), and a
+    failure_rate fraction of writes fail with a transient error before
+    touching the disk. All paths count as one remote destination.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.04,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        name: str = "simulated-share",
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.name = name
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def destination(self, path: str) -> str:
+        return self.name
+
+    def is_remote(self, destination: str) -> bool:
+        return True
+
+    def write(self, path: str, content: str, exclusive: bool = False) -> None:
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise OSError(errno.ETIMEDOUT, "Simulated network timeout", path)
+        super().write(path, content, exclusive)
+
+
+@dataclass
+class DestinationStats:
+    """Write statistics for one destination."""
+    destination: str
+    files: int = 0
+    bytes: int = 0
+    failures: int = 0
+    retries: int = 0
+    started: Optional[float] = None     # perf_counter() of the first write
+    finished: Optional[float] = None    # perf_counter() of the last completed write
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'destination': self.destination,
+            'files': self.files,
+            'bytes': self.bytes,
+            'failures': self.failures,
+            'retries': self.retries,
+            'seconds': round(self.elapsed, 3),
+            'files_per_second': round(self.files_per_second, 1),
+        }
+
+    def summary(self) -> str:
+        text = f"{self.destination}: {self.files} files in {self.elapsed:.1f}s ({self.files_per_second:.0f}/s)"
+        if self.retries:
+            text += f", {self.retries} retries"
+        if self.failures:
+            text += f", {self.failures} failed"
+        return text
+
+
+class ShortcutWriter:
+    """
+    Bounded, per-destination concurrent writer for .url files.
+
+    write() writes on the calling thread (for callers that already run
+    several threads, like the batch engine) while respecting the
+    destination's concurrency limit. submit() queues the write and
+    returns a Future, so a single-threaded caller can keep preparing
+    rows while earlier files are still being created.
+
+    Use as a context manager, or call close(), to wait for queued writes.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        concurrency: int = DEFAULT_DESTINATION_CONCURRENCY,
+        limits: Optional[dict[str, int]] = None,
+        retries: int = DEFAULT_RETRIES,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        file_ops: Optional[FileOps] = None
+    ):
+        """
+        Args:
+            max_pending: Writes queued or running at once through submit()
+            concurrency: Parallel writes per remote destination
+            limits: Per-destination overrides of concurrency, keyed like
+                destination_of()
+            retries: Extra attempts for transient errors
+            retry_delay: Delay before the first retry, doubled each time
+            file_ops: File system access (LatencyFileOps for testing)
+        """
+        self.max_pending = max(1, max_pending)
+        self.concurrency = max(1, concurrency)
+        self.limits = {key.lower(): value for key, value in (limits or {}).items()}
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self.file_ops = file_ops or FileOps()
+
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._stats: dict[str, DestinationStats] = {}
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        self._futures: set[Future] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _slot(self, destination: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(destination)
+            if slot is None:
+                limit = self.limits.get(destination.lower(), self.concurrency)
+                slot = self._slots[destination] = threading.BoundedSemaphore(max(1, limit))
+            return slot
+
+    def _record(self, destination: str, start: float, size: int, retries: int, ok: bool) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            stats = self._stats.get(destination)
+            if stats is None:
+                stats = self._stats[destination] = DestinationStats(destination)
+            if stats.started is None or start < stats.started:
+                stats.started = start
+            stats.finished = end if stats.finished is None else max(stats.finished, end)
+            stats.retries += retries
+            if ok:
+                stats.files += 1
+                stats.bytes += size
+            else:
+                stats.failures += 1
+
+    def _write(self, destination: str, path: str, content: str, exclusive: bool) -> None:
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    self.file_ops.write(path, content, exclusive)
+                    break
+                except FileExistsError:
+                    # A create that timed out may still have reached the server
+                    if attempt and exclusive and self.file_ops.matches(path, content):
+                        break
+                    raise
+                except OSError as e:
+                    if attempt >= self.retries or not is_transient_error(e):
+                        raise
+                    time.sleep(self.retry_delay * (2 ** attempt))
+                    attempt += 1
+        except OSError:
+            self._record(destination, start, 0, attempt, ok=False)
+            raise
+        self._record(destination, start, len(content), attempt, ok=True)
+
+    def write(self, path: str, content: str, exclusive: bool = False) -> None:
+        """
+        Write a file now, on the calling thread.
+
+        Blocks while the destination already has its limit of writes
+        running.
+
+        Raises:
+            OSError: If the write failed (after retries, if transient)
+        """
+        destination = self.file_ops.destination(path)
+        if not self.file_ops.is_remote(destination):
+            self._write(destination, path, content, exclusive)
+            return
+        with self._slot(destination):
+            self._write(destination, path, content, exclusive)
+
+    def submit(self, path: str, content: str, exclusive: bool = False) -> Future:
+        """
+        Queue a write and return at once (blocks only when the queue is full).
+
+        Local destinations are written immediately and get a finished
+        Future.
+
+        Returns:
+            Future whose result() is None, or raises the write's OSError
+        """
+        destination = self.file_ops.destination(path)
+        if not self.file_ops.is_remote(destination):
+            future: Future = Future()
+            try:
+                self._write(destination, path, content, exclusive)
+                future.set_result(None)
+            except OSError as e:
+                future.set_exception(e)
+            return future
+
+        self._pending.acquire()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_pending, thread_name_prefix="linkdrop-writer"
+                )
+            future = self._executor.submit(self.write, path, content, exclusive)
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+        self._pending.release()
+
+    def flush(self) -> None:
+        """Wait until every queued write has finished."""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+
+    def close(self) -> None:
+        """Wait for queued writes and stop the writer threads."""
+        self.flush()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'ShortcutWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> list[DestinationStats]:
+        """Statistics per destination, in the order destinations were first written."""
+        with self._lock:
+            return [
+                DestinationStats(**vars(stats))
+                for stats in self._stats.values()
+            ]
+
+    def remote_stats(self) -> list[DestinationStats]:
+        """stats() for remote destinations only."""
+        return [s for s in self.stats() if self.file_ops.is_remote(s.destination)]